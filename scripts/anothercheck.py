@@ -1,6 +1,7 @@
-import pandas as pd
 import os
 
+from raw_catalog import refresh_catalog
+
 data_dir = "/Users/minseung/Desktop/agencrim/data/rawdata"
 
 print("="*60)
@@ -15,23 +16,24 @@ files = {
     "5. 위도경도": "위도경도.csv"
 }
 
+# 파일 전체를 읽는 대신 카탈로그(raw_catalog.py) 사용 - 바뀐 파일만 다시 계산
+existing = [f for f in files.values() if os.path.exists(os.path.join(data_dir, f))]
+catalog, _ = refresh_catalog(data_dir, existing)
+
 for name, filename in files.items():
-    filepath = os.path.join(data_dir, filename)
     print(f"\n{name}: {filename}")
     print("-" * 60)
     
-    # 여러 인코딩 시도
-    for enc in ["utf-8-sig", "cp949"]:
-        try:
-            df = pd.read_csv(filepath, encoding=enc)
-            print(f"✓ 인코딩: {enc}")
-            print(f"Shape: {df.shape} (행={df.shape[0]}, 열={df.shape[1]})")
-            print(f"컬럼: {list(df.columns)}")
-            print(f"\n첫 번째 컬럼의 고유값 수: {df[df.columns[0]].nunique()}")
-            print(f"첫 번째 컬럼 샘플 (3개):")
-            print(df[df.columns[0]].head(3).tolist())
-            break
-        except:
-            continue
+    entry = catalog.get(filename)
+    if entry is None or entry.get("encoding") is None:
+        continue
+    header = entry["header"]
+    first = entry["columns"][header[0]]
+    print(f"✓ 인코딩: {entry['encoding']}")
+    print(f"Shape: ({entry['rows']}, {len(header)}) (행={entry['rows']}, 열={len(header)})")
+    print(f"컬럼: {header}")
+    print(f"\n첫 번째 컬럼의 고유값 수: {first['cardinality']}")
+    print(f"첫 번째 컬럼 샘플 (3개):")
+    print([row[0] for row in entry["sample"]])
 
 print("\n" + "="*60)
@@ -0,0 +1,253 @@
+# ==============================
+# 벤치마크: benchmark.py
+# ==============================
+# 합성 KOSIS 데이터(synthetic_kosis.py)로 preprocess4.main / preprocess5.main을 실행해
+# 단계별(load, normalize, clean, aggregate, merge, write) 시간을 재고 JSON 기록 파일에 누적합니다.
+# 같은 환경(플랫폼, CPU 수, Python/pandas 버전)의 같은 (파이프라인, 행 수) 이전 기록과 비교해
+# 느려진 단계를 표시합니다 - 회귀 확인과 하드웨어 산정용.
+#
+# 사용: python scripts/benchmark.py --rows 1000 10000 100000 --repeat 3
+#       python scripts/benchmark.py --rows 10000000 --pipelines preprocess4 --fail-on-regression
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import preprocess4
+import preprocess5
+from stage_timer import STAGES, recording
+from synthetic_kosis import SOURCES, dataset_manifest, generate_dataset, read_manifest
+
+try:
+    import pyarrow
+except ImportError:  # pyarrow는 선택 의존성 (컬럼형 저장 단계가 빠짐)
+    pyarrow = None
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_WORK_DIR = os.path.join(ROOT_DIR, "data", "benchmark")
+DEFAULT_ROWS = [10 ** 3, 10 ** 4, 10 ** 5]
+PIPELINES = ["preprocess4", "preprocess5"]
+# 파이프라인별 출력 파일 (실행이 끝까지 갔는지 확인)
+OUTPUT_FILES = {"preprocess4": "cleaned_master.csv", "preprocess5": "cleaned_final.csv"}
+
+# 이전 기록보다 이 비율 이상 느리면 회귀 (작은 단계의 측정 잡음은 MIN_REGRESSION_SECONDS로 무시)
+REGRESSION_RATIO = 1.2
+MIN_REGRESSION_SECONDS = 0.05
+
+
+# ------------------------------
+# 1. 실행 환경
+# ------------------------------
+def git_commit():
+    """현재 커밋 해시 (git이 없으면 None)"""
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                             capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment_info():
+    """기록 비교 기준이 되는 실행 환경"""
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pyarrow.__version__ if pyarrow is not None else None,
+    }
+
+
+def same_environment(a, b):
+    keys = ["machine", "cpu_count", "python", "pandas", "numpy", "pyarrow"]
+    return all(a.get(k) == b.get(k) for k in keys)
+
+
+# ------------------------------
+# 2. 데이터 준비 / 실행
+# ------------------------------
+def prepare_dataset(work_dir, rows, seed):
+    """
+    행 수별 합성 데이터 → (폴더, 입력 바이트 수)
+    manifest.json의 생성 조건(생성기 버전, 행 수, seed, 원본)이 같을 때만 재사용하고 아니면 다시 생성
+    """
+    data_dir = os.path.join(work_dir, "synthetic", f"{rows}_seed{seed}")
+    paths = [os.path.join(data_dir, filename) for filename, _, _ in SOURCES.values()]
+    reusable = read_manifest(data_dir) == dataset_manifest(rows, seed) and all(os.path.exists(p) for p in paths)
+    if not reusable:
+        if os.path.isdir(data_dir):
+            print(f"  ℹ️  합성 데이터 생성 조건이 다름 (manifest) - 다시 생성")
+            shutil.rmtree(data_dir)
+        print(f"  ℹ️  합성 데이터 생성: {rows:,}행 × {len(SOURCES)}개 파일")
+        start = time.perf_counter()
+        paths = generate_dataset(data_dir, rows, seed)
+        print(f"  ✓ 생성 완료 ({time.perf_counter() - start:.1f}초)")
+    return data_dir, sum(os.path.getsize(p) for p in paths)
+
+
+def run_pipeline(pipeline, data_dir, output_dir):
+    """
+    파이프라인 한 번 실행 (출력 숨김) → (전체 초, {단계: 초})
+    실패하거나(병합 / 저장 전에 중단) 출력 파일이 없으면 RuntimeError - 중단된 실행의 시간은 기록하지 않음
+    """
+    shutil.rmtree(output_dir, ignore_errors=True)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), recording() as timer:
+        start = time.perf_counter()
+        if pipeline == "preprocess4":
+            ok = preprocess4.main(["--data-dir", data_dir, "--output-dir", output_dir, "--no-cache", "--jobs", "1"])
+        else:
+            ok = preprocess5.main(data_dir, output_dir) is not None
+        total = time.perf_counter() - start
+    output_path = os.path.join(output_dir, OUTPUT_FILES[pipeline])
+    if not ok or not os.path.exists(output_path):
+        raise RuntimeError(f"{pipeline} 실행 실패 ({data_dir}) - {OUTPUT_FILES[pipeline]} 없음, "
+                           f"직접 실행해 오류를 확인하세요")
+    return total, timer.as_dict()
+
+
+def benchmark(pipeline, rows, data_dir, input_bytes, output_dir, repeat):
+    """repeat번 실행해 단계별 중앙값으로 기록 하나 생성"""
+    totals, stage_runs = [], []
+    for _ in range(repeat):
+        total, stages = run_pipeline(pipeline, data_dir, output_dir)
+        totals.append(total)
+        stage_runs.append(stages)
+    stages = {name: statistics.median(run.get(name, 0.0) for run in stage_runs)
+              for name in dict.fromkeys(STAGES + [n for run in stage_runs for n in run])}
+    total = statistics.median(totals)
+    return {
+        "pipeline": pipeline,
+        "rows": rows,
+        "input_rows": rows * len(SOURCES),
+        "input_bytes": input_bytes,
+        "repeat": repeat,
+        "total_seconds": total,
+        "total_runs": totals,
+        "stages": stages,
+        "rows_per_second": rows * len(SOURCES) / total if total > 0 else None,
+    }
+
+
+# ------------------------------
+# 3. 기록 / 비교
+# ------------------------------
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def previous_result(history, result):
+    """같은 환경 / 파이프라인 / 행 수의 가장 최근 기록 (없으면 None)"""
+    for run in reversed(history):
+        if not same_environment(run["environment"], result["environment"]):
+            continue
+        if run["pipeline"] == result["pipeline"] and run["rows"] == result["rows"]:
+            return run
+    return None
+
+
+def find_regressions(previous, result, ratio=REGRESSION_RATIO, min_seconds=MIN_REGRESSION_SECONDS):
+    """이전 기록 대비 느려진 단계 → [(단계, 이전 초, 현재 초), ...] (전체 시간은 "total")"""
+    pairs = [("total", previous["total_seconds"], result["total_seconds"])]
+    pairs += [(name, previous["stages"].get(name, 0.0), seconds) for name, seconds in result["stages"].items()]
+    return [(name, before, after) for name, before, after in pairs
+            if after - before > min_seconds and after > before * ratio]
+
+
+def print_result(result, previous):
+    """단계별 시간 표 (이전 기록이 있으면 변화율 포함)"""
+    print(f"\n📊 {result['pipeline']} - {result['rows']:,}행 × {len(SOURCES)}개 파일 "
+          f"({result['input_bytes'] / 1e6:.1f} MB, {result['repeat']}회 중앙값)")
+    rows = [("total", result["total_seconds"], previous["total_seconds"] if previous else None)]
+    rows += [(name, seconds, previous["stages"].get(name) if previous else None)
+             for name, seconds in result["stages"].items()]
+    for name, seconds, before in rows:
+        change = f"  ({(seconds / before - 1) * 100:+.0f}%)" if before else ""
+        print(f"   {name:<10} {seconds:9.3f}초{change}")
+    if result["rows_per_second"]:
+        print(f"   처리량: {result['rows_per_second']:,.0f}행/초")
+
+
+# ------------------------------
+# 4. 메인 실행
+# ------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="합성 데이터로 전처리 파이프라인 단계별 시간 측정")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS,
+                        help="파일별 행 수 (예: 1000 10000 ... 10000000)")
+    parser.add_argument("--pipelines", nargs="+", choices=PIPELINES, default=PIPELINES)
+    parser.add_argument("--repeat", type=int, default=3, help="행 수별 반복 횟수 (중앙값 기록)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", default=DEFAULT_WORK_DIR, help="합성 데이터 / 출력 폴더")
+    parser.add_argument("--history", default=None, help="JSON 기록 파일 (기본: <work-dir>/history.json)")
+    parser.add_argument("--no-save", action="store_true", help="기록 파일에 추가하지 않음")
+    parser.add_argument("--fail-on-regression", action="store_true", help="회귀가 있으면 종료 코드 1")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    history_path = args.history or os.path.join(args.work_dir, "history.json")
+    history = load_history(history_path)
+    environment = environment_info()
+    base = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "seed": args.seed,
+        "environment": environment,
+    }
+
+    print(f"\n{'='*60}")
+    print(f"벤치마크: {', '.join(args.pipelines)} / 행 수 {args.rows}")
+    print(f"{'='*60}")
+
+    results, regressions = [], []
+    for rows in args.rows:
+        data_dir, input_bytes = prepare_dataset(args.work_dir, rows, args.seed)
+        for pipeline in args.pipelines:
+            output_dir = os.path.join(args.work_dir, "output", pipeline)
+            result = dict(base, **benchmark(pipeline, rows, data_dir, input_bytes, output_dir, args.repeat))
+            previous = previous_result(history, result)
+            print_result(result, previous)
+            if previous is not None:
+                for name, before, after in find_regressions(previous, result):
+                    print(f"   ⚠️  회귀: {name} {before:.3f}초 → {after:.3f}초 "
+                          f"(이전 기록 {previous['timestamp']}, {previous['commit']})")
+                    regressions.append((pipeline, rows, name))
+            results.append(result)
+
+    if not args.no_save:
+        save_history(history_path, history + results)
+        print(f"\n💾 기록 추가: {history_path} ({len(results)}건, 누적 {len(history) + len(results)}건)")
+    print(f"\n{'='*60}\n")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# ==============================
+# 증분 빌드 캐시: build_cache.py
+# ==============================
+# 원본 파일별 preprocess_file + clean_data 결과를 pickle로 저장합니다.
+# 캐시 키 = 원본 내용 해시 + 처리 코드/설정 fingerprint (+ 파일명)
+# → 원본이나 코드가 바뀐 파일만 다시 계산합니다.
+# 키 앞에 코드 버전(code_version)을 붙여 두고, 코드가 바뀌면 prune_cache로 이전 버전 항목을 지웁니다.
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import time
+
+CACHE_VERSION = 1
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# 키 앞 코드 버전 길이 (hex)
+VERSION_LENGTH = 16
+# 이보다 오래된 임시 파일은 중단된 쓰기의 잔여물로 보고 삭제
+STALE_TMP_SECONDS = 3600
+# pickle을 읽을 수 없는 경우 (손상 / 다른 pandas·numpy 버전에서 저장) - 캐시 miss로 처리
+UNREADABLE_ERRORS = (OSError, EOFError, pickle.UnpicklingError, ImportError, AttributeError, TypeError, ValueError)
+
+
+# ------------------------------
+# 1. 코드/설정 fingerprint
+# ------------------------------
+def _local_modules():
+    """scripts 폴더에서 로드된 모듈 목록 (이름순)"""
+    modules = []
+    for name, module in sorted(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path and os.path.dirname(os.path.abspath(path)) == SCRIPTS_DIR:
+            modules.append(module)
+    return modules
+
+
+def code_version():
+    """처리 코드 버전 - scripts 폴더에서 import된 모든 모듈의 소스 (__main__ 포함) 해시"""
+    h = hashlib.blake2b(digest_size=VERSION_LENGTH // 2)
+    h.update(f"v{CACHE_VERSION}".encode())
+    for module in _local_modules():
+        try:
+            source = inspect.getsource(module)
+        except (OSError, TypeError):
+            continue
+        h.update(source.encode("utf-8"))
+    return h.hexdigest()
+
+
+def code_fingerprint(config=None):
+    """
+    처리 코드와 설정의 fingerprint: "<코드 버전>-<설정 해시>"
+    - config: 결과에 영향을 주는 옵션 dict (JSON 직렬화 가능해야 함)
+    """
+    config_hash = hashlib.blake2b(json.dumps(config or {}, sort_keys=True, ensure_ascii=False).encode("utf-8"),
+                                  digest_size=10).hexdigest()
+    return f"{code_version()}-{config_hash}"
+
+
+def cache_key(content_hash, fingerprint, filename=""):
+    """
+    원본 내용 해시 + fingerprint (+ 파일명) → 캐시 키 "<코드 버전>_<해시>"
+    preprocess_file이 파일명으로 처리 방식을 고르므로 파일명도 키에 포함합니다.
+    """
+    raw = f"{content_hash}:{fingerprint}:{filename}".encode("utf-8")
+    version = str(fingerprint).split("-")[0]
+    return f"{version}_{hashlib.blake2b(raw, digest_size=20).hexdigest()}"
+
+
+# ------------------------------
+# 2. 캐시 읽기/쓰기
+# ------------------------------
+def _entry_path(cache_dir, key):
+    return os.path.join(cache_dir, "frames", f"{key}.pkl")
+
+
+def load_cached(cache_dir, key):
+    """
+    캐시된 결과를 불러옵니다.
+    반환: (hit 여부, DataFrame 또는 None)
+    - region 컬럼이 없어 제외된 파일도 None으로 캐시되므로 hit 여부를 따로 반환
+    """
+    path = _entry_path(cache_dir, key)
+    if not os.path.exists(path):
+        return False, None
+    try:
+        with open(path, "rb") as f:
+            return True, pickle.load(f)
+    except UNREADABLE_ERRORS:
+        remove_cached(cache_dir, key)
+        return False, None
+
+
+def save_cached(cache_dir, key, df):
+    """결과 저장 (임시 파일에 쓴 뒤 교체)"""
+    path = _entry_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def remove_cached(cache_dir, key):
+    """결과 삭제 (없으면 무시)"""
+    try:
+        os.remove(_entry_path(cache_dir, key))
+    except OSError:
+        pass
+
+
+def prune_cache(cache_dir, fingerprint):
+    """
+    현재 코드 버전이 아닌 항목(이전 코드 / 버전 표시가 없는 예전 키)과 오래된 임시 파일 삭제
+    (같은 코드의 다른 옵션 조합 항목은 남김)
+    반환: 삭제한 파일 수
+    """
+    frames_dir = os.path.join(cache_dir, "frames")
+    if not os.path.isdir(frames_dir):
+        return 0
+    prefix = str(fingerprint).split("-")[0] + "_"
+    now = time.time()
+    removed = 0
+    for name in os.listdir(frames_dir):
+        path = os.path.join(frames_dir, name)
+        if name.endswith(".tmp"):
+            try:
+                stale = now - os.path.getmtime(path) > STALE_TMP_SECONDS
+            except OSError:
+                continue
+        else:
+            stale = name.endswith(".pkl") and not name.startswith(prefix)
+        if stale:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
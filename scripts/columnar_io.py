@@ -0,0 +1,100 @@
+# ==============================
+# 컬럼형 저장/로드: columnar_io.py
+# ==============================
+# cleaned_master.csv 옆에 Parquet / Arrow IPC(Feather) 파일을 함께 씁니다.
+# - region 및 문자열 라벨 컬럼은 dictionary 인코딩
+# - 로더는 Arrow 파일을 memory-map하고 요청한 컬럼만 읽음
+# pyarrow가 없으면 CSV만 쓰고 건너뜁니다.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow는 선택 의존성
+    pa = None
+
+DICTIONARY_COLUMNS = ["region"]
+
+
+def pyarrow_available():
+    return pa is not None
+
+
+# ------------------------------
+# 1. DataFrame → Arrow Table
+# ------------------------------
+def to_arrow_table(df, dictionary_columns=None):
+    """
+    DataFrame을 Arrow Table로 변환
+    - dictionary_columns(기본: region)와 문자열 컬럼은 dictionary 인코딩
+    - 실수 컬럼의 NaN은 null로 바꾸지 않음 (읽을 때 복사 없이 numpy로 넘기기 위해)
+    """
+    dictionary_columns = set(dictionary_columns or DICTIONARY_COLUMNS)
+    arrays = []
+    for name in df.columns:
+        series = df[name]
+        if pd.api.types.is_float_dtype(series.dtype) and isinstance(series.dtype, np.dtype):
+            array = pa.array(series.to_numpy(), from_pandas=False)
+        else:
+            array = pa.array(series, from_pandas=True)
+        is_string = pa.types.is_string(array.type) or pa.types.is_large_string(array.type)
+        if (name in dictionary_columns or is_string) and not pa.types.is_dictionary(array.type):
+            array = array.dictionary_encode()
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=[str(c) for c in df.columns])
+
+
+# ------------------------------
+# 2. 저장
+# ------------------------------
+def write_columnar(df, output_dir, stem, dictionary_columns=None):
+    """
+    {stem}.parquet, {stem}.arrow 저장
+    - Arrow IPC 파일은 압축하지 않음 (memory-map 시 복사 없이 읽기 위해)
+    반환: 저장한 경로 리스트 (pyarrow가 없으면 빈 리스트)
+    """
+    if pa is None:
+        return []
+    table = to_arrow_table(df, dictionary_columns)
+    parquet_path = os.path.join(output_dir, f"{stem}.parquet")
+    arrow_path = os.path.join(output_dir, f"{stem}.arrow")
+    pq.write_table(table, parquet_path)
+    feather.write_feather(table, arrow_path, compression="uncompressed")
+    return [parquet_path, arrow_path]
+
+
+# ------------------------------
+# 3. 로드
+# ------------------------------
+def read_columnar_table(path, columns=None):
+    """
+    Arrow Table로 읽기
+    - .arrow/.feather: memory-map (필요한 컬럼 버퍼만 페이지 인)
+    - .parquet: 요청 컬럼만 읽음
+    """
+    if pa is None:
+        raise ImportError("pyarrow가 필요합니다: pip install pyarrow")
+    if path.endswith(".parquet"):
+        return pq.read_table(path, columns=columns, memory_map=True)
+    return feather.read_table(path, columns=columns, memory_map=True)
+
+
+def load_columnar(path, columns=None, categories=True):
+    """
+    컬럼형 파일을 pandas DataFrame으로 읽기
+    - columns: 읽을 컬럼 리스트 (None이면 전체)
+    - categories=True면 dictionary 컬럼을 pandas Categorical로 유지
+    - null이 없는 숫자 컬럼은 memory-map된 버퍼를 복사 없이 사용
+    """
+    table = read_columnar_table(path, columns)
+    df = table.to_pandas(split_blocks=True)
+    if not categories:
+        for name in df.columns:
+            if isinstance(df[name].dtype, pd.CategoricalDtype):
+                df[name] = df[name].astype(object)
+    return df
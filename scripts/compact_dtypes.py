@@ -0,0 +1,140 @@
+# ==============================
+# 메모리 절약형 dtype: compact_dtypes.py
+# ==============================
+# 병합 마스터는 region과 한글 라벨 컬럼(시도, 광역지자체, 행정구역, 구분 등)을 Python object 문자열로,
+# 인원 수는 fillna(0)와 병합을 거치며 모두 float64로 들고 있습니다.
+# compact_frame은 값을 바꾸지 않는 범위에서 더 작은 dtype으로 바꾸고 전후 메모리를 보고합니다.
+# - 라벨(문자열) 컬럼 → category (값이 반복될 때) 또는 Arrow 문자열 (string[pyarrow])
+# - 정수 값만 있는 숫자 컬럼(인원 수 등) → nullable Int32 (결측은 <NA>, int32 범위를 넘으면 그대로)
+#   행정구역 코드처럼 이미 int32인 키 컬럼은 그대로 둡니다.
+# - 좌표(위도/경도) → float32 (반올림 오차가 COORDINATE_TOLERANCE 이내일 때만)
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (string[pyarrow] dtype에 필요)
+except ImportError:  # pyarrow는 선택 의존성 (없으면 문자열은 category 또는 그대로)
+    pyarrow = None
+
+STRING_MODES = ["category", "arrow"]
+
+# 항상 라벨로 취급하는 컬럼
+LABEL_COLUMNS = ["region", "시도", "시군구", "광역지자체", "기초지자체", "행정구역", "구분"]
+COORDINATE_COLUMNS = ["latitude", "longitude"]
+# float32 좌표 허용 오차 (도, 약 1 m)
+COORDINATE_TOLERANCE = 1e-5
+# 고유값 비율이 이 이하인 문자열 컬럼은 category
+CATEGORY_MAX_RATIO = 0.5
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+def memory_bytes(df):
+    """컬럼별 실제 메모리 사용량 (문자열 객체 포함, index 제외)"""
+    return df.memory_usage(index=False, deep=True)
+
+
+# ------------------------------
+# 1. 컬럼별 변환
+# ------------------------------
+def _compact_strings(series, is_label, strings):
+    """
+    문자열 컬럼 → category (값이 반복될 때) / string[pyarrow] (고유값이 많을 때, strings="arrow")
+    문자열이 아닌 값이 섞여 있으면 category만 사용 (값을 str로 바꾸지 않도록)
+    """
+    all_strings = pd.api.types.infer_dtype(series, skipna=True) == "string"
+    arrow = all_strings and pyarrow is not None
+    if strings == "arrow" and arrow:
+        return series.astype("string[pyarrow]")
+    if series.nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(series):
+        return series.astype("category")
+    if arrow:
+        return series.astype("string[pyarrow]")
+    return series.astype("category") if is_label else series
+
+
+def _compact_float(series, is_coordinate):
+    """float 컬럼 → 좌표는 float32, 정수 값만 있으면 Int32 (아니면 그대로)"""
+    values = series.to_numpy()
+    finite = values[np.isfinite(values)]
+    if is_coordinate:
+        error = np.abs(finite.astype(np.float32).astype(np.float64) - finite)
+        if len(finite) == 0 or error.max() <= COORDINATE_TOLERANCE:
+            return series.astype(np.float32)
+        return series
+    # inf가 있거나 소수가 있으면 유지
+    if len(finite) != series.notna().sum() or not np.array_equal(finite, np.round(finite)):
+        return series
+    if len(finite) and (finite.min() < INT32_MIN or finite.max() > INT32_MAX):
+        return series
+    return series.astype("Int32")
+
+
+def compact_series(series, is_label=False, is_coordinate=False, strings="category"):
+    """컬럼 하나를 더 작은 dtype으로 (바꿀 수 없으면 그대로)"""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        return _compact_strings(series, is_label, strings)
+    if pd.api.types.is_bool_dtype(dtype):
+        return series
+    if pd.api.types.is_float_dtype(dtype) and isinstance(dtype, np.dtype):
+        return _compact_float(series, is_coordinate)
+    # 정수 컬럼도 nullable Int32로 (numpy int는 병합에서 결측이 생기면 float64가 됨)
+    if pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype) and dtype.itemsize > 4:
+        if len(series) == 0 or (series.min() >= INT32_MIN and series.max() <= INT32_MAX):
+            return series.astype("Int32")
+    return series
+
+
+# ------------------------------
+# 2. DataFrame 변환 + 리포트
+# ------------------------------
+def compact_frame(df, strings="category", exclude=(), label_columns=None, coordinate_columns=None):
+    """
+    DataFrame의 컬럼을 메모리 절약형 dtype으로 변환
+    - strings: "category"(라벨은 category) / "arrow"(라벨도 string[pyarrow])
+    - exclude: 바꾸지 않을 컬럼 (예: 병합 전 파일의 병합 키)
+    반환: (DataFrame, 리포트 {before, after, columns: [{column, from, to, before, after}, ...]})
+    """
+    if strings not in STRING_MODES:
+        raise ValueError(f"알 수 없는 문자열 방식: {strings} (가능: {STRING_MODES})")
+    label_columns = set(LABEL_COLUMNS if label_columns is None else label_columns)
+    coordinate_columns = set(COORDINATE_COLUMNS if coordinate_columns is None else coordinate_columns)
+    before = memory_bytes(df)
+    before_dtypes = df.dtypes
+
+    changed = {}
+    for col in df.columns:
+        if col in exclude:
+            continue
+        original = df[col]
+        series = compact_series(original, col in label_columns, col in coordinate_columns, strings)
+        if series.dtype != original.dtype:
+            changed[col] = series
+    if changed:
+        df = df.assign(**changed)
+
+    after = memory_bytes(df)
+    columns = [{"column": col, "from": str(before_dtypes[col]), "to": str(df[col].dtype),
+                "before": int(before[col]), "after": int(after[col])}
+               for col in changed]
+    report = {"before": int(before.sum()), "after": int(after.sum()), "columns": columns}
+    return df, report
+
+
+def _mb(n):
+    return f"{n / 1e6:.2f} MB" if n >= 1e5 else f"{n / 1e3:.1f} KB"
+
+
+def print_memory_report(report, detail=False):
+    """메모리 전후 출력 (detail=True면 바뀐 컬럼별)"""
+    before, after = report["before"], report["after"]
+    saved = f" ({(after / before - 1) * 100:+.0f}%)" if before else ""
+    print(f"  💾 메모리: {_mb(before)} → {_mb(after)}{saved}")
+    if detail:
+        for item in report["columns"]:
+            print(f"     - {item['column']}: {item['from']} → {item['to']} "
+                  f"({_mb(item['before'])} → {_mb(item['after'])})")
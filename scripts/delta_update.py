@@ -0,0 +1,332 @@
+# ==============================
+# 마스터 테이블 변경분(CDC) 갱신: delta_update.py
+# ==============================
+# 원본 하나(예: 257인구.csv의 새 월)가 다시 공개될 때마다 마스터 전체를 다시 만드는 대신
+#   1. 새 공개분을 이전 공개분 스냅샷과 (region, 시점) 키로 비교해 추가 / 변경 / 삭제 계산
+#   2. 바뀐 원본만 다시 정리(clean_data)해서 cleaned_master에 반영
+#      - 원본의 컬럼 / 지역 구성이 그대로면 바뀐 셀만 제자리 갱신
+#      - 컬럼(새 시점) / 지역이 바뀌면 마스터를 원본별 블록으로 나눠 바뀐 블록만 교체 후 다시 병합
+#   3. 공개분 변경과 마스터 셀 변경을 감사 기록(audit.jsonl)에 추가
+# 상태는 <output_dir>/.delta/ (state.json, 스냅샷 / 마스터 pickle, audit.jsonl)에 저장합니다.
+# preprocess4.py --delta로 실행하며, 처리 코드나 옵션이 바뀌면(fingerprint) 전체 빌드 후 기준을 새로 저장합니다.
+#
+# 감사 기록 보기: python scripts/delta_update.py --output-dir data/processed [--source 257인구.csv]
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from build_cache import cache_key, load_cached, remove_cached, save_cached
+from region_join import join_on_region, resolve_duplicates
+
+STATE_VERSION = 1
+DELTA_DIR = ".delta"
+STATE_FILE = "state.json"
+AUDIT_FILE = "audit.jsonl"
+# 시점이 없는 원본의 시점 값
+NO_PERIOD = ""
+OPS = ["insert", "update", "delete"]
+OP_LABELS = {"insert": "추가", "update": "변경", "delete": "삭제"}
+
+
+# ------------------------------
+# 1. 상태 (원본별 해시 / 스냅샷 / 마스터 블록)
+# ------------------------------
+def state_dir_for(output_dir):
+    return os.path.join(output_dir, DELTA_DIR)
+
+
+def load_state(state_dir):
+    """state.json (없거나 버전이 다르면 None)"""
+    path = os.path.join(state_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == STATE_VERSION else None
+
+
+def save_state(state_dir, state):
+    """임시 파일에 쓴 뒤 교체 (스냅샷 / 마스터를 모두 쓴 다음 마지막에 호출)"""
+    path = os.path.join(state_dir, STATE_FILE)
+    os.makedirs(state_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(dict(state, version=STATE_VERSION), f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def snapshot_key(content_hash, fingerprint, filename):
+    """공개분 스냅샷 키 (원본 내용 + 처리 코드/옵션 + 파일명)"""
+    return cache_key(content_hash, fingerprint, f"delta:{filename}")
+
+
+def master_key(file_hashes, fingerprint):
+    """마스터 키 (모든 원본 해시 기준 - 쓰다 중단돼도 이전 상태의 마스터는 그대로 남음)"""
+    return cache_key(json.dumps(file_hashes, sort_keys=True, ensure_ascii=False), fingerprint, "delta:master")
+
+
+def load_frame(state_dir, key):
+    """스냅샷 / 마스터 읽기 (없으면 None)"""
+    return load_cached(state_dir, key)[1]
+
+
+def save_frame(state_dir, key, df):
+    save_cached(state_dir, key, df)
+
+
+def remove_frame(state_dir, key):
+    remove_cached(state_dir, key)
+
+
+# ------------------------------
+# 2. 공개분 → (region, 시점) 키
+# ------------------------------
+def release_frame(plan, df, processed):
+    """
+    원본 한 번의 공개분 → (region, period) 인덱스 DataFrame
+    - 시점이 있는 원본: 모든 시점 (SourcePlan.split_periods, 컬럼은 시점을 뺀 항목 이름)
+    - 시점이 없는 원본: 전처리 결과(processed)를 period ""로
+    같은 키가 여러 행이면 첫 행만 사용 (비교용)
+    """
+    periods = plan.split_periods(df.copy())
+    if periods:
+        frame = pd.concat([part.assign(period=period) for period, part in periods.items()], ignore_index=True)
+    elif processed is not None and "region" in processed.columns:
+        frame = processed.assign(period=NO_PERIOD)
+    else:
+        return None
+    frame = frame.set_index(["region", "period"])
+    duplicated = frame.index.duplicated()
+    if duplicated.any():
+        print(f"  ℹ️  같은 (region, 시점) {int(duplicated.sum())}행 - 첫 행만 비교")
+        frame = frame[~duplicated]
+    return frame
+
+
+# ------------------------------
+# 3. 비교 (추가 / 변경 / 삭제)
+# ------------------------------
+def _cells(frame, mask):
+    """mask가 True인 셀 → Series (키..., column)"""
+    frame = frame.rename_axis(columns="column")
+    mask = mask.rename_axis(columns="column")
+    return frame.stack(future_stack=True)[mask.stack(future_stack=True).to_numpy()]
+
+
+def diff_frames(old, new):
+    """
+    같은 키 인덱스의 두 DataFrame 비교 (old / new가 None이면 빈 표로 취급)
+    반환: 셀 단위 DataFrame [op, <키 컬럼>, column, old, new]
+    - insert: 새 키의 값이 있는 셀 / delete: 없어진 키의 값이 있던 셀
+    - update: 양쪽에 있는 키에서 값이 바뀐 셀 (NaN ↔ NaN은 같음, 컬럼 추가/삭제도 변경)
+    """
+    base = new if new is not None else old
+    names = list(base.index.names) if base is not None else ["region"]
+    columns = ["op"] + names + ["column", "old", "new"]
+    if base is None:
+        return pd.DataFrame(columns=columns)
+    old = old if old is not None else base.iloc[:0]
+    new = new if new is not None else base.iloc[:0]
+
+    all_columns = old.columns.union(new.columns, sort=False)
+    old = old.reindex(columns=all_columns)
+    new = new.reindex(columns=all_columns)
+    inserted = new.index.difference(old.index, sort=False)
+    deleted = old.index.difference(new.index, sort=False)
+    common = old.index.intersection(new.index, sort=False)
+
+    parts = []
+    frame = new.loc[inserted]
+    values = _cells(frame, frame.notna())
+    parts.append(pd.DataFrame({"op": "insert", "old": None, "new": values}))
+    frame = old.loc[deleted]
+    values = _cells(frame, frame.notna())
+    parts.append(pd.DataFrame({"op": "delete", "old": values, "new": None}))
+    before, after = old.loc[common], new.loc[common]
+    changed = ~(before.eq(after) | (before.isna() & after.isna()))
+    parts.append(pd.DataFrame({"op": "update", "old": _cells(before, changed), "new": _cells(after, changed)}))
+
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    delta = pd.concat(parts).astype({"old": object, "new": object})
+    return delta.reset_index()[columns]
+
+
+def count_changes(delta):
+    """{op: 바뀐 키(행) 수} + cells"""
+    keys = [c for c in delta.columns if c not in ("op", "column", "old", "new")]
+    counts = {op: len(delta.loc[delta["op"] == op, keys].drop_duplicates()) for op in OPS}
+    counts["cells"] = len(delta)
+    return counts
+
+
+def format_counts(counts):
+    return " / ".join(f"{OP_LABELS[op]} {counts[op]}" for op in OPS) + f" (셀 {counts['cells']}개)"
+
+
+# ------------------------------
+# 4. 마스터 갱신
+# ------------------------------
+def describe_sources(frames, master, key="region", on_duplicate="error"):
+    """
+    병합에 쓴 원본별 블록 정보 (병합 순서대로)
+    {파일명: {"columns": 원래 컬럼, "master_columns": 마스터 컬럼, "regions": 키 목록}}
+    마스터의 값 컬럼은 원본 순서대로 이어 붙인 것이므로 위치로 나눔
+    """
+    sources = {}
+    offset = 1
+    for filename, df in frames:
+        df = resolve_duplicates(df, key, on_duplicate, filename)
+        columns = [c for c in df.columns if c != key]
+        sources[filename] = {
+            "columns": columns,
+            "master_columns": [str(c) for c in master.columns[offset:offset + len(columns)]],
+            "regions": df[key].tolist(),
+        }
+        offset += len(columns)
+    return sources
+
+
+def _block(indexed, info):
+    """마스터에서 원본 하나의 정리된 결과를 다시 꺼냄 (원래 컬럼명, 원본의 키만)"""
+    block = indexed.loc[info["regions"], info["master_columns"]]
+    return block.set_axis(info["columns"], axis=1).rename_axis(indexed.index.name).reset_index()
+
+
+def patch_master(master, sources, updates, order, key="region", on_duplicate="error"):
+    """
+    바뀐 원본의 정리된 결과로 마스터 갱신 (전체 다시 병합한 결과와 같음)
+    - sources: 현재 마스터의 원본별 블록 정보 (describe_sources)
+    - updates: {파일명: 새로 정리한 DataFrame (원본이 없어지거나 제외되면 None)}
+    - order: 갱신 후 병합 순서 (파일명 목록)
+    반환: (새 마스터, 새 블록 정보, 방식 "cells" / "blocks")
+    """
+    resolved = {f: resolve_duplicates(df, key, on_duplicate, f) for f, df in updates.items() if df is not None}
+    same_shape = order == list(sources) and all(
+        f in resolved
+        and [c for c in resolved[f].columns if c != key] == sources[f]["columns"]
+        and set(resolved[f][key]) == set(sources[f]["regions"])
+        for f in updates)
+
+    if same_shape:
+        # 바뀐 셀만 제자리 갱신
+        patched = master.set_index(key)
+        for filename, df in resolved.items():
+            info = sources[filename]
+            block = df.set_index(key).set_axis(info["master_columns"], axis=1).reindex(patched.index)
+            for col in info["master_columns"]:
+                old, new = patched[col], block[col]
+                changed = ~(old.eq(new) | (old.isna() & new.isna()))
+                if not changed.any():
+                    continue
+                if old.dtype != new.dtype:
+                    patched[col] = new
+                else:
+                    patched.loc[changed.to_numpy(), col] = new[changed]
+            info["regions"] = df[key].tolist()
+        return patched.reset_index(), sources, "cells"
+
+    # 컬럼 / 지역 구성이 바뀜: 그대로인 원본은 마스터에서 블록으로 꺼내고 바뀐 블록만 교체 후 병합
+    indexed = master.set_index(key)
+    frames = [(f, resolved[f] if f in updates else _block(indexed, sources[f])) for f in order]
+    patched, _ = join_on_region(frames, key=key, on_duplicate=on_duplicate)
+    return patched, describe_sources(frames, patched, key, on_duplicate), "blocks"
+
+
+# ------------------------------
+# 5. 감사 기록
+# ------------------------------
+def _plain(value):
+    """JSON용 값 (numpy 스칼라 → Python, NaN → None)"""
+    if value is None:
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def audit_records(delta, release, stage, source):
+    """셀 단위 변경 → 키(행)별 기록 {release, stage, source, op, <키>, changes: {컬럼: [이전, 이후]}}"""
+    keys = [c for c in delta.columns if c not in ("op", "column", "old", "new")]
+    records = []
+    for (op, *key_values), rows in delta.groupby(["op"] + keys, sort=False):
+        record = {"release": release, "stage": stage, "source": source, "op": op}
+        record.update({k: _plain(v) for k, v in zip(keys, key_values)})
+        record["changes"] = {str(c): [_plain(o), _plain(n)]
+                             for c, o, n in zip(rows["column"], rows["old"], rows["new"])}
+        records.append(record)
+    return records
+
+
+def append_audit(state_dir, records):
+    """감사 기록 추가 (한 줄 = 키 하나의 변경)"""
+    if not records:
+        return
+    os.makedirs(state_dir, exist_ok=True)
+    with open(os.path.join(state_dir, AUDIT_FILE), "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+def read_audit(state_dir, source=None):
+    path = os.path.join(state_dir, AUDIT_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return [r for r in records if source is None or r.get("source") == source]
+
+
+def release_id():
+    """공개분 반영 시각 (감사 기록 키)"""
+    return datetime.now().isoformat(timespec="milliseconds")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="cleaned_master 변경분 감사 기록 보기")
+    parser.add_argument("--output-dir", default="/Users/minseung/Desktop/agencrim/data/processed")
+    parser.add_argument("--source", default=None, help="원본 파일명 (없으면 전체)")
+    parser.add_argument("--detail", action="store_true", help="키별 변경 값까지 출력")
+    args = parser.parse_args(argv)
+
+    records = read_audit(state_dir_for(args.output_dir), args.source)
+    if not records:
+        print(f"ℹ️  감사 기록 없음: {state_dir_for(args.output_dir)}")
+        return
+    releases = {}
+    for record in records:
+        releases.setdefault(record["release"], []).append(record)
+    for release, items in releases.items():
+        print(f"📝 {release}")
+        groups = {}
+        for record in items:
+            groups.setdefault((record["stage"], record["source"]), []).append(record)
+        for (stage, source), group in groups.items():
+            if stage == "baseline":
+                print(f"   기준 저장: {source}")
+                continue
+            counts = {op: sum(1 for r in group if r["op"] == op) for op in OPS}
+            cells = sum(len(r["changes"]) for r in group)
+            target = "cleaned_master" if stage == "master" else f"{source} (region, 시점)"
+            print(f"   Δ {target}: " + " / ".join(f"{OP_LABELS[op]} {counts[op]}" for op in OPS)
+                  + f" (셀 {cells}개)")
+            if args.detail:
+                for r in group:
+                    key = ", ".join(str(r[k]) for k in ("region", "period") if r.get(k) not in (None, NO_PERIOD))
+                    changes = ", ".join(f"{c}: {o} → {n}" for c, (o, n) in r["changes"].items())
+                    print(f"      {OP_LABELS[r['op']]} [{key}] {changes}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
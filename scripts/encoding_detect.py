@@ -0,0 +1,229 @@
+# ==============================
+# 인코딩 판별 모듈: encoding_detect.py
+# ==============================
+# 파일 전체를 인코딩 후보마다 pd.read_csv로 읽어보는 대신,
+# 앞/뒤 일부 바이트만 보고 인코딩을 결정합니다.
+# 판별 결과는 파일 내용 해시 기준으로 캐시합니다.
+
+import codecs
+import hashlib
+import json
+import os
+
+SAMPLE_SIZE = 64 * 1024          # 판별에 사용하는 샘플 크기 (앞/뒤 각각)
+HASH_BLOCK_SIZE = 1024 * 1024    # 해시 계산 시 읽는 블록 크기
+
+# 기존 load_csv_with_encoding의 후보 순서 (판별 실패 시 fallback)
+FALLBACK_ENCODINGS = ["utf-8-sig", "utf-8", "cp949", "euc-kr", "latin1"]
+
+BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+# 프로세스 내 캐시 {content_hash: encoding}
+_ENCODING_CACHE = {}
+
+
+# ------------------------------
+# 1. 내용 해시
+# ------------------------------
+def file_content_hash(filepath):
+    """파일 내용의 blake2b 해시 (hex)"""
+    h = hashlib.blake2b(digest_size=20)
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ------------------------------
+# 2. 바이트 샘플 읽기
+# ------------------------------
+def read_samples(filepath, sample_size=SAMPLE_SIZE):
+    """
+    파일 앞부분과 (파일이 크면) 뒷부분 샘플을 읽습니다.
+    뒷부분 샘플은 멀티바이트 문자 중간에서 시작할 수 있으므로
+    판별 함수에서 앞쪽 몇 바이트를 건너뜁니다.
+    """
+    size = os.path.getsize(filepath)
+    with open(filepath, "rb") as f:
+        head = f.read(sample_size)
+        tail = b""
+        if size > sample_size * 2:
+            f.seek(size - sample_size)
+            tail = f.read(sample_size)
+    return head, tail
+
+
+# ------------------------------
+# 3. 바이트 통계 기반 판별
+# ------------------------------
+def _decodes_as(sample, encoding, skip_head=False):
+    """
+    샘플이 주어진 인코딩으로 디코딩되는지 확인
+    - 샘플 끝에서 잘린 멀티바이트 문자는 오류로 보지 않음 (final=False)
+    - skip_head=True면 앞쪽 최대 3바이트를 건너뛰며 재시도 (뒷부분 샘플용)
+    """
+    offsets = range(4) if skip_head else range(1)
+    for offset in offsets:
+        decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+        try:
+            decoder.decode(sample[offset:], final=False)
+            return True
+        except UnicodeDecodeError:
+            continue
+    return False
+
+
+def cp949_byte_stats(sample):
+    """
+    CP949 lead/trail 바이트 통계
+    - pairs: lead(0x81-0xFE) + 유효 trail 쌍의 개수
+    - invalid: 유효 trail이 뒤따르지 않는 lead 바이트 수
+    """
+    pairs = invalid = 0
+    i, n = 0, len(sample)
+    while i < n:
+        b = sample[i]
+        if b < 0x80:
+            i += 1
+            continue
+        if 0x81 <= b <= 0xFE and i + 1 < n:
+            t = sample[i + 1]
+            if 0x41 <= t <= 0x5A or 0x61 <= t <= 0x7A or 0x81 <= t <= 0xFE:
+                pairs += 1
+                i += 2
+                continue
+        if i + 1 < n:
+            invalid += 1
+        i += 1
+    return {"pairs": pairs, "invalid": invalid}
+
+
+def detect_encoding_from_bytes(head, tail=b""):
+    """
+    바이트 샘플로 인코딩 결정
+    1. BOM 확인
+    2. ASCII / UTF-8 유효성
+    3. CP949 lead/trail 통계
+    4. 모두 실패하면 latin1 (항상 디코딩 가능)
+    """
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    if _decodes_as(head, "utf-8") and (not tail or _decodes_as(tail, "utf-8", skip_head=True)):
+        return "utf-8"
+
+    stats = cp949_byte_stats(head)
+    if stats["pairs"] > 0 and stats["invalid"] == 0 and _decodes_as(head, "cp949"):
+        if not tail or _decodes_as(tail, "cp949", skip_head=True):
+            return "cp949"
+
+    return "latin1"
+
+
+# ------------------------------
+# 4. 파일 단위 판별 (해시 캐시)
+# ------------------------------
+def _load_cache_file(cache_path):
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+
+def _update_cache_file(cache_path, content_hash, encoding=None):
+    """
+    JSON 캐시에 항목 하나 추가 (encoding이 None이면 제거)
+    --jobs 작업 프로세스가 같은 파일을 함께 쓰므로 쓰기 직전에 다시 읽고, 임시 파일은 프로세스별 이름.
+    동시에 쓰면 한쪽 갱신이 빠질 수 있지만 캐시일 뿐이라 다음 실행에서 다시 판별합니다.
+    """
+    cache = _load_cache_file(cache_path)
+    if encoding is None:
+        if content_hash not in cache:
+            return
+        del cache[content_hash]
+    else:
+        cache[content_hash] = encoding
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def detect_encoding(filepath, cache_path=None, content_hash=None):
+    """
+    파일 인코딩을 판별합니다.
+    - 내용 해시 기준으로 프로세스 내 캐시 / (cache_path가 있으면) JSON 캐시 사용
+    - content_hash를 이미 계산했다면 넘겨서 재계산을 피할 수 있음
+    """
+    if content_hash is None:
+        content_hash = file_content_hash(filepath)
+
+    if content_hash in _ENCODING_CACHE:
+        return _ENCODING_CACHE[content_hash]
+
+    disk_cache = _load_cache_file(cache_path)
+    if content_hash in disk_cache:
+        _ENCODING_CACHE[content_hash] = disk_cache[content_hash]
+        return disk_cache[content_hash]
+
+    head, tail = read_samples(filepath)
+    encoding = detect_encoding_from_bytes(head, tail)
+
+    _ENCODING_CACHE[content_hash] = encoding
+    if cache_path:
+        _update_cache_file(cache_path, content_hash, encoding)
+    return encoding
+
+
+def forget_encoding(content_hash, cache_path=None):
+    """판별 결과가 틀렸을 때 캐시에서 제거"""
+    _ENCODING_CACHE.pop(content_hash, None)
+    if cache_path:
+        _update_cache_file(cache_path, content_hash)
+
+
+# ------------------------------
+# 5. 판별 결과로 CSV 읽기
+# ------------------------------
+def read_csv_detected(filepath, cache_path=None, content_hash=None, **read_kwargs):
+    """
+    판별한 인코딩으로 한 번만 파싱합니다.
+    샘플 밖에서 디코딩 오류가 나면 캐시를 지우고 기존 후보 순서대로 재시도합니다.
+    파싱 오류(ParserError, EmptyDataError 등 ValueError)도 예외를 올리지 않고 후보 순서대로 재시도합니다.
+    반환: (DataFrame, encoding) / 모두 실패하면 (None, None) - 호출하는 쪽에서 파일을 건너뜀
+    """
+    import pandas as pd
+
+    if content_hash is None:
+        content_hash = file_content_hash(filepath)
+    detected = detect_encoding(filepath, cache_path=cache_path, content_hash=content_hash)
+    try:
+        return pd.read_csv(filepath, encoding=detected, **read_kwargs), detected
+    except UnicodeDecodeError:
+        forget_encoding(content_hash, cache_path=cache_path)
+    except ValueError:
+        # 인코딩은 맞을 수 있으므로 캐시는 그대로 두고 후보 재시도
+        pass
+
+    for enc in FALLBACK_ENCODINGS:
+        if enc == detected:
+            continue
+        try:
+            df = pd.read_csv(filepath, encoding=enc, **read_kwargs)
+        except (UnicodeDecodeError, ValueError):
+            continue
+        _ENCODING_CACHE[content_hash] = enc
+        return df, enc
+    return None, None
@@ -0,0 +1,284 @@
+# ==============================
+# 행정구역 코드 사전: gazetteer.py
+# ==============================
+# 시도 / 시군구의 행정표준코드, 정식 명칭, 이전 명칭, 별칭을 내장합니다.
+# - 시도 코드: 2자리 (예: 11 서울특별시)
+# - 시군구 코드: 5자리 (예: 11110 종로구)
+# - 257인구.csv의 10자리 코드 "서울특별시  (1100000000)" → 시도 11
+# 원본의 지역명을 정수 코드로 바꿔 두면 조인을 int32 키로 할 수 있고
+# 강원도 → 강원특별자치도처럼 이름이 바뀌어도 같은 코드로 맞춰집니다.
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from region_normalize import map_unique
+
+# ------------------------------
+# 1. 시도
+# ------------------------------
+# (코드, 정식 명칭, 약칭, 영문, [(이전 명칭, 이전 코드), ...])
+SIDO = [
+    (11, "서울특별시", "서울", "Seoul", []),
+    (26, "부산광역시", "부산", "Busan", []),
+    (27, "대구광역시", "대구", "Daegu", []),
+    (28, "인천광역시", "인천", "Incheon", []),
+    (29, "광주광역시", "광주", "Gwangju", []),
+    (30, "대전광역시", "대전", "Daejeon", []),
+    (31, "울산광역시", "울산", "Ulsan", []),
+    (36, "세종특별자치시", "세종", "Sejong", []),
+    (41, "경기도", "경기", "Gyeonggi", []),
+    (51, "강원특별자치도", "강원", "Gangwon", [("강원도", 42)]),
+    (43, "충청북도", "충북", "Chungbuk", []),
+    (44, "충청남도", "충남", "Chungnam", []),
+    (52, "전북특별자치도", "전북", "Jeonbuk", [("전라북도", 45)]),
+    (46, "전라남도", "전남", "Jeonnam", []),
+    (47, "경상북도", "경북", "Gyeongbuk", []),
+    (48, "경상남도", "경남", "Gyeongnam", []),
+    (50, "제주특별자치도", "제주", "Jeju", []),
+]
+
+# 남/북을 합친 권역 표기 (위도경도.csv의 do 컬럼 등) → 후보 시도
+SIDO_GROUPS = {
+    "경상": [47, 48, 26, 27, 31],
+    "전라": [52, 46, 29],
+    "충청": [43, 44, 30, 36],
+    "경기": [41],
+}
+
+# 이전 시도 코드 → 현재 코드
+SIDO_CODE_HISTORY = {42: 51, 45: 52}
+
+# ------------------------------
+# 2. 시군구 (자치구·시·군 + 세종, 제주 행정시)
+# ------------------------------
+# 시도 코드 → [(시군구 코드 뒤 3자리, 명칭), ...]
+SIGUNGU = {
+    11: [(110, "종로구"), (140, "중구"), (170, "용산구"), (200, "성동구"), (215, "광진구"),
+         (230, "동대문구"), (260, "중랑구"), (290, "성북구"), (305, "강북구"), (320, "도봉구"),
+         (350, "노원구"), (380, "은평구"), (410, "서대문구"), (440, "마포구"), (470, "양천구"),
+         (500, "강서구"), (530, "구로구"), (545, "금천구"), (560, "영등포구"), (590, "동작구"),
+         (620, "관악구"), (650, "서초구"), (680, "강남구"), (710, "송파구"), (740, "강동구")],
+    26: [(110, "중구"), (140, "서구"), (170, "동구"), (200, "영도구"), (230, "부산진구"),
+         (260, "동래구"), (290, "남구"), (320, "북구"), (350, "해운대구"), (380, "사하구"),
+         (410, "금정구"), (440, "강서구"), (470, "연제구"), (500, "수영구"), (530, "사상구"),
+         (710, "기장군")],
+    27: [(110, "중구"), (140, "동구"), (170, "서구"), (200, "남구"), (230, "북구"),
+         (260, "수성구"), (290, "달서구"), (710, "달성군"), (720, "군위군")],
+    28: [(110, "중구"), (140, "동구"), (177, "미추홀구"), (185, "연수구"), (200, "남동구"),
+         (237, "부평구"), (245, "계양구"), (260, "서구"), (710, "강화군"), (720, "옹진군")],
+    29: [(110, "동구"), (140, "서구"), (155, "남구"), (170, "북구"), (200, "광산구")],
+    30: [(110, "동구"), (140, "중구"), (170, "서구"), (200, "유성구"), (230, "대덕구")],
+    31: [(110, "중구"), (140, "남구"), (170, "동구"), (200, "북구"), (710, "울주군")],
+    36: [(110, "세종특별자치시")],
+    41: [(110, "수원시"), (130, "성남시"), (150, "의정부시"), (170, "안양시"), (190, "부천시"),
+         (210, "광명시"), (220, "평택시"), (250, "동두천시"), (270, "안산시"), (280, "고양시"),
+         (290, "과천시"), (310, "구리시"), (360, "남양주시"), (370, "오산시"), (390, "시흥시"),
+         (410, "군포시"), (430, "의왕시"), (450, "하남시"), (460, "용인시"), (480, "파주시"),
+         (500, "이천시"), (550, "안성시"), (570, "김포시"), (590, "화성시"), (610, "광주시"),
+         (630, "양주시"), (650, "포천시"), (670, "여주시"), (800, "연천군"), (820, "가평군"),
+         (830, "양평군")],
+    51: [(110, "춘천시"), (130, "원주시"), (150, "강릉시"), (170, "동해시"), (190, "태백시"),
+         (210, "속초시"), (230, "삼척시"), (720, "홍천군"), (730, "횡성군"), (750, "영월군"),
+         (760, "평창군"), (770, "정선군"), (780, "철원군"), (790, "화천군"), (800, "양구군"),
+         (810, "인제군"), (820, "고성군"), (830, "양양군")],
+    43: [(110, "청주시"), (130, "충주시"), (150, "제천시"), (720, "보은군"), (730, "옥천군"),
+         (740, "영동군"), (745, "증평군"), (750, "진천군"), (760, "괴산군"), (770, "음성군"),
+         (800, "단양군")],
+    44: [(130, "천안시"), (150, "공주시"), (180, "보령시"), (200, "아산시"), (210, "서산시"),
+         (230, "논산시"), (250, "계룡시"), (270, "당진시"), (710, "금산군"), (760, "부여군"),
+         (770, "서천군"), (790, "청양군"), (800, "홍성군"), (810, "예산군"), (825, "태안군")],
+    52: [(110, "전주시"), (130, "군산시"), (140, "익산시"), (180, "정읍시"), (190, "남원시"),
+         (210, "김제시"), (710, "완주군"), (720, "진안군"), (730, "무주군"), (740, "장수군"),
+         (750, "임실군"), (770, "순창군"), (790, "고창군"), (800, "부안군")],
+    46: [(110, "목포시"), (130, "여수시"), (150, "순천시"), (170, "나주시"), (230, "광양시"),
+         (710, "담양군"), (720, "곡성군"), (730, "구례군"), (770, "고흥군"), (780, "보성군"),
+         (790, "화순군"), (800, "장흥군"), (810, "강진군"), (820, "해남군"), (830, "영암군"),
+         (840, "무안군"), (860, "함평군"), (870, "영광군"), (880, "장성군"), (890, "완도군"),
+         (900, "진도군"), (910, "신안군")],
+    47: [(110, "포항시"), (130, "경주시"), (150, "김천시"), (170, "안동시"), (190, "구미시"),
+         (210, "영주시"), (230, "영천시"), (250, "상주시"), (280, "문경시"), (290, "경산시"),
+         (730, "의성군"), (750, "청송군"), (760, "영양군"), (770, "영덕군"), (820, "청도군"),
+         (830, "고령군"), (840, "성주군"), (850, "칠곡군"), (900, "예천군"), (920, "봉화군"),
+         (930, "울진군"), (940, "울릉군")],
+    48: [(120, "창원시"), (170, "진주시"), (220, "통영시"), (240, "사천시"), (250, "김해시"),
+         (270, "밀양시"), (310, "거제시"), (330, "양산시"), (720, "의령군"), (730, "함안군"),
+         (740, "창녕군"), (820, "고성군"), (840, "남해군"), (850, "하동군"), (860, "산청군"),
+         (870, "함양군"), (880, "거창군"), (890, "합천군")],
+    50: [(110, "제주시"), (130, "서귀포시")],
+}
+
+# 이전 시군구 명칭 → 현재 시군구 코드 (통합·승격·편입)
+# (이전 소속 시도 코드, 이전 명칭): 현재 코드
+SIGUNGU_HISTORY = {
+    (48, "마산시"): 48120,     # 2010 창원시 통합
+    (48, "진해시"): 48120,     # 2010 창원시 통합
+    (43, "청원군"): 43110,     # 2014 청주시 통합
+    (41, "여주군"): 41670,     # 2013 여주시 승격
+    (44, "당진군"): 44270,     # 2012 당진시 승격
+    (44, "연기군"): 36110,     # 2012 세종특별자치시 출범
+    (28, "남구"): 28177,       # 2018 미추홀구로 명칭 변경
+    (47, "군위군"): 27720,     # 2023 대구광역시 편입
+    (41, "강화군"): 28710,     # 1995 인천광역시 편입
+    (41, "옹진군"): 28720,     # 1995 인천광역시 편입
+}
+
+# ------------------------------
+# 3. 조회용 인덱스
+# ------------------------------
+SIDO_NAMES = {code: name for code, name, _, _, _ in SIDO}
+SIGUNGU_NAMES = {
+    sido * 1000 + suffix: name
+    for sido, entries in SIGUNGU.items()
+    for suffix, name in entries
+}
+
+
+def _sido_aliases():
+    """시도 명칭/약칭/영문/이전 명칭/'OO시' 표기 → 코드"""
+    lookup = {}
+    for code, name, short, english, history in SIDO:
+        lookup[name] = code
+        lookup[short] = code
+        lookup[english.lower()] = code
+        lookup[english.lower() + "-do"] = code
+        if name.endswith("시"):
+            lookup[short + "시"] = code   # 부산시, 세종시
+        if name.endswith("도"):
+            lookup[short + "도"] = code   # 강원도, 제주도
+        for old_name, _ in history:
+            lookup[old_name] = code
+    return lookup
+
+
+SIDO_LOOKUP = _sido_aliases()
+
+# (시도 코드, 시군구 명칭) → 시군구 코드
+SIGUNGU_LOOKUP = {
+    (code // 1000, name): code for code, name in SIGUNGU_NAMES.items()
+}
+SIGUNGU_LOOKUP.update(SIGUNGU_HISTORY)
+
+ADMIN_CODE_PATTERN = re.compile(r"\((\d{10})\)")
+
+
+# ------------------------------
+# 4. 코드 변환
+# ------------------------------
+def current_sido_code(code):
+    """이전 시도 코드(42, 45)를 현재 코드로"""
+    return SIDO_CODE_HISTORY.get(code, code)
+
+
+def parse_admin_code(text):
+    """'서울특별시  (1100000000)' → 1100000000 (없으면 None)"""
+    if not isinstance(text, str):
+        return None
+    match = ADMIN_CODE_PATTERN.search(text)
+    return int(match.group(1)) if match else None
+
+
+def admin_code_to_sido(admin_code):
+    """10자리 행정기관코드 → 시도 코드 (전국 1000000000은 None)"""
+    code = current_sido_code(admin_code // 10**8)
+    return code if code in SIDO_NAMES else None
+
+
+def admin_code_to_sigungu(admin_code):
+    """10자리 행정기관코드 → 시군구 코드 (시도 단위 코드면 None)"""
+    sido = current_sido_code(admin_code // 10**8)
+    code = sido * 1000 + (admin_code // 10**5) % 1000
+    return code if code in SIGUNGU_NAMES else None
+
+
+def sido_only_code(sido_code):
+    """시군구가 없는 시도 직할 행(예: 디지털배움터 "이동형 교육")의 sigungu_code - 시도 코드 × 1000 (실제 시군구 코드와 겹치지 않음)"""
+    return sido_code * 1000
+
+
+def is_sido_only(sigungu_codes):
+    """sido_only_code로 만든 코드인지 (Series / 정수)"""
+    return sigungu_codes % 1000 == 0
+
+
+def _clean_name(text):
+    """괄호(코드), 영문, 공백 제거"""
+    text = str(text).strip()
+    text = re.sub(r"\s*\([^)]*\)", "", text)
+    text = re.sub(r"\s+[A-Za-z][A-Za-z\-]*", "", text)
+    return text.replace(" ", "")
+
+
+# ------------------------------
+# 5. 이름 → 코드
+# ------------------------------
+def resolve_sido(text):
+    """
+    지역 표기 → 시도 코드 (알 수 없거나 권역 표기면 None)
+    - 10자리 행정기관코드가 있으면 코드 우선
+    - 정식 명칭 / 약칭 / 영문 / 이전 명칭 / 'OO시' 표기
+    """
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return None
+    admin_code = parse_admin_code(text)
+    if admin_code is not None:
+        return admin_code_to_sido(admin_code)
+    name = _clean_name(text)
+    return SIDO_LOOKUP.get(name, SIDO_LOOKUP.get(name.lower()))
+
+
+def sido_candidates(text):
+    """시도 표기 또는 권역 표기(경상, 전라, 충청) → 후보 시도 코드 리스트"""
+    code = resolve_sido(text)
+    if code is not None:
+        return [code]
+    return list(SIDO_GROUPS.get(_clean_name(text), [])) if isinstance(text, str) else []
+
+
+def resolve_sigungu(sido_text, name):
+    """
+    (시도 표기, 시군구 명칭) → 시군구 코드 (없으면 None)
+    - 시도 표기가 권역(경상 등)이면 후보 시도 중 명칭이 하나로 정해질 때만 반환
+    - 세종특별자치시처럼 시도 = 시군구인 경우 포함
+    """
+    if not isinstance(name, str):
+        return None
+    admin_code = parse_admin_code(name)
+    if admin_code is not None:
+        return admin_code_to_sigungu(admin_code)
+    name = _clean_name(name)
+    matches = set()
+    for sido in sido_candidates(sido_text):
+        code = SIGUNGU_LOOKUP.get((sido, name))
+        if code is not None:
+            matches.add(code)
+    return matches.pop() if len(matches) == 1 else None
+
+
+def sido_name(code):
+    return SIDO_NAMES.get(code)
+
+
+def sigungu_name(code):
+    return SIGUNGU_NAMES.get(code)
+
+
+# ------------------------------
+# 6. Series 단위 변환 (고유값만 조회 → int32)
+# ------------------------------
+def _to_int32(series):
+    return pd.array(series.to_numpy(dtype=object), dtype="Int32")
+
+
+def resolve_sido_codes(series):
+    """지역명 Series → 시도 코드 (nullable Int32, 알 수 없으면 <NA>)"""
+    codes = map_unique(series, resolve_sido)
+    return pd.Series(_to_int32(codes), index=series.index, name="region_code")
+
+
+def resolve_sigungu_codes(sido_series, name_series):
+    """(시도, 시군구) Series 쌍 → 시군구 코드 (nullable Int32)"""
+    pairs = pd.Series(list(zip(sido_series, name_series)), index=name_series.index, dtype=object)
+    codes = map_unique(pairs, lambda pair: resolve_sigungu(*pair) if isinstance(pair, tuple) else None)
+    return pd.Series(_to_int32(codes), index=name_series.index, name="sigungu_code")
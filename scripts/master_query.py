@@ -0,0 +1,267 @@
+# ==============================
+# 마스터 데이터 조회 라이브러리: master_query.py
+# ==============================
+# 전처리 결과(cleaned_master*.arrow / .parquet / .csv)를 스크립트 재실행이나 노트북의 CSV 재파싱 없이
+# import해서 바로 쓰기 위한 함수 모음입니다.
+#
+#   import master_query as mq
+#   df = mq.load_master(level="sigungu", columns=["교육인원"])
+#   row = mq.get_region(11)              # 시도 코드 / 시군구 코드(5자리) / 지역명
+#   near = mq.nearest_regions(37.5, 127.0, k=3)
+#
+# - 읽은 결과는 프로세스 안의 LRU 캐시에 두고 전체 크기가 CACHE_MAX_BYTES를 넘으면 오래 안 쓴 것부터 제거
+# - 파일이 바뀌면(수정 시각 / 크기) 다음 호출에서 캐시를 버리고 다시 읽음
+# - pandas / pyarrow / scikit-learn 등은 함수 안에서 import (import master_query 자체는 수 ms)
+# 반환된 DataFrame은 캐시와 공유되므로 수정하려면 .copy()를 쓰세요.
+
+import collections
+import os
+import threading
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 기본 결과 폴더 (환경 변수 AGENCRIM_PROCESSED_DIR로 변경 가능)
+DEFAULT_OUTPUT_DIR = os.environ.get("AGENCRIM_PROCESSED_DIR", os.path.join(ROOT_DIR, "data", "processed"))
+
+# 집계 단위 → 결과 파일 이름 (preprocess4)
+LEVELS = {
+    "sido": "cleaned_master",
+    "sigungu": "cleaned_master_sigungu",
+    "sido_rollup": "cleaned_master_sido_rollup",
+}
+# 같은 결과가 여러 형식으로 있으면 앞의 형식부터 사용 (Arrow는 memory-map + 컬럼만 읽기)
+FORMATS = [".arrow", ".parquet", ".csv"]
+
+CACHE_MAX_BYTES = 512 * 1024 ** 2
+
+
+# ------------------------------
+# 1. 캐시 (크기 기준 LRU)
+# ------------------------------
+class FrameCache:
+    """
+    (파일 경로, 컬럼) → DataFrame LRU 캐시
+    - 항목마다 파일의 (수정 시각, 크기)를 함께 저장해 파일이 바뀌면 버림
+    - 전체 메모리(deep)가 max_bytes를 넘으면 오래 안 쓴 항목부터 제거
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()   # key → (signature, value, nbytes)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, signature):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != signature:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, signature, value, nbytes):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if nbytes > self.max_bytes:
+                return value
+            self._entries[key] = (signature, value, nbytes)
+            self.bytes += nbytes
+            self._evict()
+            return value
+
+    def _remove(self, key):
+        _, _, nbytes = self._entries.pop(key)
+        self.bytes -= nbytes
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def info(self):
+        return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+
+_cache = FrameCache()
+# 좌표 인덱스 (BallTree) - 결과 파일 signature별
+_spatial = {}
+
+
+def cache_info():
+    """캐시 상태 {entries, bytes, max_bytes, hits, misses}"""
+    return _cache.info()
+
+
+def set_cache_limit(max_bytes):
+    """캐시 최대 크기 변경 (넘는 만큼 바로 제거)"""
+    _cache.resize(max_bytes)
+
+
+def clear_cache():
+    _cache.clear()
+    _spatial.clear()
+
+
+# ------------------------------
+# 2. 결과 파일 찾기 / 읽기
+# ------------------------------
+def artifact_path(level="sido", output_dir=None):
+    """집계 단위의 결과 파일 경로 (FORMATS 순서로 처음 있는 파일, 없으면 FileNotFoundError)"""
+    if level not in LEVELS:
+        raise ValueError(f"알 수 없는 집계 단위: {level} (가능: {list(LEVELS)})")
+    output_dir = output_dir or DEFAULT_OUTPUT_DIR
+    for ext in FORMATS:
+        path = os.path.join(output_dir, LEVELS[level] + ext)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"{LEVELS[level]}.* 파일이 없습니다: {output_dir} (preprocess4.py를 먼저 실행)")
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read(path, columns=None):
+    """결과 파일 읽기 (columns만, 라벨 컬럼은 object 문자열)"""
+    if path.endswith(".csv"):
+        import pandas as pd
+        usecols = None if columns is None else (lambda c: c in columns)
+        return pd.read_csv(path, usecols=usecols, encoding="utf-8-sig")
+    from columnar_io import load_columnar
+    return load_columnar(path, columns=columns, categories=False)
+
+
+def _memory_bytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def load_master(level="sido", columns=None, output_dir=None):
+    """
+    마스터 테이블 (캐시 사용)
+    - level: "sido" / "sigungu" / "sido_rollup"
+    - columns: 읽을 값 컬럼 (지역 키/라벨 컬럼은 항상 포함, None이면 전체)
+    파일 전체가 이미 캐시에 있으면 컬럼 요청도 그 안에서 잘라서 반환합니다.
+    """
+    path = artifact_path(level, output_dir)
+    signature = _signature(path)
+    full = _cache.get((path, None), signature)
+    if columns is None:
+        if full is None:
+            full = _read(path)
+            _cache.put((path, None), signature, full, _memory_bytes(full))
+        return full
+
+    if full is not None:
+        wanted = _with_keys(list(full.columns), columns)
+        return full[wanted]
+    key = (path, tuple(columns))
+    df = _cache.get(key, signature)
+    if df is None:
+        df = _read(path, _with_keys(_header(path, signature), columns))
+        _cache.put(key, signature, df, _memory_bytes(df))
+    return df
+
+
+# 항상 함께 읽는 지역 키 / 라벨 컬럼
+KEY_COLUMNS = ["region", "region_code", "sido_code", "시도", "sigungu_code", "시군구"]
+
+
+def _with_keys(available, columns):
+    missing = [c for c in columns if c not in available]
+    if missing:
+        raise KeyError(f"없는 컬럼: {missing}")
+    keys = [c for c in KEY_COLUMNS if c in available and c not in columns]
+    return [c for c in available if c in keys or c in columns]
+
+
+def _header(path, signature):
+    """결과 파일의 컬럼 목록 (데이터는 읽지 않음, 캐시)"""
+    key = (path, "header")
+    header = _cache.get(key, signature)
+    if header is None:
+        if path.endswith(".csv"):
+            import pandas as pd
+            header = [str(c) for c in pd.read_csv(path, nrows=0, encoding="utf-8-sig").columns]
+        elif path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            header = pq.read_schema(path).names
+        else:
+            import pyarrow as pa
+            with pa.memory_map(path) as source:
+                header = pa.ipc.open_file(source).schema.names
+        _cache.put(key, signature, header, 0)
+    return header
+
+
+# ------------------------------
+# 3. 지역 조회
+# ------------------------------
+def _region_key(code):
+    """코드/이름 → (집계 단위, 시도 코드 또는 시군구 코드) (알 수 없으면 (None, None))"""
+    if isinstance(code, str) and code.strip().isdigit():
+        code = int(code.strip())
+    if isinstance(code, str):
+        from gazetteer import resolve_sido
+        sido = resolve_sido(code)
+        return ("sido", sido) if sido is not None else (None, None)
+    code = int(code)
+    return ("sigungu", code) if code >= 1000 else ("sido", code)
+
+
+def get_region(code, columns=None, output_dir=None):
+    """
+    지역 하나의 행 (pandas Series, 없으면 None)
+    - code: 시도 코드(11), 시군구 코드(11110), 지역명("서울특별시", "서울")
+    - 시도는 cleaned_master, 시군구는 cleaned_master_sigungu에서 찾음
+    """
+    level, key = _region_key(code)
+    if key is None:
+        return None
+    df = load_master(level, columns, output_dir)
+    if level == "sigungu":
+        mask = df["sigungu_code"] == key
+    elif "region_code" in df.columns:
+        mask = df["region_code"] == key
+    else:
+        from gazetteer import sido_name
+        mask = df["region"] == sido_name(key)
+    rows = df[mask.to_numpy()]
+    return rows.iloc[0] if len(rows) else None
+
+
+def nearest_regions(lat, lon, k=1, level="sigungu", output_dir=None):
+    """
+    좌표에 가까운 지역 k개 (결과 파일의 latitude/longitude, scikit-learn BallTree)
+    반환: rank, distance_km + 지역 키/라벨 컬럼 DataFrame
+    """
+    import numpy as np
+    import pandas as pd
+    from spatial_index import SpatialIndex
+
+    path = artifact_path(level, output_dir)
+    signature = _signature(path)
+    cached = _spatial.get(path)
+    if cached is None or cached[0] != signature:
+        points = load_master(level, ["latitude", "longitude"], output_dir).dropna(subset=["latitude", "longitude"])
+        _spatial[path] = cached = (signature, SpatialIndex(points))
+    index = cached[1]
+    result = index.nearest(np.atleast_1d(lat), np.atleast_1d(lon), k=k)
+    labels = index.points.drop(columns=["latitude", "longitude"]).iloc[result["point"].to_numpy()]
+    return pd.concat([result.drop(columns="point").reset_index(drop=True), labels.reset_index(drop=True)], axis=1)
@@ -0,0 +1,134 @@
+# ==============================
+# 숫자 컬럼 파싱: numeric_parse.py
+# ==============================
+# 기존 convert_numeric_strings는 모든 문자열 컬럼마다 astype(str) → replace → to_numeric → fillna를
+# 돌리고, 일부만 숫자인 컬럼은 숫자/문자열이 섞인 object 컬럼으로 남겼습니다.
+# 여기서는 표본으로 "51,159,889" 형식의 숫자 컬럼을 먼저 골라낸 뒤 그 컬럼만 한 번에 파싱하고,
+# 숫자로 읽지 못한 행은 NaN으로 두고 보고합니다 (섞인 컬럼을 만들지 않음).
+
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow는 선택 의존성 (없으면 pandas 문자열 연산으로 파싱)
+    pa = None
+
+SAMPLE_SIZE = 200
+# 표본 중 이 비율 이상이 숫자 형식이면 숫자 컬럼으로 판정
+MIN_NUMERIC_RATIO = 0.8
+# KOSIS 표의 결측 표기 ("-": 해당 없음, "X": 비공개 등) - 실패가 아니라 결측으로 처리
+NA_TOKENS = ["", "-", "X", "x", "…", "..."]
+
+NUMBER_PATTERN = re.compile(r"^[+-]?(?:\d{1,3}(?:,\d{3})+|\d+)?(?:\.\d+)?(?:[eE][+-]?\d+)?$")
+
+
+def _as_text(series):
+    """object 컬럼 → 문자열 Series (문자열이 아닌 값만 str 변환, 결측은 그대로)"""
+    if pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty"):
+        return series
+    return series.where(series.isna(), series.astype(str))
+
+
+# ------------------------------
+# 1. 숫자 컬럼 판정 (표본)
+# ------------------------------
+def looks_numeric(values, min_ratio=MIN_NUMERIC_RATIO):
+    """값 배열(문자열)이 숫자 형식인지 - 결측 표기는 제외하고 비율 계산"""
+    values = [str(v).strip() for v in values]
+    values = [v for v in values if v not in NA_TOKENS]
+    if not values:
+        return False
+    matched = sum(1 for v in values if NUMBER_PATTERN.match(v) and any(ch.isdigit() for ch in v))
+    return matched / len(values) >= min_ratio
+
+
+def detect_numeric_columns(df, columns=None, sample_size=SAMPLE_SIZE, min_ratio=MIN_NUMERIC_RATIO):
+    """
+    숫자 형식 문자열이 들어 있는 object 컬럼 목록
+    각 컬럼의 결측이 아닌 값 중 sample_size개를 고르게 뽑아 판정합니다.
+    """
+    columns = df.columns if columns is None else columns
+    numeric = []
+    for col in columns:
+        series = df[col]
+        if not pd.api.types.is_object_dtype(series.dtype):
+            continue
+        values = series.dropna().to_numpy()
+        if len(values) == 0:
+            continue
+        if len(values) > sample_size:
+            values = values[np.linspace(0, len(values) - 1, sample_size).astype(np.int64)]
+        if looks_numeric(values, min_ratio):
+            numeric.append(col)
+    return numeric
+
+
+# ------------------------------
+# 2. 파싱
+# ------------------------------
+def _parse_arrow(text):
+    """
+    pyarrow compute로 쉼표 제거 + 형 변환 (Python 문자열 객체를 만들지 않음)
+    숫자가 아닌 값이 하나라도 있으면 None (→ pandas 경로에서 실패 행 판별)
+    """
+    array = pa.array(text, type=pa.string(), from_pandas=True)
+    cleaned = pc.utf8_trim_whitespace(pc.replace_substring(array, ",", ""))
+    cleaned = pc.if_else(pc.is_in(cleaned, value_set=pa.array(NA_TOKENS)), pa.scalar(None, pa.string()), cleaned)
+    for target in (pa.int64(), pa.float64()):
+        try:
+            values = pc.cast(cleaned, target).to_numpy(zero_copy_only=False)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            continue
+        return pd.Series(values, index=text.index, name=text.name)
+    return None
+
+
+def parse_numeric(series):
+    """
+    쉼표 숫자 문자열 Series → 숫자 Series (벡터 연산 한 번, 모두 정수면 int64 아니면 float64)
+    반환: (숫자 Series, 실패 mask) - 실패: 값이 있지만 숫자/결측 표기가 아닌 행
+    """
+    text = _as_text(series)
+    if pa is not None:
+        parsed = _parse_arrow(text)
+        if parsed is not None:
+            return parsed, pd.Series(False, index=series.index)
+    cleaned = text.str.replace(",", "", regex=False).str.strip()
+    na_token = cleaned.isin(NA_TOKENS)
+    parsed = pd.to_numeric(cleaned.mask(na_token), errors="coerce")
+    failed = parsed.isna() & series.notna() & ~na_token
+    return parsed, failed
+
+
+def parse_numeric_columns(df, columns=None, sample_size=SAMPLE_SIZE, min_ratio=MIN_NUMERIC_RATIO):
+    """
+    숫자 컬럼을 판정해 숫자로 변환
+    - columns: 판정 없이 숫자로 변환할 컬럼 (None이면 표본으로 판정)
+    반환: (DataFrame, 실패 리포트 [{column, rows, values}, ...])
+    """
+    if columns is None:
+        columns = detect_numeric_columns(df, sample_size=sample_size, min_ratio=min_ratio)
+    report = []
+    for col in columns:
+        if col not in df.columns or pd.api.types.is_numeric_dtype(df[col].dtype):
+            continue
+        parsed, failed = parse_numeric(df[col])
+        if failed.any():
+            report.append({
+                "column": col,
+                "rows": df.index[failed.to_numpy()].tolist(),
+                "values": df.loc[failed, col].astype(str).unique().tolist(),
+            })
+        df[col] = parsed
+    return df, report
+
+
+def print_parse_report(report, limit=5):
+    """실패 리포트 출력"""
+    for item in report:
+        print(f"  ⚠️  숫자 변환 실패: {item['column']} {len(item['rows'])}행 "
+              f"(행 {item['rows'][:limit]}, 값 {item['values'][:limit]}) → NaN")
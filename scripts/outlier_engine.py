@@ -0,0 +1,199 @@
+# ==============================
+# 이상치 처리 엔진: outlier_engine.py
+# ==============================
+# 숫자 컬럼을 컬럼마다 반복하며 astype / mean / std / median / where를 따로 돌리는 대신
+# 모든 숫자 컬럼을 하나의 float 행렬로 만들고 통계를 한 번에 계산합니다.
+# - 방법: zscore(평균/표준편차), mad(중앙값/MAD), iqr(사분위 범위)
+# - 그룹: 그룹(예: 시군구 단위에서 시도)별 통계
+# - 대체 정책: median(중앙값), clip(경계값), nan(결측), keep(표시만)
+# 기본값(zscore > 3 → 컬럼 중앙값)은 기존 clean_data / handle_outliers와 결과가 같습니다.
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+METHODS = ["zscore", "mad", "iqr"]
+POLICIES = ["median", "clip", "nan", "keep"]
+DEFAULT_THRESHOLDS = {"zscore": 3.0, "mad": 3.5, "iqr": 1.5}
+
+# 정규분포에서 MAD를 표준편차 척도로 맞추는 계수
+MAD_SCALE = 1.4826
+
+
+# ------------------------------
+# 1. 숫자 컬럼 → float 행렬
+# ------------------------------
+def numeric_matrix(df, columns):
+    """
+    지정 컬럼을 (행 수 × 컬럼 수) float64 행렬로 변환
+    컬럼 방향 축약이 연속 메모리에서 일어나도록 Fortran 순서로 만듭니다.
+    """
+    matrix = np.empty((len(df), len(columns)), dtype=np.float64, order="F")
+    for j, col in enumerate(columns):
+        matrix[:, j] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    return matrix
+
+
+# ------------------------------
+# 2. 통계 (전체 / 그룹별)
+# ------------------------------
+def _matrix_stats(matrix, method):
+    """행렬 전체 기준 컬럼별 통계 → {이름: (1 × 컬럼 수) 배열}"""
+    with warnings.catch_warnings():
+        # 값이 모두 NaN인 컬럼은 통계도 NaN (판정하지 않음)
+        warnings.simplefilter("ignore", RuntimeWarning)
+        if method == "zscore":
+            # 중앙값은 이상치가 있는 컬럼에만 필요하므로 나중에 계산 (median_stats)
+            stats = {"mean": np.nanmean(matrix, axis=0, keepdims=True),
+                     "std": np.nanstd(matrix, axis=0, ddof=1, keepdims=True)}
+        elif method == "mad":
+            stats = {"median": np.nanmedian(matrix, axis=0, keepdims=True)}
+            stats["mad"] = np.nanmedian(np.abs(matrix - stats["median"]), axis=0, keepdims=True)
+        else:
+            q1, q3 = np.nanquantile(matrix, [0.25, 0.75], axis=0, keepdims=True)
+            stats = {"q1": q1, "q3": q3}
+    return stats
+
+
+def median_stats(matrix, codes, n_groups):
+    """그룹 × 컬럼별 중앙값 (대체값용)"""
+    if n_groups == 1:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.nanmedian(matrix, axis=0, keepdims=True)
+    medians = pd.DataFrame(matrix).groupby(codes, sort=True).median()
+    return medians.reindex(np.arange(n_groups)).to_numpy(dtype=np.float64)
+
+
+def _grouped_stats(matrix, codes, n_groups, method):
+    """그룹별 컬럼 통계 → {이름: (그룹 수 × 컬럼 수) 배열} (pandas groupby 한 번씩)"""
+    grouped = pd.DataFrame(matrix).groupby(codes, sort=True)
+    full_index = np.arange(n_groups)
+
+    def collect(frame):
+        return frame.reindex(full_index).to_numpy(dtype=np.float64)
+
+    if method == "zscore":
+        return {"mean": collect(grouped.mean()), "std": collect(grouped.std(ddof=1))}
+    if method == "mad":
+        median = collect(grouped.median())
+        deviation = pd.DataFrame(np.abs(matrix - median[codes]))
+        return {"median": median, "mad": collect(deviation.groupby(codes, sort=True).median())}
+    return {"q1": collect(grouped.quantile(0.25)), "q3": collect(grouped.quantile(0.75))}
+
+
+def column_stats(matrix, method="zscore", groups=None):
+    """
+    이상치 판정에 필요한 통계를 모든 컬럼에 대해 한 번에 계산
+    - groups: 행별 그룹 라벨 (None이면 전체 1개 그룹)
+    반환: (stats dict, 행별 그룹 번호 배열)
+    """
+    if groups is None:
+        return _matrix_stats(matrix, method), np.zeros(len(matrix), dtype=np.intp)
+    codes, uniques = pd.factorize(pd.Series(groups), use_na_sentinel=True)
+    # 그룹이 없는 행(NaN)은 별도 그룹으로 묶음
+    codes = np.where(codes < 0, len(uniques), codes)
+    return _grouped_stats(matrix, codes, len(uniques) + 1, method), codes
+
+
+# ------------------------------
+# 3. 판정 / 대체
+# ------------------------------
+def _per_row(values, codes):
+    """그룹 × 컬럼 통계를 행에 맞춤 (그룹이 1개면 broadcast로 충분)"""
+    return values if len(values) == 1 else values[codes]
+
+
+def outlier_bounds(stats, method="zscore", threshold=None):
+    """그룹 × 컬럼별 (하한, 상한) - 이 범위를 벗어나면 이상치"""
+    threshold = DEFAULT_THRESHOLDS[method] if threshold is None else threshold
+    with np.errstate(invalid="ignore"):
+        if method == "zscore":
+            # 표준편차가 0/NaN인 컬럼은 판정하지 않음
+            spread = np.where(stats["std"] > 0, stats["std"], np.nan)
+            center = stats["mean"]
+            return center - threshold * spread, center + threshold * spread
+        if method == "mad":
+            spread = np.where(stats["mad"] > 0, MAD_SCALE * stats["mad"], np.nan)
+            center = stats["median"]
+            return center - threshold * spread, center + threshold * spread
+        iqr = stats["q3"] - stats["q1"]
+        return stats["q1"] - threshold * iqr, stats["q3"] + threshold * iqr
+
+
+def detect_outliers(matrix, stats, codes, method="zscore", threshold=None):
+    """이상치 mask (행 수 × 컬럼 수), 경계가 NaN이면 이상치 아님"""
+    if method == "zscore":
+        # 기존 구현과 같은 비교: |x - mean| / std > threshold (임시 행렬 하나를 제자리 연산)
+        threshold = DEFAULT_THRESHOLDS[method] if threshold is None else threshold
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.where(stats["std"] > 0, stats["std"], np.nan)
+            z = np.subtract(matrix, _per_row(stats["mean"], codes))
+            np.abs(z, out=z)
+            z /= _per_row(std, codes)
+        return z > threshold
+    lower, upper = outlier_bounds(stats, method, threshold)
+    with np.errstate(invalid="ignore"):
+        return (matrix < _per_row(lower, codes)) | (matrix > _per_row(upper, codes))
+
+
+def replace_outliers(matrix, mask, stats, codes, method="zscore", threshold=None, policy="median"):
+    """정책에 따라 이상치 대체한 새 행렬"""
+    if policy not in POLICIES:
+        raise ValueError(f"알 수 없는 이상치 정책: {policy} (가능: {POLICIES})")
+    if policy == "keep":
+        return matrix
+    if policy == "median":
+        replacement = _per_row(stats["median"], codes)
+    elif policy == "nan":
+        replacement = np.nan
+    else:
+        lower, upper = outlier_bounds(stats, method, threshold)
+        replacement = np.clip(matrix, _per_row(lower, codes), _per_row(upper, codes))
+    return np.where(mask, replacement, matrix)
+
+
+# ------------------------------
+# 4. DataFrame 단위 적용
+# ------------------------------
+def handle_outliers_matrix(df, columns=None, method="zscore", threshold=None, policy="median", groups=None):
+    """
+    DataFrame의 숫자 컬럼 이상치를 한 번에 처리
+    - columns: 대상 컬럼 (None이면 모든 숫자 컬럼)
+    - groups: 그룹별 통계에 쓸 행별 라벨 (Series/배열, 또는 df 컬럼명)
+    이상치가 있는 컬럼만 float로 바뀌어 다시 쓰입니다 (기존 함수와 동일)
+    반환: (DataFrame, {컬럼: 이상치 수})
+    """
+    if method not in METHODS:
+        raise ValueError(f"알 수 없는 이상치 방법: {method} (가능: {METHODS})")
+    if policy not in POLICIES:
+        raise ValueError(f"알 수 없는 이상치 정책: {policy} (가능: {POLICIES})")
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns
+    columns = list(columns)
+    if not columns or len(df) == 0:
+        return df, {}
+    if isinstance(groups, str):
+        groups = df[groups].to_numpy()
+
+    matrix = numeric_matrix(df, columns)
+    stats, codes = column_stats(matrix, method, groups)
+    mask = detect_outliers(matrix, stats, codes, method, threshold)
+    counts = mask.sum(axis=0)
+
+    changed = np.flatnonzero(counts)
+    report = {columns[j]: int(counts[j]) for j in changed}
+    if policy == "keep" or len(changed) == 0:
+        return df, report
+
+    stats = {k: v[:, changed] for k, v in stats.items()}
+    matrix = matrix[:, changed]
+    if policy == "median" and "median" not in stats:
+        n_groups = len(next(iter(stats.values())))
+        stats["median"] = median_stats(matrix, codes, n_groups)
+    replaced = replace_outliers(matrix, mask[:, changed], stats, codes, method, threshold, policy)
+    # 바뀐 컬럼만 한 번에 다시 씀
+    changed_cols = [columns[j] for j in changed]
+    df[changed_cols] = pd.DataFrame(replaced, index=df.index, columns=changed_cols)
+    return df, report
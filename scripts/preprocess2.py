@@ -7,18 +7,19 @@ import pandas as pd
 import numpy as np
 import re
 
+from encoding_detect import read_csv_detected
+from numeric_parse import parse_numeric_columns, print_parse_report
+from outlier_engine import handle_outliers_matrix
+
 # ------------------------------
 # 1. 데이터 불러오기
 # ------------------------------
 def load_csv_with_encoding(filepath):
-    encodings = ["utf-8-sig", "utf-8", "cp949", "euc-kr", "latin1"]
-    for enc in encodings:
-        try:
-            df = pd.read_csv(filepath, encoding=enc)
-            print(f"  ✓ 불러오기 성공 (encoding={enc})")
-            return df, enc
-        except:
-            continue
+    # 바이트 샘플로 인코딩을 판별해 한 번만 파싱 (encoding_detect.py)
+    df, enc = read_csv_detected(filepath)
+    if df is not None:
+        print(f"  ✓ 불러오기 성공 (encoding={enc})")
+        return df, enc
     print(f"  ✗ 모든 인코딩 실패")
     return None, None
 
@@ -204,23 +205,8 @@ def handle_missing_values(df):
 # 6. 이상치 처리
 # ------------------------------
 def handle_outliers(df):
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    
-    for col in numeric_cols:
-        col_values = df[col].astype(float)
-        mean_val = col_values.mean()
-        std_val = col_values.std()
-        
-        if std_val == 0:
-            continue
-        
-        z_scores = (col_values - mean_val) / std_val
-        outlier_mask = np.abs(z_scores) > 3
-        
-        if outlier_mask.sum() > 0:
-            median_val = col_values.median()
-            df[col] = col_values.where(~outlier_mask, median_val)
-    
+    """z-score > 3 → 컬럼 중앙값 (모든 숫자 컬럼을 한 행렬로 한 번에 처리)"""
+    df, _ = handle_outliers_matrix(df)
     return df
 
 
@@ -230,15 +216,10 @@ def handle_outliers(df):
 def convert_numeric_strings(df):
     """
     '51,159,889' 같은 쉼표 포함 문자열을 숫자로 변환
+    (numeric_parse: 표본으로 숫자 컬럼을 판정해 한 번에 파싱, 실패한 행은 NaN + 경고)
     """
-    for col in df.columns:
-        if pd.api.types.is_object_dtype(df[col]):
-            try:
-                # 쉼표 제거 후 숫자 변환 시도
-                cleaned = df[col].astype(str).str.replace(',', '', regex=False)
-                df[col] = pd.to_numeric(cleaned, errors='coerce').fillna(df[col])
-            except:
-                pass
+    df, report = parse_numeric_columns(df)
+    print_parse_report(report)
     return df
 
 
@@ -4,203 +4,48 @@
 
 import os
 import pandas as pd
-import numpy as np
 import re
 
+import region_normalize
+import source_specs
+from encoding_detect import read_csv_detected
+from outlier_engine import handle_outliers_matrix
+from source_specs import plan_for
+
 # ------------------------------
 # 1. 데이터 불러오기
 # ------------------------------
 def load_csv_with_encoding(filepath):
-    encodings = ["utf-8-sig", "utf-8", "cp949", "euc-kr"]
-    for enc in encodings:
-        try:
-            df = pd.read_csv(filepath, encoding=enc)
-            return df, enc
-        except:
-            continue
-    return None, None
+    # 바이트 샘플로 인코딩을 판별해 한 번만 파싱 (encoding_detect.py)
+    return read_csv_detected(filepath)
 
 
 # ------------------------------
 # 2. 숫자 문자열 변환
 # ------------------------------
 def convert_numeric_strings(df):
-    """쉼표 포함 숫자를 실제 숫자로 변환"""
-    for col in df.columns:
-        if pd.api.types.is_object_dtype(df[col]):
-            try:
-                cleaned = df[col].astype(str).str.replace(',', '', regex=False)
-                numeric = pd.to_numeric(cleaned, errors='coerce')
-                # 변환 성공한 경우만 적용
-                if not numeric.isna().all():
-                    df[col] = numeric.fillna(df[col])
-            except:
-                pass
-    return df
+    """쉼표 포함 숫자를 실제 숫자로 변환 (source_specs.convert_numeric_strings)"""
+    return source_specs.convert_numeric_strings(df)
 
 
 # ------------------------------
 # 3. 지역명 표준화
 # ------------------------------
 def standardize_region_names(series):
-    """지역명 Series를 표준화"""
-    # 문자열 변환 및 정리
-    series = series.fillna("").astype(str).str.strip()
-    
-    # 빈 문자열 제거
-    mask = (series.str.len() > 0) & (series.str.lower() != "nan")
-    
-    # 괄호 제거
-    series = series.str.replace(r'\s*\([^)]*\)', '', regex=True)
-    # 영문 제거
-    series = series.str.replace(r'\s+[A-Za-z]+', '', regex=True)
-    # 공백 정리
-    series = series.str.strip()
-    
-    # 표준 명칭 매핑
-    region_map = {
-        "서울": "서울특별시",
-        "부산": "부산광역시",
-        "대구": "대구광역시",
-        "인천": "인천광역시",
-        "광주": "광주광역시",
-        "대전": "대전광역시",
-        "울산": "울산광역시",
-        "세종": "세종특별자치시",
-        "경기": "경기도",
-        "강원": "강원특별자치도",
-        "강원도": "강원특별자치도",
-        "충북": "충청북도",
-        "충남": "충청남도",
-        "전북": "전북특별자치도",
-        "전라북도": "전북특별자치도",
-        "전남": "전라남도",
-        "경북": "경상북도",
-        "경남": "경상남도",
-        "제주": "제주특별자치도",
-    }
-    
-    series = series.replace(region_map)
-    
-    return series, mask
+    """
+    지역명 Series를 표준화
+    - 괄호/코드 제거, 영문 제거, 약칭 → 정식 명칭 매핑 (region_normalize.REGION_MAP)
+    - 고유값만 한 번 정규화한 뒤 전체 행에 broadcast
+    """
+    return region_normalize.standardize_region_names(series)
 
 
 # ------------------------------
 # 4. 파일별 전처리
 # ------------------------------
 def preprocess_file(df, filename):
-    """파일 종류에 따라 적절한 전처리"""
-    
-    # 1. 평생교육기관 파일
-    if "평생교육" in filename:
-        if "Unnamed: 1" in df.columns:
-            df["region"] = df["Unnamed: 1"]
-            df = df.drop(columns=["구분", "Unnamed: 1"], errors='ignore')
-        elif "구분" in df.columns:
-            df["region"] = df["구분"]
-            df = df.drop(columns=["구분"], errors='ignore')
-        
-        # 숫자 변환
-        df = convert_numeric_strings(df)
-        
-        # 지역명 표준화
-        df["region"], mask = standardize_region_names(df["region"])
-        df = df[mask]
-        
-        # 권역 데이터 제외
-        exclude = ["합계", "전국", "수도권", "비수도권", "권역"]
-        df = df[~df["region"].str.lower().isin(exclude)]
-        
-        return df
-    
-    # 2. 위도경도 파일
-    elif "위도경도" in filename:
-        if "do" in df.columns:
-            df["region"] = df["do"]
-        
-        # 지역명 표준화
-        df["region"], mask = standardize_region_names(df["region"])
-        df = df[mask]
-        
-        # 시/군별 좌표를 광역 단위로 평균 계산
-        if "latitude" in df.columns and "longitude" in df.columns:
-            df = df.groupby("region", as_index=False).agg({
-                "latitude": "mean",
-                "longitude": "mean"
-            })
-        
-        return df
-    
-    # 3. 디지털배움터 파일
-    elif "디지털배움터" in filename:
-        if "광역지자체" in df.columns:
-            df["region"] = df["광역지자체"]
-        
-        # 숫자 변환
-        df = convert_numeric_strings(df)
-        
-        # 지역명 표준화
-        df["region"], mask = standardize_region_names(df["region"])
-        df = df[mask]
-        
-        # 기초지자체별 데이터를 광역으로 집계
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        if numeric_cols:
-            df = df.groupby("region", as_index=False)[numeric_cols].sum()
-        
-        return df
-    
-    # 4. 독거노인수 파일
-    elif "독거노인" in filename or "시도별" in filename:
-        if "시도" in df.columns:
-            df["region"] = df["시도"]
-            df = df.drop(columns=["시도"], errors='ignore')
-        
-        # 숫자 변환
-        df = convert_numeric_strings(df)
-        
-        # 지역명 표준화
-        df["region"], mask = standardize_region_names(df["region"])
-        df = df[mask]
-        
-        # 연도별 중복 제거 (최신 데이터)
-        if "연도" in df.columns:
-            df = df.sort_values("연도", ascending=False).drop_duplicates("region", keep="first")
-        
-        return df
-    
-    # 5. 인구 파일
-    elif "인구" in filename:
-        if "행정구역" in df.columns:
-            df["region"] = df["행정구역"]
-            df = df.drop(columns=["행정구역"], errors='ignore')
-        
-        # 숫자 변환
-        df = convert_numeric_strings(df)
-        
-        # 지역명 표준화
-        df["region"], mask = standardize_region_names(df["region"])
-        df = df[mask]
-        
-        return df
-    
-    # 6. 기타 파일
-    else:
-        # region 컬럼 찾기
-        region_keywords = ["행정구역", "시도", "지역", "광역지자체", "구분"]
-        for col in df.columns:
-            if any(kw in col for kw in region_keywords):
-                df["region"] = df[col]
-                break
-        
-        if "region" not in df.columns:
-            return None
-        
-        df = convert_numeric_strings(df)
-        df["region"], mask = standardize_region_names(df["region"])
-        df = df[mask]
-        
-        return df
+    """파일명에 맞는 명세(source_specs.SourceSpec)의 실행 계획으로 전처리"""
+    return plan_for(filename).transform(df)
 
 
 # ------------------------------
@@ -213,19 +58,8 @@ def clean_data(df):
         if pd.api.types.is_numeric_dtype(df[col]):
             df[col] = df[col].fillna(0)
     
-    # 이상치 (z-score > 3)
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    for col in numeric_cols:
-        values = df[col].astype(float)
-        mean = values.mean()
-        std = values.std()
-        
-        if std > 0:
-            z_scores = (values - mean) / std
-            outliers = np.abs(z_scores) > 3
-            if outliers.sum() > 0:
-                median = values.median()
-                df[col] = values.where(~outliers, median)
+    # 이상치 (z-score > 3 → 중앙값, 모든 숫자 컬럼을 한 행렬로 한 번에 처리)
+    df, _ = handle_outliers_matrix(df)
     
     return df
 
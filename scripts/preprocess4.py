@@ -2,291 +2,551 @@
 # 전처리 스크립트: preprocess.py (최종 수정본)
 # ==============================
 
+import argparse
+import contextlib
+import io
+import itertools
 import os
 import pandas as pd
 import numpy as np
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import region_normalize
+import source_specs
+from build_cache import cache_key, code_fingerprint, load_cached, prune_cache, save_cached
+from columnar_io import write_columnar
+from compact_dtypes import STRING_MODES as COMPACT_MODES, compact_frame, print_memory_report
+import delta_update
+from encoding_detect import detect_encoding, file_content_hash, read_csv_detected
+from gazetteer import is_sido_only, resolve_sido_codes, sido_name, sigungu_name
+from outlier_engine import METHODS as OUTLIER_METHODS, POLICIES as OUTLIER_POLICIES, handle_outliers_matrix
+from region_join import DUPLICATE_POLICIES, DuplicateKeyError, join_on_region, key_cardinality, resolve_duplicates
+from raw_catalog import discover_inputs, print_duplicates
+import sql_backend
+import stage_timer
+from source_specs import plan_for
+from stage_timer import stage
+from streaming_agg import aggregate_chunks
+from timeseries_store import PartitionExistsError, ingest_files
 
 # ------------------------------
 # 1. 데이터 불러오기
 # ------------------------------
-def load_csv_with_encoding(filepath):
-    encodings = ["utf-8-sig", "utf-8", "cp949", "euc-kr"]
-    for enc in encodings:
-        try:
-            df = pd.read_csv(filepath, encoding=enc)
-            return df, enc
-        except:
-            continue
-    return None, None
+def load_csv_with_encoding(filepath, cache_path=None, content_hash=None):
+    # 바이트 샘플로 인코딩을 판별해 한 번만 파싱 (encoding_detect.py)
+    return read_csv_detected(filepath, cache_path=cache_path, content_hash=content_hash)
 
 
 # ------------------------------
 # 2. 숫자 문자열 변환
 # ------------------------------
 def convert_numeric_strings(df):
-    """쉼표 포함 숫자를 실제 숫자로 변환"""
-    for col in df.columns:
-        if pd.api.types.is_object_dtype(df[col]):
-            try:
-                cleaned = df[col].astype(str).str.replace(',', '', regex=False)
-                numeric = pd.to_numeric(cleaned, errors='coerce')
-                # 변환 성공한 경우만 적용
-                if not numeric.isna().all():
-                    df[col] = numeric.fillna(df[col])
-            except:
-                pass
-    return df
+    """쉼표 포함 숫자를 실제 숫자로 변환 (source_specs.convert_numeric_strings)"""
+    return source_specs.convert_numeric_strings(df)
 
 
 # ------------------------------
 # 3. 지역명 표준화
 # ------------------------------
 def standardize_region_names(series):
-    """지역명 Series를 표준화"""
-    # 문자열 변환 및 정리
-    series = series.fillna("").astype(str).str.strip()
-    
-    # 빈 문자열 제거
-    mask = (series.str.len() > 0) & (series.str.lower() != "nan")
-    
-    # 괄호 제거
-    series = series.str.replace(r'\s*\([^)]*\)', '', regex=True)
-    # 영문 제거
-    series = series.str.replace(r'\s+[A-Za-z]+', '', regex=True)
-    # 공백 정리
-    series = series.str.strip()
-    
-    # 표준 명칭 매핑
-    region_map = {
-        "서울": "서울특별시",
-        "부산": "부산광역시",
-        "대구": "대구광역시",
-        "인천": "인천광역시",
-        "광주": "광주광역시",
-        "대전": "대전광역시",
-        "울산": "울산광역시",
-        "세종": "세종특별자치시",
-        "경기": "경기도",
-        "강원": "강원특별자치도",
-        "강원도": "강원특별자치도",
-        "충북": "충청북도",
-        "충남": "충청남도",
-        "전북": "전북특별자치도",
-        "전라북도": "전북특별자치도",
-        "전남": "전라남도",
-        "경북": "경상북도",
-        "경남": "경상남도",
-        "제주": "제주특별자치도",
-    }
-    
-    series = series.replace(region_map)
-    
-    return series, mask
+    """
+    지역명 Series를 표준화
+    - 괄호/코드 제거, 영문 제거, 약칭 → 정식 명칭 매핑 (region_normalize.REGION_MAP)
+    - 고유값만 한 번 정규화한 뒤 전체 행에 broadcast
+    """
+    return region_normalize.standardize_region_names(series)
 
 
 # ------------------------------
-# 4. 파일별 전처리
+# 4. 파일별 전처리 (source_specs.py의 명세 → 실행 계획)
 # ------------------------------
 def preprocess_file(df, filename):
-    """파일 종류에 따라 적절한 전처리"""
-    
-    # 1. 평생교육기관 파일
-    if "평생교육" in filename:
-        # Unnamed: 1이 실제 지역명
-        if "Unnamed: 1" in df.columns:
-            df["region"] = df["Unnamed: 1"]
-        elif "구분" in df.columns:
-            df["region"] = df["구분"]
-        
-        # 불필요한 컬럼 제거
-        df = df.drop(columns=["구분", "Unnamed: 1"], errors='ignore')
-        
-        # 숫자 변환
-        df = convert_numeric_strings(df)
-        
-        # NaN 제거 (첫 줄 헤더 등)
-        df = df[df["region"].notna()]
-        
-        # 지역명 표준화
-        df["region"], mask = standardize_region_names(df["region"])
-        df = df[mask]
-        
-        # 권역 데이터 제외 + "시도" 같은 헤더 제외
-        exclude = ["합계", "전국", "수도권", "비수도권", "권역", "시도"]
-        df = df[~df["region"].str.lower().isin(exclude)]
-        
-        return df
-    
-    # 2. 위도경도 파일
-    elif "위도경도" in filename:
-        # do 컬럼을 region으로 사용
-        if "do" in df.columns:
-            df["region"] = df["do"]
-        elif "docity" in df.columns:
-            # docity에서 광역시도만 추출 (예: "강원강릉시" -> "강원")
-            df["region"] = df["docity"].astype(str).str[:2]
-        
-        # 지역명 표준화
-        df["region"], mask = standardize_region_names(df["region"])
-        df = df[mask]
-        
-        # 시/군별 좌표를 광역 단위로 평균 계산
-        if "latitude" in df.columns and "longitude" in df.columns:
-            df = df.groupby("region", as_index=False).agg({
-                "latitude": "mean",
-                "longitude": "mean"
-            })
-            print(f"  ℹ️  시/군 좌표 → 광역 평균 계산")
-        
-        return df
-    
-    # 3. 디지털배움터 파일
-    elif "디지털배움터" in filename:
-        if "광역지자체" in df.columns:
-            df["region"] = df["광역지자체"]
-        
-        # 숫자 변환
-        df = convert_numeric_strings(df)
-        
-        # 지역명 표준화
-        df["region"], mask = standardize_region_names(df["region"])
-        df = df[mask]
-        
-        # 기초지자체별 데이터를 광역으로 집계
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        if numeric_cols:
-            df = df.groupby("region", as_index=False)[numeric_cols].sum()
-        
-        return df
-    
-    # 4. 독거노인수 파일
-    elif "독거노인" in filename or "시도별" in filename:
-        if "시도" in df.columns:
-            df["region"] = df["시도"]
-            df = df.drop(columns=["시도"], errors='ignore')
-        
-        # 숫자 변환
-        df = convert_numeric_strings(df)
-        
-        # 지역명 표준화
-        df["region"], mask = standardize_region_names(df["region"])
-        df = df[mask]
-        
-        # 연도별 중복 제거 (최신 데이터)
-        if "연도" in df.columns:
-            df = df.sort_values("연도", ascending=False).drop_duplicates("region", keep="first")
-        
-        return df
+    """파일명에 맞는 명세(SourceSpec)의 실행 계획으로 전처리"""
+    return plan_for(filename).transform(df)
+
+
+def supports_streaming(filename):
+    # 스트리밍 집계를 지원하는 파일 (행 단위 처리 후 지역별 집계만 하는 파일)
+    return plan_for(filename).spec.streaming
+
+
+def preprocess_file_streaming(filepath, filename, encoding, chunksize):
+    """
+    집계형 파일(위도경도 / 디지털배움터 등)을 chunk 단위로 읽으며 지역별 부분 집계
+    (streaming_agg.py) - preprocess_file과 같은 결과를 메모리 제한 안에서 계산
+    """
+    plan = plan_for(filename)
+    chunks = plan.read_chunks(filepath, encoding, chunksize)
     
-    # 5. 인구 파일
-    elif "인구" in filename:
-        if "행정구역" in df.columns:
-            df["region"] = df["행정구역"]
-            df = df.drop(columns=["행정구역"], errors='ignore')
-        
-        # 숫자 변환
-        df = convert_numeric_strings(df)
-        
-        # 지역명 표준화
-        df["region"], mask = standardize_region_names(df["region"])
-        df = df[mask]
-        
-        return df
+    # 첫 chunk에서 집계 컬럼을 정하고 이후 chunk에도 같은 컬럼을 숫자로 맞춰 집계
+    first = next(chunks, None)
+    if first is None:
+        return None
+    first = plan.prepare(first)
+    if first is None:
+        return None
+    agg_cols = plan.aggregate_columns(first)
+    numeric_cols = agg_cols if plan.spec.numeric == "auto" else None
+    prepared = itertools.chain([first], (plan.prepare(chunk, numeric_cols) for chunk in chunks))
+    if not agg_cols:
+        return pd.concat(prepared, ignore_index=True)
     
-    # 6. 기타 파일
-    else:
-        # region 컬럼 찾기
-        region_keywords = ["행정구역", "시도", "지역", "광역지자체", "구분"]
-        for col in df.columns:
-            if any(kw in col for kw in region_keywords):
-                df["region"] = df[col]
-                break
-        
-        if "region" not in df.columns:
-            return None
-        
-        df = convert_numeric_strings(df)
-        df["region"], mask = standardize_region_names(df["region"])
-        df = df[mask]
-        
-        return df
+    if plan.spec.aggregate_note:
+        print(f"  ℹ️  {plan.spec.aggregate_note} (chunk 스트리밍)")
+    if plan.spec.aggregate == "mean":
+        return aggregate_chunks(prepared, mean_cols=agg_cols)
+    return aggregate_chunks(prepared, sum_cols=agg_cols)
 
 
 # ------------------------------
 # 5. 결측치 및 이상치 처리
 # ------------------------------
-def clean_data(df):
-    """결측치 및 이상치 처리"""
-    # 결측치
-    for col in df.columns:
-        if pd.api.types.is_numeric_dtype(df[col]):
-            df[col] = df[col].fillna(0)
+# 행정구역 코드 컬럼 (값이 아니라 키이므로 결측/이상치 처리 대상에서 제외)
+KEY_COLUMNS = ["region_code", "sido_code", "sigungu_code"]
+
+
+def clean_data(df, method="zscore", policy="median", groups=None):
+    """
+    결측치 및 이상치 처리
+    - 이상치: 모든 숫자 컬럼을 한 행렬로 모아 한 번에 판정 (outlier_engine)
+      기본값은 z-score > 3 → 컬럼 중앙값
+    - groups: 그룹별 통계에 쓸 행별 라벨 (예: 시군구 단위에서 시도 코드)
+    """
+    numeric_cols = [c for c in df.select_dtypes(include=[np.number]).columns if c not in KEY_COLUMNS]
     
-    # 이상치 (z-score > 3)
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    # 결측치
     for col in numeric_cols:
-        values = df[col].astype(float)
-        mean = values.mean()
-        std = values.std()
-        
-        if std > 0:
-            z_scores = (values - mean) / std
-            outliers = np.abs(z_scores) > 3
-            if outliers.sum() > 0:
-                median = values.median()
-                df[col] = values.where(~outliers, median)
+        df[col] = df[col].fillna(0)
+    
+    # 이상치
+    df, _ = handle_outliers_matrix(df, numeric_cols, method=method, policy=policy, groups=groups)
     
     return df
 
 
 # ------------------------------
-# 6. 메인 실행
+# 6. 행정구역 코드 부여
+# ------------------------------
+def attach_region_code(df):
+    """
+    region(지역명) → region_code(시도 코드, int32) 변환 (gazetteer.py)
+    코드로 확정되지 않는 행(권역, 합계, 경상 등)은 제외하고 알림
+    """
+    codes = resolve_sido_codes(df["region"])
+    unresolved = sorted(df.loc[codes.isna(), "region"].astype(str).unique())
+    if unresolved:
+        print(f"  ℹ️  코드 없는 지역 제외: {unresolved[:5]}{'...' if len(unresolved) > 5 else ''}")
+    df = df.loc[codes.notna()].drop(columns=["region"])
+    df.insert(0, "region_code", codes[codes.notna()].astype("int32"))
+    return df
+
+
+# ------------------------------
+# 7. 시군구 단위 전처리 (--level sigungu)
+# ------------------------------
+# 시군구 정보가 있는 파일 → sigungu_code(시도 코드 2자리 + 시군구 3자리, int32) 기준
+# 시도 단위 파일(독거노인수, 평생교육기관 등) → 시도 집계표에만 병합
+def preprocess_file_sigungu(df, filename):
+    """
+    시군구 단위 전처리 (명세의 sigungu_columns / admin_code_column 사용)
+    반환: sigungu_code + 값 컬럼 DataFrame (시군구 정보가 없는 파일은 None)
+    """
+    return plan_for(filename).transform_sigungu(df)
+
+
+def add_region_labels(df, level):
+    """코드 컬럼 옆에 시도/시군구 정식 명칭 추가"""
+    if level == "sigungu":
+        df.insert(0, "sido_code", (df["sigungu_code"] // 1000).astype("int32"))
+        df.insert(1, "시도", df["sido_code"].map(sido_name))
+        df.insert(3, "시군구", df["sigungu_code"].map(sigungu_name))
+    else:
+        df.insert(0, "region", df["region_code"].map(sido_name))
+    return df
+
+
+# 시도 집계 시 합계가 아니라 평균을 내는 컬럼
+ROLLUP_MEAN_COLUMNS = ["latitude", "longitude"]
+
+
+def rollup_to_sido(sigungu_df):
+    """
+    시군구 단위 파일 결과 → 시도 집계 (원본을 다시 읽지 않음)
+    - 결측/이상치 처리 전 값을 넘겨야 시도 합계가 원본의 시도 값과 맞음 (정리는 집계 후 시도 단위로)
+    - 좌표는 평균, 나머지 숫자 컬럼은 합계 (시군구 값이 모두 비어 있으면 NaN 유지)
+    """
+    value_cols = [c for c in sigungu_df.select_dtypes(include=[np.number]).columns
+                  if c not in KEY_COLUMNS]
+    sido_codes = (sigungu_df["sigungu_code"] // 1000).astype("int32")
+    grouped = sigungu_df.assign(region_code=sido_codes).groupby("region_code")
+    agg = {c: ("mean" if c in ROLLUP_MEAN_COLUMNS else "sum") for c in value_cols}
+    rollup = grouped.agg(agg)
+    sum_cols = [c for c in value_cols if c not in ROLLUP_MEAN_COLUMNS]
+    rollup[sum_cols] = rollup[sum_cols].where(grouped[sum_cols].count() > 0)
+    return rollup.reset_index()
+
+
+def clean_sigungu(df, options):
+    """시군구 단위 파일 결과 정리 (--outlier-by sido면 같은 시도 안의 시군구끼리 비교) → compact"""
+    groups = df["sigungu_code"] // 1000 if options.get("outlier_by") == "sido" else None
+    df = clean_data(df, options.get("outlier_method", "zscore"), options.get("outlier_policy", "median"), groups)
+    return compact_processed(df, options)
+
+
+def compact_processed(df, options):
+    """--compact: 파일별 결과를 메모리 절약형 dtype으로 (병합 키 region은 병합 후 변환)"""
+    if not options.get("compact"):
+        return df
+    df, report = compact_frame(df, strings=options["compact"], exclude=["region"])
+    print_memory_report(report)
+    return df
+
+
+def clean_source(df_processed, options):
+    """시도 단위 파일 결과 정리: 결측/이상치 → (코드 기준 병합이면) 행정구역 코드 → compact"""
+    df_processed = clean_data(df_processed, options.get("outlier_method", "zscore"),
+                              options.get("outlier_policy", "median"))
+    if options.get("join_key") == "code" or options.get("level") == "sigungu":
+        df_processed = attach_region_code(df_processed)
+    return compact_processed(df_processed, options)
+
+
+# ------------------------------
+# 8. 파일 단위 처리 (불러오기 → 전처리 → 정리, 캐시 사용)
 # ------------------------------
-def main():
-    data_dir = "/Users/minseung/Desktop/agencrim/data/rawdata"
-    output_dir = "/Users/minseung/Desktop/agencrim/data/processed"
+def process_file(filepath, filename, cache_dir=None, fingerprint=None, options=None, content_hash=None):
+    """
+    파일 하나를 불러와 preprocess_file + clean_data까지 수행합니다.
+    cache_dir가 있으면 (내용 해시, 코드 fingerprint) 키로 결과를 캐시합니다.
+    options (결과에 영향을 주는 실행 옵션, fingerprint에도 포함):
+    - chunksize: 집계형 파일(위도경도, 디지털배움터)을 chunk 스트리밍으로 처리
+    - join_key: "code"면 region을 시도 코드(region_code)로 변환
+    - level: "sigungu"면 시군구 정보가 있는 파일은 sigungu_code 기준으로 처리
+      (정리 전 결과 반환 - 정리는 save_sigungu_outputs, 나머지 파일은 시도 코드 기준, 스트리밍은 사용하지 않음)
+    - outlier_method / outlier_policy / outlier_by: clean_data 이상치 처리 방식
+    - compact: "category" / "arrow"면 정리 후 메모리 절약형 dtype으로 변환 (compact_dtypes.py)
+    content_hash: 원본 카탈로그(raw_catalog.py)에서 이미 알고 있는 내용 해시 (없으면 계산)
+    반환: 처리된 DataFrame (제외/실패 시 None)
+    """
+    options = options or {}
+    chunksize = options.get("chunksize")
+    sigungu_level = options.get("level") == "sigungu"
+    content_hash = content_hash or file_content_hash(filepath)
+    key = None
+    if cache_dir is not None:
+        key = cache_key(content_hash, fingerprint, filename)
+        hit, cached = load_cached(cache_dir, key)
+        if hit:
+            if cached is None:
+                print(f"  ✓ 캐시 사용 - region 컬럼 없음 - 제외\n")
+            else:
+                print(f"  ✓ 캐시 사용: {cached.shape}\n")
+            return cached
+
+    encoding_cache = os.path.join(cache_dir, "encodings.json") if cache_dir else None
+    if chunksize and supports_streaming(filename) and not sigungu_level:
+        # 스트리밍: 파일 전체를 올리지 않고 chunk별 부분 집계
+        enc = detect_encoding(filepath, cache_path=encoding_cache, content_hash=content_hash)
+        print(f"  ✓ 스트리밍 불러오기 ({enc}, chunksize={chunksize})")
+        # 읽기/표준화/집계가 chunk 단위로 섞여 있어 집계 단계 하나로 기록
+        with stage("aggregate") as rec:
+            rec.bytes_read = os.path.getsize(filepath)
+            df_processed = preprocess_file_streaming(filepath, filename, enc, chunksize)
+            rec.rows_out = len(df_processed) if df_processed is not None else 0
+    else:
+        # 불러오기
+        # 명세의 읽기 옵션(usecols, 헤더 행 수, 고정 인코딩) 적용
+        with stage("load") as rec:
+            rec.bytes_read = os.path.getsize(filepath)
+            df, enc = plan_for(filename).read(filepath, cache_path=encoding_cache, content_hash=content_hash)
+            rec.rows_out = len(df) if df is not None else 0
+        if df is None:
+            print(f"  ✗ 불러오기 실패\n")
+            return None
+
+        print(f"  ✓ 불러오기 성공 ({enc})")
+        print(f"  원본: {df.shape}, 컬럼: {list(df.columns)[:3]}...")
+
+        # 시군구 단위 전처리 (시군구 정보가 없는 파일은 시도 단위로 진행)
+        df_processed = preprocess_file_sigungu(df, filename) if sigungu_level else None
+        if df_processed is not None:
+            # 결측/이상치 처리는 병합 단계에서 (시도 집계는 정리 전 시군구 값으로 - save_sigungu_outputs)
+            print(f"  처리 후 (시군구): {df_processed.shape}")
+            print(f"  ✓ 완료\n")
+            if key is not None:
+                save_cached(cache_dir, key, df_processed)
+            return df_processed
+
+        # 전처리
+        df_processed = preprocess_file(df, filename)
+
+    if df_processed is None or "region" not in df_processed.columns:
+        print(f"  ✗ region 컬럼 없음 - 제외\n")
+        if key is not None:
+            save_cached(cache_dir, key, None)
+        return None
+
+    # 데이터 정리
+    with stage("clean") as rec:
+        rec.rows_in = len(df_processed)
+        df_processed = clean_source(df_processed, options)
+        rec.rows_out = len(df_processed)
+
+    key_col = "region_code" if "region_code" in df_processed.columns else "region"
+    print(f"  처리 후: {df_processed.shape}")
+    print(f"  지역: {sorted(df_processed[key_col].unique().tolist())[:3]}...")
+    print(f"  ✓ 완료\n")
+
+    if key is not None:
+        save_cached(cache_dir, key, df_processed)
+    return df_processed
+
+
+def _process_file_captured(task):
+    """
+    병렬 모드 작업 단위: process_file의 출력과 단계 기록을 모아서 함께 반환
+    (여러 프로세스의 print가 섞이지 않도록 메인 프로세스에서 순서대로 출력)
+    """
+    filepath, filename, cache_dir, fingerprint, options, content_hash = task
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer), stage_timer.recording() as timer:
+        with stage_timer.labels(source=filename):
+            df = process_file(filepath, filename, cache_dir, fingerprint, options, content_hash)
+    return df, buffer.getvalue(), timer.records
+
+
+def process_files_parallel(data_dir, files, cache_dir, fingerprint, jobs, options=None, hashes=None):
+    """
+    파일들을 프로세스 풀에서 동시에 처리합니다.
+    결과와 출력은 files 순서 그대로 반환되어 순차 실행과 동일합니다.
+    """
+    hashes = hashes or {}
+    tasks = [(os.path.join(data_dir, f), f, cache_dir, fingerprint, options, hashes.get(f)) for f in files]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for filename, (df, log, records) in zip(files, executor.map(_process_file_captured, tasks)):
+            print(f"📁 {filename}")
+            print(log, end="")
+            stage_timer.merge_records(records)
+            yield filename, df
+
+
+# ------------------------------
+# 9. 메인 실행
+# ------------------------------
+def join_frames(frames, join_key, on_duplicate):
+    """join_on_region + 파일별 카디널리티 출력 (중복 키 오류 시 None)"""
+    try:
+        with stage("merge", key=join_key) as rec:
+            rec.rows_in = sum(len(df) for _, df in frames)
+            master_df, join_report = join_on_region(frames, key=join_key, on_duplicate=on_duplicate)
+            rec.rows_out = len(master_df)
+    except DuplicateKeyError as e:
+        print(f"[오류] {e}")
+        return None
+    for info in join_report:
+        dup = len(info["duplicate_keys"])
+        note = f", 중복 {dup}개 → {info['rows_used']}행 ({on_duplicate})" if dup else ""
+        print(f"+ {info['source']}: {info['rows']}행, 지역 {info['keys']}개{note}")
+    print(f"→ 병합 결과: {len(master_df)}행")
+    return master_df
+
+
+def save_master(master_df, output_dir, stem, compact=None):
+    """
+    CSV + 컬럼형 파일 (Parquet / Arrow IPC) 저장
+    compact: "category" / "arrow"면 저장 전에 메모리 절약형 dtype으로 변환하고 전후 메모리 출력
+    """
+    if compact:
+        master_df, report = compact_frame(master_df, strings=compact)
+        print_memory_report(report, detail=True)
+    output_path = os.path.join(output_dir, f"{stem}.csv")
+    with stage("write", target=stem) as rec:
+        rec.rows_in = rec.rows_out = len(master_df)
+        master_df.to_csv(output_path, index=False, encoding="utf-8-sig")
+        # 컬럼형 파일 (Parquet / Arrow IPC) - 다운스트림은 load_columnar로 필요한 컬럼만 memory-map
+        columnar_paths = write_columnar(master_df, output_dir, stem)
+    
+    print(f"💾 저장: {output_path}")
+    for path in columnar_paths:
+        print(f"💾 저장: {path}")
+    if not columnar_paths:
+        print(f"   ℹ️  pyarrow 없음 - Parquet/Arrow 저장 건너뜀")
+    print(f"   Shape: {master_df.shape}")
+
+
+def save_sigungu_outputs(all_dfs, output_dir, on_duplicate, options):
+    """
+    --level sigungu 병합/저장
+    - cleaned_master_sigungu: 시군구 단위 파일만 정리(clean_sigungu) 후 sigungu_code 기준 병합
+    - cleaned_master_sido_rollup: 정리 전 시군구 값(+ 시도 직할 행)을 시도로 집계해 시도 단위로 정리
+      + 시도 단위 파일 병합 (시군구 이상치를 중앙값으로 바꾼 뒤 합계를 내면 원본의 시도 값과 달라짐)
+    """
+    compact = options.get("compact")
+    sigungu_frames = [(f, df) for f, df in all_dfs.items() if "sigungu_code" in df.columns]
+    sido_frames = [(f, df) for f, df in all_dfs.items() if "sigungu_code" not in df.columns]
+
+    print(f"[시군구] {len(sigungu_frames)}개 파일")
+    frames = []
+    if sigungu_frames:
+        cleaned = []
+        for filename, df in sigungu_frames:
+            with stage_timer.labels(source=filename):
+                with stage("aggregate") as rec:
+                    rec.rows_in = len(df)
+                    rollup = rollup_to_sido(df)
+                    rec.rows_out = len(rollup)
+                with stage("clean") as rec:
+                    rec.rows_in = len(df) + len(rollup)
+                    # 시도 직할 행(sido_only_code)은 시도 집계에만
+                    sigungu_only = df[~is_sido_only(df["sigungu_code"]).to_numpy()]
+                    cleaned.append((filename, clean_sigungu(sigungu_only.copy(), options)))
+                    rollup = compact_processed(clean_data(rollup, options.get("outlier_method", "zscore"),
+                                                          options.get("outlier_policy", "median")), options)
+                    rec.rows_out = len(cleaned[-1][1]) + len(rollup)
+            frames.append((f"{filename} (시군구 집계)", rollup))
+
+        sigungu_df = join_frames(cleaned, "sigungu_code", on_duplicate)
+        if sigungu_df is None:
+            return False
+        sigungu_df = add_region_labels(sigungu_df, "sigungu")
+        save_master(sigungu_df, output_dir, "cleaned_master_sigungu", compact)
+        print(f"   시군구 수: {sigungu_df['sigungu_code'].nunique()}\n")
+
+    print(f"[시도] {len(sido_frames)}개 파일 + 시군구 집계")
+    rollup_df = join_frames(frames + sido_frames, "region_code", on_duplicate)
+    if rollup_df is None:
+        return False
+    rollup_df = add_region_labels(rollup_df, "sido")
+    save_master(rollup_df, output_dir, "cleaned_master_sido_rollup", compact)
+    print(f"   지역 수: {rollup_df['region'].nunique()}")
+    print(f"\n{'='*60}\n")
+    return True
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="원본 CSV 전처리 및 지역 기준 병합")
+    parser.add_argument("--data-dir", default="/Users/minseung/Desktop/agencrim/data/rawdata")
+    parser.add_argument("--output-dir", default="/Users/minseung/Desktop/agencrim/data/processed")
+    parser.add_argument("--no-cache", action="store_true", help="증분 빌드 캐시를 사용하지 않고 전부 다시 계산")
+    parser.add_argument("--on-duplicate", choices=DUPLICATE_POLICIES, default="error",
+                        help="한 파일 안에 region이 중복될 때 처리 방식 (기본: 오류)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="집계형 파일(위도경도, 디지털배움터)을 이 행 수 단위로 스트리밍 집계")
+    parser.add_argument("--join-key", choices=["region", "code"], default="region",
+                        help="병합 키: region(표준화된 지역명) / code(행정구역 코드, int32)")
+    parser.add_argument("--level", choices=["sido", "sigungu"], default="sido",
+                        help="집계 단위: sido(시도) / sigungu(시군구 마스터 + 시도 집계표, 코드 기준 병합)")
+    parser.add_argument("--outlier-method", choices=OUTLIER_METHODS, default="zscore",
+                        help="이상치 판정: zscore(>3) / mad(>3.5) / iqr(1.5배)")
+    parser.add_argument("--outlier-policy", choices=OUTLIER_POLICIES, default="median",
+                        help="이상치 대체: median / clip(경계값) / nan / keep(대체 안 함)")
+    parser.add_argument("--outlier-by", choices=["none", "sido"], default="none",
+                        help="이상치 통계 단위 (sido: --level sigungu에서 시도별로 계산)")
+    parser.add_argument("--jobs", type=int, default=1, help="파일 단위 병렬 처리 프로세스 수 (0 = CPU 코어 수)")
+    parser.add_argument("--compact", choices=COMPACT_MODES, default=None,
+                        help="메모리 절약형 dtype: 라벨은 category(반복 값) 또는 arrow 문자열, "
+                             "인원 수는 Int32, 좌표는 float32 (CSV의 정수 컬럼은 .0 없이 저장)")
+    parser.add_argument("--backend", choices=["pandas"] + sql_backend.ENGINES, default="pandas",
+                        help="pandas(메모리) / sqlite / duckdb: 원본을 내장 DB에 chunk 적재하고 "
+                             "중복 제거·집계·outer join을 SQL로 실행 (--chunksize = 적재 chunk 행 수)")
+    parser.add_argument("--db-path", default=None,
+                        help="--backend DB 파일 (기본: <output-dir>/master.sqlite 또는 master.duckdb)")
+    parser.add_argument("--timeseries-dir", default=None,
+                        help="연도/월별 원본(독거노인수, 인구)의 모든 시점을 이 시계열 저장소에 파티션으로 추가 "
+                             "(마스터는 그대로 최신 시점 사용)")
+    parser.add_argument("--delta", action="store_true",
+                        help="바뀐 원본만 다시 읽어 (region, 시점) 변경분을 cleaned_master에 반영하고 "
+                             "<output-dir>/.delta/audit.jsonl에 감사 기록 (처음 또는 코드/옵션 변경 시 전체 빌드)")
+    parser.add_argument("--metrics-jsonl", default=None,
+                        help="단계별 계측(시간, CPU, 최대 RSS, 행 수, 읽은 바이트)을 JSON-lines로 이 파일에 추가")
+    parser.add_argument("--metrics-openmetrics", default=None,
+                        help="단계별 계측을 OpenMetrics 텍스트 파일로 저장 (prometheus_client 필요)")
+    return parser.parse_args(argv)
+
+
+def source_options(args):
+    """파일별 처리 결과에 영향을 주는 실행 옵션 (캐시 fingerprint에도 포함)"""
+    return {"chunksize": args.chunksize, "join_key": args.join_key, "level": args.level,
+            "outlier_method": args.outlier_method, "outlier_policy": args.outlier_policy,
+            "outlier_by": args.outlier_by, "compact": args.compact}
+
+
+def run(args):
+    """전처리 + 병합 + 저장 (성공 여부 반환)"""
+    data_dir = args.data_dir
+    output_dir = args.output_dir
     os.makedirs(output_dir, exist_ok=True)
 
     if not os.path.exists(data_dir):
         print(f"[오류] 데이터 폴더가 존재하지 않습니다: {data_dir}")
-        return
+        return False
 
-    files = [f for f in os.listdir(data_dir) if f.endswith(".csv")]
+    # 증분 빌드 캐시: 원본 내용과 처리 코드가 그대로인 파일은 캐시에서 불러옴
+    cache_dir = None if args.no_cache else os.path.join(output_dir, ".cache")
+
+    # 입력 목록: 같은 원본이 NFC / NFD 이름으로 두 번 있거나 내용이 같은 파일은 한 번만 처리
+    # (원본 카탈로그 - 크기, 수정 시각이 그대로인 파일은 내용 해시를 다시 계산하지 않음)
+    # (해시만 계산 - 읽는 시간은 load 단계에 포함)
+    with stage("load"):
+        if cache_dir:
+            files, duplicates, catalog = discover_inputs(data_dir, os.path.join(cache_dir, "catalog.json"),
+                                                         os.path.join(cache_dir, "encodings.json"))
+        else:
+            # --no-cache: 카탈로그도 메모리에서만 (원본 폴더에 .catalog.json을 쓰지 않음)
+            files, duplicates, catalog = discover_inputs(data_dir, persist=False)
+    hashes = {f: entry["content_hash"] for f, entry in catalog.items()}
     print(f"\n{'='*60}")
     print(f"데이터 전처리 시작: {len(files)}개 파일")
     print(f"{'='*60}\n")
+    if duplicates:
+        print_duplicates(duplicates)
+        print()
+
+    # 시계열 저장소: 최신 시점만 남기기 전에 모든 시점을 (원본, 시점) 파티션으로 추가
+    if args.timeseries_dir:
+        print(f"🗂️  시계열 저장소: {args.timeseries_dir}")
+        try:
+            with stage("write", target="timeseries"):
+                ingest_files(args.timeseries_dir, data_dir, files)
+        except PartitionExistsError as e:
+            print(f"[오류] {e}")
+            return False
+        print()
+
+    if args.backend != "pandas":
+        return run_database(args, files)
+    if args.delta:
+        return run_delta(args, files, hashes)
+
+    options = source_options(args)
+    fingerprint = code_fingerprint(options) if cache_dir else None
+    if cache_dir:
+        # 처리 코드가 바뀌어 다시 쓰이지 않을 캐시 항목 정리
+        pruned = prune_cache(cache_dir, fingerprint)
+        if pruned:
+            print(f"ℹ️  이전 코드의 캐시 {pruned}개 삭제\n")
 
     all_dfs = {}
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
     
-    for filename in files:
-        print(f"📁 {filename}")
-        filepath = os.path.join(data_dir, filename)
-        
-        # 불러오기
-        df, enc = load_csv_with_encoding(filepath)
-        if df is None:
-            print(f"  ✗ 불러오기 실패\n")
-            continue
-        
-        print(f"  ✓ 불러오기 성공 ({enc})")
-        print(f"  원본: {df.shape}, 컬럼: {list(df.columns)[:3]}...")
-        
-        # 전처리
-        df_processed = preprocess_file(df, filename)
-        
-        if df_processed is None or "region" not in df_processed.columns:
-            print(f"  ✗ region 컬럼 없음 - 제외\n")
-            continue
-        
-        # 데이터 정리
-        df_processed = clean_data(df_processed)
-        
-        print(f"  처리 후: {df_processed.shape}")
-        print(f"  지역: {sorted(df_processed['region'].unique())[:3]}...")
-        print(f"  ✓ 완료\n")
-        
-        all_dfs[filename] = df_processed
+    if jobs > 1 and len(files) > 1:
+        # 병렬 모드: 파일별 처리는 서로 독립적이므로 워커 프로세스에서 동시에 수행
+        for filename, df_processed in process_files_parallel(data_dir, files, cache_dir, fingerprint, jobs, options,
+                                                               hashes):
+            if df_processed is not None:
+                all_dfs[filename] = df_processed
+    else:
+        for filename in files:
+            print(f"📁 {filename}")
+            filepath = os.path.join(data_dir, filename)
+            
+            with stage_timer.labels(source=filename):
+                df_processed = process_file(filepath, filename, cache_dir, fingerprint, options,
+                                            hashes.get(filename))
+            if df_processed is not None:
+                all_dfs[filename] = df_processed
 
     # 병합
     print(f"{'='*60}")
@@ -295,29 +555,32 @@ def main():
     
     if len(all_dfs) == 0:
         print("[오류] 처리된 파일이 없습니다")
-        return
+        return False
     
-    # 첫 번째 파일을 기준으로 시작
-    file_list = list(all_dfs.items())
-    master_df = file_list[0][1]
-    print(f"기준: {file_list[0][0]} ({master_df.shape})")
-    
-    # 나머지 파일들과 병합
-    for filename, df in file_list[1:]:
-        before = len(master_df)
-        master_df = pd.merge(master_df, df, on="region", how="outer")
-        print(f"+ {filename}: {before}행 → {len(master_df)}행")
+    if args.level == "sigungu":
+        return save_sigungu_outputs(all_dfs, output_dir, args.on_duplicate, options)
+
+    # 모든 파일을 병합 키 인덱스로 한 번에 정렬 (중복 키는 정책에 따라 처리)
+    join_key = "region_code" if args.join_key == "code" else "region"
+    master_df = join_frames(list(all_dfs.items()), join_key, args.on_duplicate)
+    if master_df is None:
+        return False
+    if join_key == "region_code":
+        # 코드 → 정식 명칭
+        master_df = add_region_labels(master_df, "sido")
     
+    finish_master(master_df, output_dir, args.compact)
+    return True
+
+
+def finish_master(master_df, output_dir, compact=None):
+    """병합 완료 출력 + cleaned_master 저장 + 최종 지역 목록"""
     print(f"\n{'='*60}")
     print(f"✅ 병합 완료!")
     print(f"{'='*60}\n")
     
     # 저장
-    output_path = os.path.join(output_dir, "cleaned_master.csv")
-    master_df.to_csv(output_path, index=False, encoding="utf-8-sig")
-    
-    print(f"💾 저장: {output_path}")
-    print(f"   Shape: {master_df.shape}")
+    save_master(master_df, output_dir, "cleaned_master", compact)
     print(f"   지역 수: {master_df['region'].nunique()}")
     print(f"\n최종 지역 목록:")
     for i, region in enumerate(sorted(master_df['region'].unique()), 1):
@@ -325,5 +588,222 @@ def main():
     print(f"\n{'='*60}\n")
 
 
+def run_database(args, files):
+    """
+    --backend sqlite / duckdb: 원본 적재, 중복 제거/집계, outer join을 내장 DB에서 SQL로 실행 (sql_backend.py)
+    파일별 결측/이상치 처리(clean_data)만 지역 수만큼으로 줄어든 집계 결과에 pandas로 적용합니다.
+    """
+    if args.level != "sido" or args.join_key != "region":
+        print(f"[오류] --backend {args.backend}는 --level sido, --join-key region에서만 사용할 수 있습니다")
+        return False
+    if args.backend == "duckdb" and sql_backend.duckdb is None:
+        print("[오류] duckdb가 설치되어 있지 않습니다: pip install duckdb (또는 --backend sqlite)")
+        return False
+    db_path = args.db_path or os.path.join(args.output_dir, sql_backend.DB_FILES[args.backend])
+    print(f"🗄️  {args.backend}: {db_path}\n")
+    db = sql_backend.Database(db_path, args.backend)
+    try:
+        fingerprint = code_fingerprint({"backend": args.backend})
+        tables = sql_backend.ingest_files(db, args.data_dir, files, fingerprint, args.chunksize)
+        if not tables:
+            print("[오류] 처리된 파일이 없습니다")
+            return False
+
+        print(f"{'='*60}")
+        print(f"집계 + 병합 (SQL): {len(tables)}개 파일")
+        print(f"{'='*60}\n")
+        cleaned = []
+        for filename, table in tables:
+            with stage_timer.labels(source=filename):
+                with stage("aggregate") as rec:
+                    df = db.query(sql_backend.source_query(db, filename, table))
+                    rec.rows_out = len(df)
+                with stage("clean") as rec:
+                    rec.rows_in = len(df)
+                    df = clean_data(df, args.outlier_method, args.outlier_policy)
+                    rec.rows_out = len(df)
+            info = key_cardinality(df)
+            try:
+                df = resolve_duplicates(df, "region", args.on_duplicate, filename)
+            except DuplicateKeyError as e:
+                print(f"[오류] {e}")
+                return False
+            clean_table = "clean_" + table[len("raw_"):]
+            db.replace(clean_table, df)
+            db.index_region(clean_table)
+            cleaned.append((filename, clean_table, [c for c in df.columns if c != "region"]))
+            dup = len(info["duplicate_keys"])
+            note = f", 중복 {dup}개 → {len(df)}행 ({args.on_duplicate})" if dup else ""
+            print(f"+ {filename}: {info['rows']}행, 지역 {info['keys']}개{note}")
+
+        with stage("merge", key="region") as rec:
+            rec.rows_in = sum(db.count_rows(t) for _, t, _ in cleaned)
+            master_df = sql_backend.build_master(db, cleaned)
+            rec.rows_out = len(master_df)
+        print(f"→ 병합 결과: {len(master_df)}행 (테이블 {sql_backend.MASTER_TABLE})")
+    finally:
+        db.close()
+
+    finish_master(master_df, args.output_dir, args.compact)
+    return True
+
+
+def load_release(filepath, filename, options):
+    """
+    --delta: 원본 하나 → (공개분 (region, 시점) DataFrame, 정리된 DataFrame)
+    (region 컬럼이 없어 제외되는 파일은 정리된 결과가 None)
+    """
+    plan = plan_for(filename)
+    with stage("load") as rec:
+        rec.bytes_read = os.path.getsize(filepath)
+        df, enc = plan.read(filepath)
+        rec.rows_out = len(df) if df is not None else 0
+    if df is None:
+        print(f"  ✗ 불러오기 실패\n")
+        return None, None
+    print(f"  ✓ 불러오기 성공 ({enc})")
+
+    raw = df.copy()
+    df_processed = preprocess_file(df, filename)
+    if df_processed is None or "region" not in df_processed.columns:
+        print(f"  ✗ region 컬럼 없음 - 제외\n")
+        return delta_update.release_frame(plan, raw, None), None
+    release = delta_update.release_frame(plan, raw, df_processed)
+    with stage("clean") as rec:
+        rec.rows_in = len(df_processed)
+        df_processed = clean_source(df_processed, options)
+        rec.rows_out = len(df_processed)
+    print(f"  처리 후: {df_processed.shape}\n")
+    return release, df_processed
+
+
+def run_delta(args, files, hashes):
+    """
+    --delta: 바뀐 원본만 다시 읽어 (region, 시점) 변경분을 계산하고 cleaned_master에 반영 (delta_update.py)
+    기준 상태가 없거나 처리 코드/옵션이 바뀌었으면 전체 빌드 후 기준 저장
+    """
+    if args.level != "sido" or args.join_key != "region":
+        print("[오류] --delta는 --level sido, --join-key region에서만 사용할 수 있습니다")
+        return False
+    state_dir = delta_update.state_dir_for(args.output_dir)
+    options = source_options(args)
+    fingerprint = code_fingerprint(options)
+    state = delta_update.load_state(state_dir)
+    master_df = None
+    if state is not None and state["fingerprint"] == fingerprint:
+        master_df = delta_update.load_frame(state_dir, state["master_key"])
+    baseline = master_df is None
+    known = {} if baseline else state["files"]
+    sources = {} if baseline else state["sources"]
+
+    changed = [f for f in files if known.get(f) != hashes[f]]
+    removed = [f for f in known if f not in files]
+    if not changed and not removed:
+        print("✓ 바뀐 원본 없음 - cleaned_master 그대로\n")
+        return True
+    if baseline:
+        print(f"ℹ️  변경분 기준 없음 (처음 실행 또는 코드/옵션 변경) → 전체 빌드 후 기준 저장\n")
+    else:
+        print(f"Δ 바뀐 원본 {len(changed)}개, 없어진 원본 {len(removed)}개 (그대로 {len(files) - len(changed)}개는 읽지 않음)\n")
+
+    releases, cleaned = {}, {}
+    for filename in changed:
+        print(f"📁 {filename}")
+        with stage_timer.labels(source=filename):
+            releases[filename], cleaned[filename] = load_release(os.path.join(args.data_dir, filename),
+                                                                 filename, options)
+
+    # 공개분 변경분: 이전 스냅샷과 (region, 시점) 키로 비교
+    release = delta_update.release_id()
+    records = []
+    if not baseline:
+        for filename in changed + removed:
+            old = None
+            if filename in known:
+                old_key = delta_update.snapshot_key(known[filename], fingerprint, filename)
+                old = delta_update.load_frame(state_dir, old_key)
+            with stage("diff", source=filename):
+                delta = delta_update.diff_frames(old, releases.get(filename))
+            print(f"Δ {filename} (region, 시점): {delta_update.format_counts(delta_update.count_changes(delta))}")
+            records += delta_update.audit_records(delta, release, "raw", filename)
+
+    # 마스터: 바뀐 원본의 블록만 교체
+    order = [f for f in files if (cleaned[f] is not None if f in cleaned else f in sources)]
+    if not order:
+        print("[오류] 처리된 파일이 없습니다")
+        return False
+    try:
+        if baseline:
+            frames = [(f, cleaned[f]) for f in order]
+            new_master = join_frames(frames, "region", args.on_duplicate)
+            if new_master is None:
+                return False
+            sources = delta_update.describe_sources(frames, new_master, "region", args.on_duplicate)
+        else:
+            updates = {f: cleaned.get(f) for f in changed + removed if f in sources or cleaned.get(f) is not None}
+            with stage("merge", key="region") as rec:
+                rec.rows_in = len(master_df)
+                new_master, sources, mode = delta_update.patch_master(master_df, sources, updates, order,
+                                                                      "region", args.on_duplicate)
+                rec.rows_out = len(new_master)
+            with stage("diff", source="cleaned_master"):
+                delta = delta_update.diff_frames(master_df.set_index("region"), new_master.set_index("region"))
+            how = "바뀐 셀만 갱신" if mode == "cells" else "원본 블록 교체 후 병합"
+            print(f"Δ cleaned_master ({how}): {delta_update.format_counts(delta_update.count_changes(delta))}")
+            records += delta_update.audit_records(delta, release, "master", "cleaned_master")
+    except DuplicateKeyError as e:
+        print(f"[오류] {e}")
+        return False
+
+    finish_master(new_master, args.output_dir, args.compact)
+
+    # 상태 저장: 스냅샷 / 마스터를 먼저 쓰고 state.json은 마지막에 교체
+    file_hashes = {f: hashes[f] for f in files}
+    for filename, frame in releases.items():
+        if frame is not None:
+            delta_update.save_frame(state_dir, delta_update.snapshot_key(hashes[filename], fingerprint, filename), frame)
+    key = delta_update.master_key(file_hashes, fingerprint)
+    delta_update.save_frame(state_dir, key, new_master)
+    delta_update.save_state(state_dir, {"fingerprint": fingerprint, "files": file_hashes, "sources": sources,
+                                        "master_key": key, "release": release})
+    # 이전 마스터는 삭제 (공개분 스냅샷은 원본별로 남겨 두어 감사 기록과 대조 가능)
+    if state is not None and state.get("master_key") not in (None, key):
+        delta_update.remove_frame(state_dir, state["master_key"])
+    if baseline:
+        records = [{"release": release, "stage": "baseline", "source": f, "op": None, "changes": {}} for f in changed]
+    delta_update.append_audit(state_dir, records)
+    print(f"📝 감사 기록: {os.path.join(state_dir, delta_update.AUDIT_FILE)} ({len(records)}건)\n")
+    return True
+
+
+def write_metrics(timer, args, status):
+    """계측 기록 저장 (--metrics-jsonl / --metrics-openmetrics)"""
+    writes = [r for r in timer.records if r.stage == "write"]
+    summary = stage_timer.run_summary(timer, status, rows_out=writes[-1].rows_out if writes else None)
+    if args.metrics_jsonl:
+        print(f"📈 계측 기록: {stage_timer.write_jsonl(timer, args.metrics_jsonl, summary)}")
+    if args.metrics_openmetrics:
+        path = stage_timer.write_openmetrics(timer, args.metrics_openmetrics, summary)
+        if path is None:
+            print(f"   ℹ️  prometheus_client 없음 - OpenMetrics 저장 건너뜀")
+        else:
+            print(f"📈 계측 기록: {path}")
+
+
+def main(argv=None):
+    """실행 → 성공 여부 (run의 결과, 실패하면 False)"""
+    args = parse_args(argv)
+    if not (args.metrics_jsonl or args.metrics_openmetrics):
+        return bool(run(args))
+    # 계측: 각 단계의 시간/CPU/RSS/행 수를 모아 실행이 끝나면(실패해도) 저장
+    status = "error"
+    with stage_timer.recording() as timer:
+        try:
+            status = "ok" if run(args) else "failed"
+        finally:
+            write_metrics(timer, args, status)
+    return status == "ok"
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(0 if main() else 1)
@@ -1,11 +1,17 @@
 import pandas as pd
 import numpy as np
 import os
+import re
+
+from columnar_io import write_columnar
+from region_normalize import map_unique
+from source_specs import read_csv_pushdown, read_header
+from stage_timer import stage
+from table_structure import read_table
 
 # ==================== 설정 ====================
-data_dir = "/Users/minseung/Desktop/agencrim/data/rawdata"
-output_dir = "/Users/minseung/Desktop/agencrim/data/processed"
-os.makedirs(output_dir, exist_ok=True)
+DATA_DIR = "/Users/minseung/Desktop/agencrim/data/rawdata"
+OUTPUT_DIR = "/Users/minseung/Desktop/agencrim/data/processed"
 
 # 지역명 표준화 사전
 REGION_MAP = {
@@ -30,100 +36,147 @@ def standardize_region(text):
     return REGION_MAP.get(text, text)
 
 # ==================== 1. 독거노인수 ====================
-print("\n1️⃣ 독거노인수 처리 중...")
-df1 = pd.read_csv(f"{data_dir}/2023 시도별 독거노인수.csv", encoding="cp949")
-# 2023년만 선택
-df1 = df1[df1['연도'] == 2023].copy()
-# 지역명 표준화
-df1['region'] = df1['시도'].apply(standardize_region)
-# 필요 컬럼만
-df1 = df1[['region', '65-69세', '70-74세', '75-79세', '80-84세', '85세이상']]
-print(f"   ✓ {df1.shape[0]}개 지역")
+def load_elderly(data_dir):
+    print("\n1️⃣ 독거노인수 처리 중...")
+    # 필요한 컬럼만 읽기 (usecols pushdown)
+    with stage("load"):
+        df1, _ = read_csv_pushdown(f"{data_dir}/2023 시도별 독거노인수.csv", encoding="cp949",
+                                   usecols=['연도', '시도', '65-69세', '70-74세', '75-79세', '80-84세', '85세이상'])
+    # 2023년만 선택
+    with stage("clean"):
+        df1 = df1[df1['연도'] == 2023].copy()
+    # 지역명 표준화
+    with stage("normalize"):
+        df1['region'] = map_unique(df1['시도'], standardize_region)
+    # 필요 컬럼만
+    df1 = df1[['region', '65-69세', '70-74세', '75-79세', '80-84세', '85세이상']]
+    print(f"   ✓ {df1.shape[0]}개 지역")
+    return df1
 
 # ==================== 2. 디지털배움터 ====================
-print("\n2️⃣ 디지털배움터 처리 중...")
-df2 = pd.read_csv(f"{data_dir}/지역별 디지털배움터.csv", encoding="cp949")
-# 광역지자체 표준화
-df2['region'] = df2['광역지자체'].apply(standardize_region)
-# 광역별 합계
-df2 = df2.groupby('region', as_index=False)['교육인원'].sum()
-df2 = df2.rename(columns={'교육인원': 'digital_education'})
-print(f"   ✓ {df2.shape[0]}개 지역")
+def load_digital(data_dir):
+    print("\n2️⃣ 디지털배움터 처리 중...")
+    with stage("load"):
+        df2, _ = read_csv_pushdown(f"{data_dir}/지역별 디지털배움터.csv", encoding="cp949",
+                                   usecols=['광역지자체', '교육인원'])
+    # 광역지자체 표준화
+    with stage("normalize"):
+        df2['region'] = map_unique(df2['광역지자체'], standardize_region)
+    # 광역별 합계
+    with stage("aggregate"):
+        df2 = df2.groupby('region', as_index=False)['교육인원'].sum()
+    df2 = df2.rename(columns={'교육인원': 'digital_education'})
+    print(f"   ✓ {df2.shape[0]}개 지역")
+    return df2
 
 # ==================== 3. 인구 ====================
-print("\n3️⃣ 인구 처리 중...")
-df3 = pd.read_csv(f"{data_dir}/257인구.csv", encoding="cp949")
-# 지역명 표준화
-df3['region'] = df3['행정구역'].apply(standardize_region)
-# "전국" 제거
-df3 = df3[df3['region'] != "전국"]
-# 쉼표 제거 및 숫자 변환
-for col in df3.columns:
-    if '2025년07월' in col:
-        df3[col] = df3[col].str.replace(',', '').astype(float)
-# 필요 컬럼만
-pop_cols = ['region', '2025년07월_전체', '2025년07월_65세이상전체']
-df3 = df3[pop_cols]
-df3 = df3.rename(columns={
-    '2025년07월_전체': 'population_total',
-    '2025년07월_65세이상전체': 'population_elderly'
-})
-print(f"   ✓ {df3.shape[0]}개 지역")
+def latest_month(columns):
+    """인구 헤더의 "YYYY년MM월_*" 컬럼 중 가장 최근 월 (예: "2025년07월")"""
+    months = sorted({c.split('_')[0] for c in columns if re.match(r"^\d{4}년\d{2}월_", c)})
+    return months[-1] if months else None
+
+def load_population(data_dir):
+    print("\n3️⃣ 인구 처리 중...")
+    path = f"{data_dir}/257인구.csv"
+    # 월이 고정되어 있지 않도록 헤더에서 가장 최근 월을 고름 (전체 월은 timeseries_store에 보관)
+    month = latest_month(read_header(path, "cp949"))
+    total_col, elderly_col = f"{month}_전체", f"{month}_65세이상전체"
+    # 필요한 컬럼만, 쉼표 숫자는 파서에서 바로 float로 (thousands + dtype pushdown)
+    with stage("load"):
+        df3, _ = read_csv_pushdown(path, encoding="cp949",
+                                   usecols=['행정구역', total_col, elderly_col],
+                                   numeric_columns=[total_col, elderly_col])
+    # 지역명 표준화
+    with stage("normalize"):
+        df3['region'] = map_unique(df3['행정구역'], standardize_region)
+    # "전국" 제거
+    with stage("clean"):
+        df3 = df3[df3['region'] != "전국"]
+    # 필요 컬럼만
+    pop_cols = ['region', total_col, elderly_col]
+    df3 = df3[pop_cols]
+    df3 = df3.rename(columns={
+        total_col: 'population_total',
+        elderly_col: 'population_elderly'
+    })
+    print(f"   ✓ {df3.shape[0]}개 지역 ({month})")
+    return df3
 
 # ==================== 4. 평생교육기관 ====================
-print("\n4️⃣ 평생교육기관 처리 중...")
-df4 = pd.read_csv(f"{data_dir}/지역별 평생교육기관.csv", encoding="utf-8-sig")
-# Unnamed: 1에 실제 지역명이 있음
-df4['region'] = df4['Unnamed: 1'].apply(standardize_region)
-# NaN이 아닌 것만
-df4 = df4[df4['region'].notna()]
-# 표준 지역명만 (17개만)
-df4 = df4[df4['region'].isin(REGION_MAP.values())]
-# 숫자 변환
-for col in ['기관수', '프로그램수', '학습자수']:
-    df4[col] = df4[col].str.replace(',', '').astype(float)
-# 필요 컬럼만
-df4 = df4[['region', '기관수', '프로그램수', '학습자수']]
-df4 = df4.rename(columns={
-    '기관수': 'education_institutions',
-    '프로그램수': 'education_programs',
-    '학습자수': 'education_students'
-})
-print(f"   ✓ {df4.shape[0]}개 지역")
+def load_education(data_dir):
+    print("\n4️⃣ 평생교육기관 처리 중...")
+    with stage("load"):
+        # 합계 / 권역 행은 읽으면서 제외("시도" 구역만), 지역명은 "구분" 열 (table_structure)
+        df4, _, _ = read_table(f"{data_dir}/지역별 평생교육기관.csv", encoding="utf-8-sig", section="시도")
+    with stage("normalize"):
+        df4['region'] = map_unique(df4['구분'], standardize_region)
+    with stage("clean"):
+        # 표준 지역명만 (17개만)
+        df4 = df4[df4['region'].isin(REGION_MAP.values())]
+    # 필요 컬럼만
+    df4 = df4[['region', '기관수', '프로그램수', '학습자수']]
+    df4 = df4.rename(columns={
+        '기관수': 'education_institutions',
+        '프로그램수': 'education_programs',
+        '학습자수': 'education_students'
+    })
+    print(f"   ✓ {df4.shape[0]}개 지역")
+    return df4
 
 # ==================== 5. 위도경도 ====================
-print("\n5️⃣ 위도경도 처리 중...")
-df5 = pd.read_csv(f"{data_dir}/위도경도.csv", encoding="utf-8-sig")
-# do 컬럼을 표준화
-df5['region'] = df5['do'].apply(standardize_region)
-# 광역별 평균 좌표
-df5 = df5.groupby('region', as_index=False)[['latitude', 'longitude']].mean()
-print(f"   ✓ {df5.shape[0]}개 지역")
-
-# ==================== 병합 ====================
-print("\n🔗 데이터 병합 중...")
-# 순차적으로 병합 (outer join으로 모든 지역 포함)
-master = df1
-master = pd.merge(master, df2, on='region', how='outer')
-master = pd.merge(master, df3, on='region', how='outer')
-master = pd.merge(master, df4, on='region', how='outer')
-master = pd.merge(master, df5, on='region', how='outer')
-
-# 정렬
-master = master.sort_values('region').reset_index(drop=True)
-
-print(f"\n✅ 완료!")
-print(f"   최종 shape: {master.shape}")
-print(f"   지역 수: {master.shape[0]}")
-print(f"\n지역 목록:")
-for i, region in enumerate(master['region'], 1):
-    print(f"   {i:2d}. {region}")
-
-# ==================== 저장 ====================
-output_path = f"{output_dir}/cleaned_final.csv"
-master.to_csv(output_path, index=False, encoding="utf-8-sig")
-print(f"\n💾 저장: {output_path}")
-
-# 샘플 출력
-print(f"\n📊 데이터 샘플 (첫 3행):")
-print(master.head(3).to_string())
+def load_coordinates(data_dir):
+    print("\n5️⃣ 위도경도 처리 중...")
+    with stage("load"):
+        df5, _ = read_csv_pushdown(f"{data_dir}/위도경도.csv", encoding="utf-8-sig",
+                                   usecols=['do', 'latitude', 'longitude'])
+    # do 컬럼을 표준화
+    with stage("normalize"):
+        df5['region'] = map_unique(df5['do'], standardize_region)
+    # 광역별 평균 좌표
+    with stage("aggregate"):
+        df5 = df5.groupby('region', as_index=False)[['latitude', 'longitude']].mean()
+    print(f"   ✓ {df5.shape[0]}개 지역")
+    return df5
+
+# ==================== 실행 ====================
+def main(data_dir=DATA_DIR, output_dir=OUTPUT_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    frames = [load_elderly(data_dir), load_digital(data_dir), load_population(data_dir),
+              load_education(data_dir), load_coordinates(data_dir)]
+
+    # ==================== 병합 ====================
+    print("\n🔗 데이터 병합 중...")
+    # 순차적으로 병합 (outer join으로 모든 지역 포함)
+    with stage("merge"):
+        master = frames[0]
+        for df in frames[1:]:
+            master = pd.merge(master, df, on='region', how='outer')
+
+        # 정렬
+        master = master.sort_values('region').reset_index(drop=True)
+
+    print(f"\n✅ 완료!")
+    print(f"   최종 shape: {master.shape}")
+    print(f"   지역 수: {master.shape[0]}")
+    print(f"\n지역 목록:")
+    for i, region in enumerate(master['region'], 1):
+        print(f"   {i:2d}. {region}")
+
+    # ==================== 저장 ====================
+    output_path = f"{output_dir}/cleaned_final.csv"
+    with stage("write"):
+        master.to_csv(output_path, index=False, encoding="utf-8-sig")
+        # 컬럼형 파일 (Parquet / Arrow IPC)
+        columnar_paths = write_columnar(master, output_dir, "cleaned_final")
+    print(f"\n💾 저장: {output_path}")
+    for path in columnar_paths:
+        print(f"💾 저장: {path}")
+
+    # 샘플 출력
+    print(f"\n📊 데이터 샘플 (첫 3행):")
+    print(master.head(3).to_string())
+    return master
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+# ==============================
+# 원본 파일 카탈로그: raw_catalog.py
+# ==============================
+# filetype.py / anothercheck.py는 구조를 출력하려고 매번 모든 원본 CSV를 인코딩 후보마다 다시 열고,
+# anothercheck.py는 파일 전체를 읽었습니다. 카탈로그는 파일별로
+#   크기, 수정 시각, 내용 해시, 판별한 인코딩, 헤더, 행 수, 컬럼별 추정 타입 / 고유값 수 / 결측 수, 앞 몇 행
+# 을 JSON 하나(<data_dir>/.catalog.json)에 저장하고, 파일이 바뀐 경우에만 다시 계산합니다.
+# - (크기, 수정 시각)이 같으면 파일을 열지 않음 / 다르면 해시를 계산해 내용이 같으면 시각만 갱신
+# - 행 수는 파싱 없이 바이트 단위 줄바꿈 개수로 계산 (따옴표 안 줄바꿈이 없는 KOSIS 표 기준)
+# - 컬럼 통계는 PROFILE_MAX_BYTES 이하 파일은 전체, 큰 파일은 앞 PROFILE_SAMPLE_ROWS행으로 계산
+# preprocess4는 카탈로그의 해시/인코딩을 재사용하고, discover_inputs로 입력 목록을 만듭니다.
+# (파일명은 NFC로 비교, 바이트가 같거나 디코딩한 내용이 같은 파일은 한 번만 처리)
+# discover_inputs는 중복 판별에 필요한 내용 해시 / text_hash만 계산하고(파싱하지 않음),
+# 헤더 / 컬럼 통계는 구조 확인(filetype.py, anothercheck.py, 이 파일의 CLI)에서만 계산합니다.
+#
+# 사용: python scripts/raw_catalog.py --data-dir data/rawdata [--detail]
+
+import argparse
+import json
+import os
+import time
+import unicodedata
+from hashlib import blake2b
+
+from encoding_detect import HASH_BLOCK_SIZE, detect_encoding, file_content_hash, read_csv_detected
+
+CATALOG_VERSION = 2
+CATALOG_FILE = ".catalog.json"
+# 저장하는 앞 행 수 (구조 확인 출력용)
+SAMPLE_ROWS = 3
+# 이보다 큰 파일은 앞 PROFILE_SAMPLE_ROWS행으로 컬럼 통계 계산
+PROFILE_MAX_BYTES = 64 * 1024 ** 2
+PROFILE_SAMPLE_ROWS = 100_000
+
+
+# ------------------------------
+# 1. 행 수 (바이트 줄바꿈 스캔)
+# ------------------------------
+def count_lines(filepath):
+    """줄 수 (마지막 줄에 줄바꿈이 없어도 한 줄로 셈, 빈 파일은 0)"""
+    lines, last = 0, b"\n"
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    return lines + (last != b"\n")
+
+
+# ------------------------------
+# 2. 컬럼 통계
+# ------------------------------
+def infer_column_type(series):
+    """
+    컬럼 추정 타입
+    integer / float / number_text("51,159,889" 같은 쉼표 숫자 문자열) / text / empty(모두 결측)
+    """
+    import pandas as pd
+    from numeric_parse import detect_numeric_columns
+
+    if series.isna().all():
+        return "empty"
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return "integer"
+    if pd.api.types.is_float_dtype(series.dtype):
+        return "float"
+    if detect_numeric_columns(series.to_frame()):
+        return "number_text"
+    return "text"
+
+
+def profile_columns(df):
+    """{컬럼: {type, cardinality, nulls}} (헤더 순서)"""
+    return {str(col): {"type": infer_column_type(df[col]),
+                       "cardinality": int(df[col].nunique(dropna=True)),
+                       "nulls": int(df[col].isna().sum())}
+            for col in df.columns}
+
+
+def _sample_rows(df, n=SAMPLE_ROWS):
+    """앞 n행 (JSON 저장용 문자열, 결측은 None)"""
+    head = df.head(n).astype(object)
+    return [[None if v != v else str(v) for v in row] for row in head.itertuples(index=False, name=None)]
+
+
+def text_hash(filepath, encoding):
+    """
+    디코딩한 내용의 해시 (인코딩 / BOM / 줄바꿈 방식 / 한글 NFC·NFD / 빈 줄 차이는 무시)
+    같은 표를 다른 인코딩으로 다시 저장한 파일도 같은 값이 됩니다.
+    """
+    h = blake2b(digest_size=16)
+    with open(filepath, encoding=encoding, errors="replace", newline=None) as f:
+        for line in f:
+            line = unicodedata.normalize("NFC", line.lstrip("\ufeff").rstrip("\n"))
+            if line.strip():
+                h.update(line.encode("utf-8") + b"\n")
+    return h.hexdigest()
+
+
+# ------------------------------
+# 3. 파일 항목
+# ------------------------------
+def scan_file(filepath, content_hash=None, encoding_cache=None):
+    """
+    파일 하나의 카탈로그 항목 계산
+    (읽을 수 없는 파일은 encoding=None, error 포함, encoding_cache: 판별 결과를 함께 저장할 encodings.json)
+    """
+    stat = os.stat(filepath)
+    content_hash = content_hash or file_content_hash(filepath)
+    entry = {
+        "filename": os.path.basename(filepath),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "content_hash": content_hash,
+        "scanned_at": time.time(),
+        "lines": count_lines(filepath),
+    }
+    nrows = None if stat.st_size <= PROFILE_MAX_BYTES else PROFILE_SAMPLE_ROWS
+    try:
+        df, encoding = read_csv_detected(filepath, cache_path=encoding_cache, content_hash=content_hash,
+                                          nrows=nrows)
+    except Exception as e:  # 구조가 깨진 파일도 항목은 남김
+        df, encoding = None, None
+        entry["error"] = f"{type(e).__name__}: {e}"
+    entry["encoding"] = encoding
+    if encoding is not None:
+        entry["text_hash"] = text_hash(filepath, encoding)
+    if df is None:
+        entry.setdefault("error", "읽을 수 있는 인코딩 없음")
+        return entry
+
+    # 헤더 1줄을 뺀 데이터 행 수
+    entry["rows"] = max(entry["lines"] - 1, 0)
+    entry["header"] = [str(c) for c in df.columns]
+    entry["columns"] = profile_columns(df)
+    entry["profiled_rows"] = len(df)
+    entry["sampled"] = nrows is not None and len(df) < entry["rows"]
+    entry["sample"] = _sample_rows(df)
+    return entry
+
+
+def hash_file(filepath, content_hash=None, encoding_cache=None):
+    """
+    중복 판별용 항목 (크기, 수정 시각, 내용 해시, 인코딩, text_hash - 파싱 / 컬럼 통계 없음)
+    인코딩은 바이트 샘플로 판별 (encoding_detect.detect_encoding)
+    """
+    stat = os.stat(filepath)
+    content_hash = content_hash or file_content_hash(filepath)
+    encoding = detect_encoding(filepath, cache_path=encoding_cache, content_hash=content_hash)
+    return {
+        "filename": os.path.basename(filepath),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "content_hash": content_hash,
+        "scanned_at": time.time(),
+        "encoding": encoding,
+        "text_hash": text_hash(filepath, encoding),
+    }
+
+
+def is_profiled(entry):
+    """scan_file 항목인지 (hash_file 항목에는 줄 수 / 헤더 / 컬럼 통계가 없음)"""
+    return "lines" in entry
+
+
+# ------------------------------
+# 4. 카탈로그 (바뀐 파일만 갱신)
+# ------------------------------
+def catalog_path_for(data_dir):
+    return os.path.join(data_dir, CATALOG_FILE)
+
+
+def load_catalog(path):
+    """{파일명: 항목} (없거나 버전이 다르면 빈 dict)"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get("files", {}) if data.get("version") == CATALOG_VERSION else {}
+
+
+def save_catalog(path, files):
+    """임시 파일에 쓴 뒤 교체 (쓸 수 없는 폴더면 False)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CATALOG_VERSION, "files": files}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+    except OSError:
+        return False
+    return True
+
+
+def refresh_catalog(data_dir, files=None, catalog_path=None, encoding_cache=None, persist=True, profile=True):
+    """
+    폴더의 CSV 항목을 최신으로 맞춤
+    - (크기, 수정 시각)이 같으면 그대로 / 내용 해시가 같으면 시각만 갱신 / 나머지는 다시 계산
+    - 폴더에서 사라진 파일 항목은 제거 (files를 지정하면 그 파일만 대상)
+    - persist=False: 카탈로그 파일을 읽지도 쓰지도 않고 메모리에서만 계산 (--no-cache)
+    - profile=False: 해시 항목만 (hash_file) - profile=True인데 해시 항목뿐이면 scan_file로 다시 계산
+    반환: ({파일명: 항목}, {"unchanged": n, "touched": n, "scanned": n, "removed": n})
+    """
+    catalog_path = catalog_path or catalog_path_for(data_dir)
+    whole_folder = files is None
+    if whole_folder:
+        files = sorted(f for f in os.listdir(data_dir) if f.endswith(".csv"))
+    catalog = load_catalog(catalog_path) if persist else {}
+    stats = {"unchanged": 0, "touched": 0, "scanned": 0, "removed": 0}
+
+    for filename in files:
+        filepath = os.path.join(data_dir, filename)
+        stat = os.stat(filepath)
+        entry = catalog.get(filename)
+        if entry is not None and profile and not is_profiled(entry):
+            entry = None
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            stats["unchanged"] += 1
+            continue
+        content_hash = file_content_hash(filepath)
+        if entry is not None and entry["content_hash"] == content_hash:
+            entry["mtime_ns"] = stat.st_mtime_ns
+            stats["touched"] += 1
+            continue
+        scan = scan_file if profile else hash_file
+        catalog[filename] = scan(filepath, content_hash, encoding_cache)
+        stats["scanned"] += 1
+
+    if whole_folder:
+        present = set(files)
+        for filename in [f for f in catalog if f not in present]:
+            del catalog[filename]
+            stats["removed"] += 1
+    if persist and (stats["touched"] or stats["scanned"] or stats["removed"]):
+        save_catalog(catalog_path, catalog)
+    return {f: catalog[f] for f in files if f in catalog}, stats
+
+
+# ------------------------------
+# 5. 입력 목록 (NFC 파일명 + 중복 제거)
+# ------------------------------
+def normalize_name(filename):
+    """파일명 NFC 정규화 (macOS에서 복사한 파일은 한글이 NFD로 분해되어 있음)"""
+    return unicodedata.normalize("NFC", filename)
+
+
+def discover_inputs(data_dir, catalog_path=None, encoding_cache=None, persist=True):
+    """
+    처리할 원본 목록
+    - 내용 해시가 같거나(동일 바이트) 디코딩한 내용이 같으면(text_hash) 한 파일만 남김
+      (NFC 이름인 파일 우선, 그다음 이름순)
+    - 순서는 os.listdir 순서 유지
+    - persist=False면 카탈로그를 메모리에서만 만듦 (원본 폴더에 아무것도 쓰지 않음)
+    - 새 / 바뀐 파일은 해시만 계산 (파싱은 이후 처리 단계에서 한 번만)
+    반환: (파일명 목록, [(건너뛴 파일, 남긴 파일, 이유)], {파일명: 카탈로그 항목})
+    """
+    files = [f for f in os.listdir(data_dir) if f.endswith(".csv")]
+    catalog, _ = refresh_catalog(data_dir, sorted(files), catalog_path, encoding_cache, persist, profile=False)
+
+    # 대표 파일 선택: NFC 이름 → 이름순
+    keep = {}
+    duplicates = []
+    for filename in sorted(files, key=lambda f: (normalize_name(f) != f, f)):
+        entry = catalog[filename]
+        keys = [("동일 바이트", entry["content_hash"])]
+        if entry.get("text_hash"):
+            keys.append(("동일 내용", entry["text_hash"]))
+        match = next(((reason, keep[key]) for reason, key in keys if key in keep), None)
+        if match is not None:
+            duplicates.append((filename, match[1], match[0]))
+            continue
+        for _, key in keys:
+            keep[key] = filename
+
+    skipped = {dup for dup, _, _ in duplicates}
+    return [f for f in files if f not in skipped], duplicates, catalog
+
+
+def print_duplicates(duplicates):
+    for dup, kept, reason in duplicates:
+        form = "" if normalize_name(dup) == dup else ", NFD 파일명"
+        print(f"  ℹ️  중복 원본 건너뜀: {dup!r} ({reason}{form} → {kept})")
+
+
+# ------------------------------
+# 6. 출력
+# ------------------------------
+def print_entry(entry, detail=True):
+    """구조 확인 출력 (인코딩, shape, 컬럼별 타입/고유값 수, 앞 몇 행)"""
+    if entry.get("encoding") is None:
+        print(f"✗ 파일을 읽을 수 없습니다. ({entry.get('error')})")
+        return
+    header = entry["header"]
+    print(f"✓ 인코딩: {entry['encoding']}")
+    print(f"Shape: ({entry['rows']}, {len(header)}) (행={entry['rows']}, 열={len(header)}, "
+          f"{entry['size'] / 1e3:.1f} KB)")
+    if not detail:
+        return
+    note = f" - 앞 {entry['profiled_rows']:,}행 기준" if entry.get("sampled") else ""
+    print(f"\n컬럼명 (총 {len(header)}개{note}):")
+    for i, col in enumerate(header, 1):
+        info = entry["columns"][col]
+        nulls = f", 결측 {info['nulls']}" if info["nulls"] else ""
+        print(f"  {i}. '{col}' - {info['type']}, 고유값 {info['cardinality']}{nulls}")
+    print(f"\n첫 {len(entry['sample'])}행 데이터:")
+    width = [max([len(str(c))] + [len(str(row[j])) for row in entry["sample"]]) for j, c in enumerate(header)]
+    print("  " + "  ".join(str(c).rjust(w) for c, w in zip(header, width)))
+    for row in entry["sample"]:
+        print("  " + "  ".join(str(v).rjust(w) for v, w in zip(row, width)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="원본 CSV 카탈로그 갱신 및 출력")
+    parser.add_argument("--data-dir", default="/Users/minseung/Desktop/agencrim/data/rawdata")
+    parser.add_argument("--catalog", default=None, help=f"카탈로그 파일 (기본: <data-dir>/{CATALOG_FILE})")
+    parser.add_argument("--detail", action="store_true", help="컬럼별 타입/고유값 수와 앞 행까지 출력")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.data_dir):
+        print(f"[오류] 폴더가 없습니다: {args.data_dir}")
+        return
+    start = time.perf_counter()
+    catalog, stats = refresh_catalog(args.data_dir, catalog_path=args.catalog)
+    elapsed = time.perf_counter() - start
+    for filename, entry in catalog.items():
+        print(f"📄 {filename}")
+        print_entry(entry, args.detail)
+        print()
+    print(f"ℹ️  {len(catalog)}개 파일 ({elapsed * 1000:.0f} ms) - 다시 계산 {stats['scanned']}, "
+          f"시각만 갱신 {stats['touched']}, 그대로 {stats['unchanged']}, 제거 {stats['removed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# ==============================
+# 지역 기준 다중 병합: region_join.py
+# ==============================
+# pd.merge(master_df, df, on="region", how="outer")를 파일 수만큼 반복하는 대신
+# 각 파일을 region 인덱스로 한 번만 만들고 한 번에 정렬(align)합니다.
+# region이 중복된 파일은 정책에 따라 오류/집계 처리하여
+# 다대다 병합으로 행이 불어나는 것을 막습니다.
+
+import pandas as pd
+import numpy as np
+
+DUPLICATE_POLICIES = ["error", "first", "sum", "mean"]
+
+
+class DuplicateKeyError(ValueError):
+    """병합 키가 유일하지 않은 파일이 있을 때 (on_duplicate="error")"""
+
+
+# ------------------------------
+# 1. 파일별 키 카디널리티
+# ------------------------------
+def key_cardinality(df, key="region"):
+    """행 수, 고유 키 수, 중복 키 목록"""
+    counts = df[key].value_counts(dropna=False)
+    duplicated = counts[counts > 1]
+    return {
+        "rows": len(df),
+        "keys": len(counts),
+        "duplicate_keys": duplicated.index.tolist(),
+    }
+
+
+# ------------------------------
+# 2. 중복 키 정책 적용
+# ------------------------------
+def resolve_duplicates(df, key="region", on_duplicate="error", name=""):
+    """
+    키가 유일하지 않을 때 정책 적용
+    - error: DuplicateKeyError
+    - first: 첫 행 유지
+    - sum / mean: 숫자 컬럼은 합계/평균, 나머지 컬럼은 첫 값
+    """
+    if on_duplicate not in DUPLICATE_POLICIES:
+        raise ValueError(f"알 수 없는 중복 정책: {on_duplicate} (가능: {DUPLICATE_POLICIES})")
+
+    if not df[key].duplicated().any():
+        return df
+
+    if on_duplicate == "error":
+        dup = df.loc[df[key].duplicated(keep=False), key].unique().tolist()
+        raise DuplicateKeyError(
+            f"{name}: '{key}' 중복 {len(dup)}개 {dup[:5]} - on_duplicate='first'/'sum'/'mean'으로 처리하세요"
+        )
+    if on_duplicate == "first":
+        return df.drop_duplicates(key, keep="first")
+
+    numeric_cols = [c for c in df.select_dtypes(include=[np.number]).columns if c != key]
+    other_cols = [c for c in df.columns if c != key and c not in numeric_cols]
+    agg = {c: on_duplicate for c in numeric_cols}
+    agg.update({c: "first" for c in other_cols})
+    return df.groupby(key, as_index=False, sort=False).agg(agg)[df.columns]
+
+
+# ------------------------------
+# 3. 컬럼명 충돌 처리 (pd.merge의 _x/_y 규칙과 동일)
+# ------------------------------
+def _resolve_column_names(column_lists):
+    """
+    각 파일의 컬럼 목록을 받아 병합 후 컬럼명을 결정합니다.
+    앞선 결과와 겹치는 컬럼은 기존 쪽에 _x, 새 쪽에 _y를 붙입니다.
+    같은 이름이 이미 쓰였다면 파일 순번을 붙입니다.
+    """
+    result = []      # 파일별 {원래 컬럼명: 새 컬럼명}
+    owner = {}       # 현재 컬럼명 → (파일 번호, 원래 컬럼명)
+    for i, columns in enumerate(column_lists):
+        mapping = {}
+        for col in columns:
+            if col in owner:
+                prev_i, prev_col = owner.pop(col)
+                left, right = f"{col}_x", f"{col}_y"
+                if left in owner or right in owner:
+                    left, right = col, f"{col}_{i}"
+                result[prev_i][prev_col] = left
+                owner[left] = (prev_i, prev_col)
+                mapping[col] = right
+                owner[right] = (i, col)
+            else:
+                mapping[col] = col
+                owner[col] = (i, col)
+        result.append(mapping)
+    return result
+
+
+# ------------------------------
+# 4. 한 번에 병합
+# ------------------------------
+def join_on_region(frames, key="region", on_duplicate="error"):
+    """
+    여러 DataFrame을 key 기준 outer join으로 한 번에 병합합니다.
+    - frames: [(이름, DataFrame), ...] (병합 순서 = 컬럼 순서)
+    - 결과 행은 key 정렬 순서 (pd.merge outer와 동일)
+    반환: (병합 DataFrame, 파일별 카디널리티 리포트 리스트)
+    """
+    report = []
+    indexed = []
+    for name, df in frames:
+        info = key_cardinality(df, key)
+        df = resolve_duplicates(df, key, on_duplicate, name)
+        info.update({"source": name, "rows_used": len(df)})
+        report.append(info)
+        indexed.append(df.set_index(key))
+
+    mappings = _resolve_column_names([list(df.columns) for df in indexed])
+    indexed = [df.rename(columns=mapping) for df, mapping in zip(indexed, mappings)]
+
+    if not indexed:
+        return pd.DataFrame(columns=[key]), report
+
+    all_keys = indexed[0].index
+    for df in indexed[1:]:
+        all_keys = all_keys.union(df.index, sort=False)
+    all_keys = all_keys.sort_values()
+
+    master_df = pd.concat([df.reindex(all_keys) for df in indexed], axis=1)
+    master_df.index.name = key
+    return master_df.reset_index(), report
@@ -0,0 +1,117 @@
+# ==============================
+# 지역명 정규화 엔진: region_normalize.py
+# ==============================
+# 지역 컬럼은 행이 수백만 개여도 고유값은 수백 개 이하입니다.
+# 컬럼을 factorize해서 고유값만 한 번 정규화한 뒤 전체 행에 broadcast합니다.
+# 결과는 기존 standardize_region_names / standardize_region과 값이 같습니다.
+
+import numpy as np
+import pandas as pd
+
+# 표준 명칭 매핑 (preprocess3/4의 region_map과 동일)
+REGION_MAP = {
+    "서울": "서울특별시",
+    "부산": "부산광역시",
+    "대구": "대구광역시",
+    "인천": "인천광역시",
+    "광주": "광주광역시",
+    "대전": "대전광역시",
+    "울산": "울산광역시",
+    "세종": "세종특별자치시",
+    "경기": "경기도",
+    "강원": "강원특별자치도",
+    "강원도": "강원특별자치도",
+    "충북": "충청북도",
+    "충남": "충청남도",
+    "전북": "전북특별자치도",
+    "전라북도": "전북특별자치도",
+    "전남": "전라남도",
+    "경북": "경상북도",
+    "경남": "경상남도",
+    "제주": "제주특별자치도",
+}
+
+
+# ------------------------------
+# 1. 고유값 단위 적용 + broadcast
+# ------------------------------
+def _broadcast(series, codes, unique_results, categorical):
+    """
+    고유값별 결과(unique_results, NaN 자리는 마지막 원소)를 codes로 전체 행에 펼침
+    - categorical=True면 결과를 다시 factorize해 Categorical로 반환
+    """
+    codes = np.where(codes < 0, len(unique_results) - 1, codes)
+    if categorical:
+        result_codes, categories = pd.factorize(pd.Series(unique_results, dtype=object))
+        values = pd.Categorical.from_codes(result_codes[codes], categories=categories)
+    else:
+        values = np.asarray(unique_results, dtype=object)[codes]
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def _factorize_exact(series):
+    """
+    pd.factorize와 같지만, object 컬럼에 문자열이 아닌 값이 섞여 있으면
+    1 / 1.0 / True처럼 값은 같고 str() 결과가 다른 원소를 구분합니다.
+    반환: (codes, uniques) - NaN은 -1
+    """
+    if not pd.api.types.is_object_dtype(series.dtype):
+        return pd.factorize(series, use_na_sentinel=True)
+    if pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty"):
+        return pd.factorize(series, use_na_sentinel=True)
+
+    # 드문 경우: 타입까지 포함한 키로 factorize
+    isna = series.isna().to_numpy()
+    keys = [None if na else (type(v), v) for v, na in zip(series.to_numpy(), isna)]
+    codes, _ = pd.factorize(pd.Series(keys, dtype=object), use_na_sentinel=True)
+    _, first = np.unique(codes[codes >= 0], return_index=True)
+    uniques = series.to_numpy()[np.flatnonzero(codes >= 0)[first]]
+    return codes, uniques
+
+
+def map_unique(series, func, categorical=False):
+    """
+    series.apply(func)와 같은 결과를 고유값마다 한 번씩만 func를 호출해 계산
+    (NaN은 func(np.nan)으로 한 번 처리)
+    """
+    codes, uniques = _factorize_exact(series)
+    unique_results = [func(v) for v in uniques] + [func(np.nan)]
+    return _broadcast(series, codes, unique_results, categorical)
+
+
+# ------------------------------
+# 2. 지역명 표준화 (preprocess3/4 standardize_region_names와 동일 규칙)
+# ------------------------------
+def _standardize_unique_values(values, region_map):
+    """고유값 Series에 기존 4단계 문자열 처리 + 매핑 적용 → (표준화 값, mask)"""
+    values = values.fillna("").astype(str).str.strip()
+
+    # 빈 문자열 제거
+    mask = (values.str.len() > 0) & (values.str.lower() != "nan")
+
+    # 괄호 제거
+    values = values.str.replace(r'\s*\([^)]*\)', '', regex=True)
+    # 영문 제거
+    values = values.str.replace(r'\s+[A-Za-z]+', '', regex=True)
+    # 공백 정리
+    values = values.str.strip()
+
+    values = values.replace(region_map)
+    return values, mask
+
+
+def standardize_region_names(series, region_map=None, categorical=False):
+    """
+    지역명 Series를 표준화 (고유값만 정규화 후 broadcast)
+    반환: (표준화 Series, 유효 mask Series) - 기존 함수와 같은 형태
+    """
+    region_map = REGION_MAP if region_map is None else region_map
+    codes, uniques = _factorize_exact(series)
+
+    # 마지막 원소는 NaN 자리
+    unique_values = pd.Series(list(uniques) + [np.nan], dtype=object)
+    values, mask = _standardize_unique_values(unique_values, region_map)
+
+    result = _broadcast(series, codes, values.tolist(), categorical)
+    valid = _broadcast(series, codes, mask.tolist(), False).astype(bool)
+    return result, valid
@@ -0,0 +1,494 @@
+# ==============================
+# 원본 파일 명세 레지스트리: source_specs.py
+# ==============================
+# 파일명 키워드로 분기하던 preprocess_file의 특수 처리를 선언적인 명세(SourceSpec)로 옮겼습니다.
+# 명세 하나가 region 컬럼, 남길/버릴 컬럼, 숫자 컬럼, 집계 방식, 헤더 행 수, 인코딩, 중복 제거 키를
+# 정하고, compile_spec이 이를 읽기 옵션(read_csv 인자) + 변환 단계로 이루어진 SourcePlan으로 만듭니다.
+# 새 KOSIS 파일은 SOURCE_SPECS에 명세를 추가하면 같은 경로(컬럼 pruning, 스트리밍 집계,
+# 시군구 처리)를 그대로 사용합니다.
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+import region_normalize
+from encoding_detect import detect_encoding, read_csv_detected
+from gazetteer import (admin_code_to_sigungu, parse_admin_code, resolve_sido_codes, resolve_sigungu_codes,
+                       sido_only_code)
+from numeric_parse import parse_numeric_columns, print_parse_report
+from stage_timer import stage
+from table_structure import is_raw_frame, print_layout, read_table, structure_frame
+
+
+@dataclass(frozen=True)
+class SourceSpec:
+    """
+    원본 파일 하나의 처리 명세
+    - keywords: 파일명에 하나라도 포함되면 이 명세 사용 (SOURCE_SPECS 순서대로 검사)
+    - region_columns: region으로 쓸 컬럼 후보 (앞에서부터 있는 컬럼 사용)
+    - region_prefix: {컬럼: n} - 해당 컬럼이면 앞 n글자만 사용 (예: "강원강릉시" → "강원")
+    - region_keywords: 컬럼명에 키워드가 포함된 첫 컬럼을 region으로 사용 (후보가 없을 때)
+    - usecols: 읽을 컬럼 (None이면 전체, 없는 컬럼은 무시)
+    - drop_columns: region 지정 후 버릴 컬럼
+    - numeric: "auto"면 쉼표 숫자 문자열 변환, None이면 변환 안 함
+    - numeric_columns / numeric_pattern: 파서에서 바로 float64로 읽을 컬럼 (이름 / 정규식)
+    - thousands: 천 단위 구분자 (numeric 컬럼을 파서가 바로 숫자로 읽도록)
+    - exclude_regions: 표준화 후 제외할 region 값 (합계, 권역 등)
+    - dedup_sort: (정렬 컬럼, 오름차순 여부) - 정렬 후 region별 첫 행만 유지 (예: 최신 연도)
+    - aggregate: "sum" / "mean" / None - region별 집계
+    - aggregate_columns: 집계 컬럼 (None이면 모든 숫자 컬럼, 지정 컬럼이 없으면 집계 안 함)
+    - aggregate_note: 집계 시 출력할 안내
+    - header_rows: 헤더 행 수 (2 이상이면 여러 줄 헤더를 "_"로 이어 한 줄로)
+    - structured: 구조 파서(table_structure.py)로 읽기 - 헤더 영역 / 구역 열 / 합계·단위 행을 읽으면서 판별해
+      데이터 행만 남김 (라벨 열은 헤더 이름, 값 열은 float64)
+    - section: structured 표에서 남길 구역 (구역 열의 값, 예: "시도" - None이면 시도명 기준으로 선택)
+    - encoding: 고정 인코딩 (None이면 바이트 샘플로 판별)
+    - streaming: chunk 스트리밍 집계 가능 여부 (행 단위 처리 + 집계만 하는 파일)
+    - sigungu_columns: (시도 컬럼, 시군구 컬럼) - --level sigungu에서 시군구 코드 판별
+    - admin_code_column: 10자리 행정기관코드가 들어 있는 컬럼 (시군구 행 판별용)
+    - period_column: 시점(연도 등) 컬럼 - 시계열 저장소에 시점별로 나눠 저장 (timeseries_store.py)
+    - period_pattern: 시점이 컬럼명에 들어 있는 경우의 정규식 (그룹: 연도, 월, 항목)
+      예: "2025년07월_전체" → 시점 2025-07, 항목 "전체"
+    """
+    name: str
+    keywords: tuple = ()
+    region_columns: tuple = ()
+    region_prefix: tuple = ()
+    region_keywords: tuple = ()
+    usecols: tuple = None
+    drop_columns: tuple = ()
+    numeric: str = "auto"
+    numeric_columns: tuple = None
+    numeric_pattern: str = None
+    thousands: str = None
+    exclude_regions: tuple = ()
+    dedup_sort: tuple = None
+    aggregate: str = None
+    aggregate_columns: tuple = None
+    aggregate_note: str = None
+    header_rows: int = 1
+    structured: bool = False
+    section: str = None
+    encoding: str = None
+    streaming: bool = False
+    sigungu_columns: tuple = None
+    admin_code_column: str = None
+    period_column: str = None
+    period_pattern: str = None
+
+
+# 검사 순서 = 우선순위 (마지막 "기타"는 모든 파일에 해당)
+SOURCE_SPECS = [
+    SourceSpec(
+        name="평생교육기관",
+        keywords=("평생교육",),
+        # 합계 / 권역(수도권, 비수도권) 행은 구조 파서가 읽으면서 제외 → "시도" 구역 행만
+        region_columns=("구분",),
+        drop_columns=("구분",),
+        structured=True,
+        section="시도",
+    ),
+    SourceSpec(
+        name="위도경도",
+        keywords=("위도경도",),
+        region_columns=("do", "docity"),
+        region_prefix=(("docity", 2),),
+        usecols=("docity", "do", "city", "latitude", "longitude"),
+        numeric=None,
+        aggregate="mean",
+        aggregate_columns=("latitude", "longitude"),
+        aggregate_note="시/군 좌표 → 광역 평균 계산",
+        streaming=True,
+        sigungu_columns=("do", "city"),
+    ),
+    SourceSpec(
+        name="디지털배움터",
+        keywords=("디지털배움터",),
+        region_columns=("광역지자체",),
+        usecols=("광역지자체", "기초지자체", "교육인원"),
+        aggregate="sum",
+        streaming=True,
+        sigungu_columns=("광역지자체", "기초지자체"),
+    ),
+    SourceSpec(
+        name="독거노인수",
+        keywords=("독거노인", "시도별"),
+        region_columns=("시도",),
+        drop_columns=("시도",),
+        dedup_sort=("연도", False),
+        period_column="연도",
+    ),
+    SourceSpec(
+        name="인구",
+        keywords=("인구",),
+        region_columns=("행정구역",),
+        drop_columns=("행정구역",),
+        numeric_pattern=r"^\d{4}년\d{2}월_",
+        thousands=",",
+        admin_code_column="행정구역",
+        period_pattern=r"^(\d{4})년(\d{2})월_(.+)$",
+    ),
+    SourceSpec(
+        name="기타",
+        region_keywords=("행정구역", "시도", "지역", "광역지자체", "구분"),
+    ),
+]
+
+
+def find_spec(filename, specs=None):
+    """파일명에 맞는 명세 (키워드가 없는 명세는 기본값, 파일명은 NFC로 비교)"""
+    filename = unicodedata.normalize("NFC", filename)
+    for spec in specs or SOURCE_SPECS:
+        if not spec.keywords or any(kw in filename for kw in spec.keywords):
+            return spec
+    return None
+
+
+# ------------------------------
+# 1. 공통 변환
+# ------------------------------
+def convert_numeric_strings(df):
+    """
+    쉼표 포함 숫자 컬럼을 실제 숫자로 변환 (numeric_parse)
+    표본으로 숫자 컬럼을 판정해 한 번에 파싱하고, 읽지 못한 행은 NaN + 경고 출력
+    """
+    df, report = parse_numeric_columns(df)
+    print_parse_report(report)
+    return df
+
+
+def flatten_header(columns):
+    """여러 줄 헤더(MultiIndex) → "상위_하위" 한 줄 (빈 칸/Unnamed 부분은 생략)"""
+    names = []
+    for parts in columns:
+        parts = [str(p).strip() for p in parts
+                 if pd.notna(p) and str(p).strip() and not str(p).startswith("Unnamed:")]
+        names.append("_".join(dict.fromkeys(parts)))
+    return names
+
+
+# ------------------------------
+# 2. 컬럼 / 타입 pushdown 읽기
+# ------------------------------
+def pushdown_kwargs(columns, usecols=None, numeric_columns=None, numeric_pattern=None, thousands=None):
+    """
+    헤더(컬럼 목록)를 보고 read_csv 인자를 만듦
+    - usecols: 읽을 컬럼 이름 목록 또는 정규식 (None이면 전체, 없는 컬럼은 무시)
+    - numeric_columns / numeric_pattern: 읽는 컬럼 중 float64로 바로 파싱할 컬럼
+    - thousands: "51,159,889" 같은 값을 파서가 바로 숫자로 읽도록
+    """
+    kwargs = {}
+    if usecols is not None:
+        if isinstance(usecols, str):
+            selected = [c for c in columns if re.search(usecols, c)]
+        else:
+            wanted = set(usecols)
+            selected = [c for c in columns if c in wanted]
+        kwargs["usecols"] = selected
+        columns = selected
+    numeric = set(numeric_columns or ())
+    dtype = {c: "float64" for c in columns
+             if c in numeric or (numeric_pattern and re.search(numeric_pattern, c))}
+    if dtype:
+        kwargs["dtype"] = dtype
+    if thousands:
+        kwargs["thousands"] = thousands
+    return kwargs
+
+
+def read_header(filepath, encoding, **read_kwargs):
+    """헤더 행만 읽어 컬럼 목록 반환 (데이터 행은 파싱하지 않음)"""
+    return [str(c) for c in pd.read_csv(filepath, encoding=encoding, nrows=0, **read_kwargs).columns]
+
+
+def read_csv_pushdown(filepath, usecols=None, numeric_columns=None, numeric_pattern=None, thousands=",",
+                      encoding=None, cache_path=None, content_hash=None, **read_kwargs):
+    """
+    필요한 컬럼만, 숫자 컬럼은 파서에서 바로 float64로 읽기
+    (안 쓰는 컬럼은 만들지 않고, 숫자는 Python 문자열을 거치지 않음)
+    숫자로 읽을 수 없는 값이 있으면 dtype 없이 다시 읽습니다.
+    반환: (DataFrame, encoding) / 판별한 인코딩으로 읽지 못하면 (None, None)
+    """
+    fixed = encoding
+    encoding = encoding or detect_encoding(filepath, cache_path=cache_path, content_hash=content_hash)
+    try:
+        header = read_header(filepath, encoding, **read_kwargs)
+    except ValueError as e:
+        if fixed and isinstance(e, UnicodeDecodeError):
+            raise
+        # 빈 파일 / 헤더를 파싱할 수 없는 파일 (EmptyDataError, ParserError) - 다른 읽기 실패처럼 건너뜀
+        print(f"  ⚠️  헤더를 읽을 수 없음 ({type(e).__name__})")
+        return None, None
+    kwargs = pushdown_kwargs(header, usecols, numeric_columns, numeric_pattern, thousands)
+
+    def read(**kw):
+        if fixed:
+            return pd.read_csv(filepath, encoding=fixed, **kw, **read_kwargs), fixed
+        # 판별한 인코딩 + 디코딩 오류 시 후보 인코딩 재시도 (encoding_detect)
+        return read_csv_detected(filepath, cache_path=cache_path, content_hash=content_hash, **kw, **read_kwargs)
+
+    try:
+        df, encoding = read(**kwargs)
+    except UnicodeDecodeError:
+        # ValueError의 하위 클래스 - 인코딩 문제는 dtype 없이 다시 읽어도 같으므로 그대로 전달
+        raise
+    except ValueError:
+        if "dtype" not in kwargs:
+            raise
+        df = None
+    # 판별한 인코딩 경로는 파싱 오류를 (None, None)으로 돌려주므로 같이 재시도
+    if df is None and "dtype" in kwargs:
+        print(f"  ℹ️  숫자 컬럼에 숫자가 아닌 값 - dtype 없이 다시 읽음")
+        kwargs.pop("dtype")
+        return read(**kwargs)
+    return df, encoding
+
+
+# ------------------------------
+# 3. 실행 계획
+# ------------------------------
+class SourcePlan:
+    """명세를 컴파일한 읽기 옵션 + 변환 단계"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.read_kwargs = {}
+        if spec.header_rows > 1:
+            self.read_kwargs["header"] = list(range(spec.header_rows))
+        # 헤더를 먼저 보고 usecols/dtype을 정해야 하는지 (여러 줄 헤더는 제외)
+        self.pushdown = spec.header_rows == 1 and any([
+            spec.usecols is not None, spec.numeric_columns, spec.numeric_pattern, spec.thousands])
+        self.region_prefix = dict(spec.region_prefix)
+
+    # --- 읽기 ---
+    def read(self, filepath, cache_path=None, content_hash=None):
+        """파일 전체 읽기 → (DataFrame, encoding)"""
+        if self.spec.structured:
+            df, encoding, layout = read_table(filepath, self.spec.encoding, cache_path, content_hash,
+                                           section=self.spec.section)
+            print_layout(layout)
+            return df, encoding
+        if self.pushdown:
+            spec = self.spec
+            return read_csv_pushdown(filepath, spec.usecols, spec.numeric_columns, spec.numeric_pattern,
+                                     spec.thousands, spec.encoding, cache_path, content_hash)
+        if self.spec.encoding:
+            return pd.read_csv(filepath, encoding=self.spec.encoding, **self.read_kwargs), self.spec.encoding
+        return read_csv_detected(filepath, cache_path=cache_path, content_hash=content_hash, **self.read_kwargs)
+
+    def read_chunks(self, filepath, encoding, chunksize):
+        encoding = self.spec.encoding or encoding
+        if self.spec.structured:
+            # 구조 판별(구역 선택)에 파일 전체가 필요 - chunk 하나로 반환
+            return iter([read_table(filepath, encoding, section=self.spec.section)[0]])
+        kwargs = dict(self.read_kwargs)
+        try:
+            if self.pushdown:
+                spec = self.spec
+                kwargs.update(pushdown_kwargs(read_header(filepath, encoding), spec.usecols, spec.numeric_columns,
+                                              spec.numeric_pattern, spec.thousands))
+            return pd.read_csv(filepath, encoding=encoding, chunksize=chunksize, **kwargs)
+        except ValueError as e:
+            # 빈 파일 / 헤더를 파싱할 수 없는 파일 - chunk 없음 (호출하는 쪽에서 건너뜀)
+            print(f"  ⚠️  헤더를 읽을 수 없음 ({type(e).__name__})")
+            return iter(())
+
+    # --- 행 단위 단계 ---
+    def _assign_region(self, df):
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = flatten_header(df.columns)
+        for col in self.spec.region_columns:
+            if col in df.columns:
+                if col in self.region_prefix:
+                    df["region"] = df[col].astype(str).str[:self.region_prefix[col]]
+                else:
+                    df["region"] = df[col]
+                return df
+        if self.spec.region_keywords:
+            for col in df.columns:
+                if any(kw in col for kw in self.spec.region_keywords):
+                    df["region"] = df[col]
+                    break
+        return df
+
+    def _convert(self, df, numeric_cols=None):
+        if self.spec.numeric == "auto":
+            df = convert_numeric_strings(df)
+        # chunk마다 판정이 달라지지 않도록 지정 컬럼은 숫자로 강제 변환
+        if numeric_cols:
+            df, report = parse_numeric_columns(df, columns=numeric_cols)
+            print_parse_report(report)
+        return df
+
+    def prepare(self, df, numeric_cols=None):
+        """
+        집계 전 행 단위 처리: region 지정 → 컬럼 제거 → 숫자 변환 → 지역명 표준화 → 제외
+        반환: DataFrame (region 컬럼을 찾지 못하면 None)
+        """
+        if self.spec.structured and is_raw_frame(df, self.spec.section):
+            # read_csv로 그대로 읽은 표 (예: preprocess3) - 구역 열 / 합계 행이 남아 있으므로 구조 판별부터
+            df, layout = structure_frame(df, self.spec.section)
+            print_layout(layout)
+        df = self._assign_region(df)
+        if "region" not in df.columns:
+            return None
+        if self.spec.drop_columns:
+            df = df.drop(columns=list(self.spec.drop_columns), errors='ignore')
+        df = self._convert(df, numeric_cols)
+
+        df["region"], mask = region_normalize.standardize_region_names(df["region"])
+        df = df[mask]
+
+        if self.spec.exclude_regions:
+            df = df[~df["region"].str.lower().isin(self.spec.exclude_regions)]
+        return df
+
+    # --- 집계 ---
+    def aggregate_columns(self, df):
+        """집계 대상 컬럼 (집계하지 않는 파일이거나 대상이 없으면 빈 리스트)"""
+        if self.spec.aggregate is None:
+            return []
+        if self.spec.aggregate_columns is not None:
+            cols = list(self.spec.aggregate_columns)
+            return cols if all(c in df.columns for c in cols) else []
+        return df.select_dtypes(include=[np.number]).columns.tolist()
+
+    def transform(self, df):
+        """파일 전체 전처리 (preprocess_file)"""
+        with stage("normalize") as rec:
+            rec.rows_in = len(df)
+            df = self.prepare(df)
+            rec.rows_out = len(df) if df is not None else 0
+        if df is None:
+            return None
+
+        with stage("aggregate") as rec:
+            rec.rows_in = len(df)
+            if self.spec.dedup_sort and self.spec.dedup_sort[0] in df.columns:
+                sort_col, ascending = self.spec.dedup_sort
+                df = df.sort_values(sort_col, ascending=ascending).drop_duplicates("region", keep="first")
+
+            agg_cols = self.aggregate_columns(df)
+            if agg_cols:
+                df = df.groupby("region", as_index=False)[agg_cols].agg(self.spec.aggregate)
+                if self.spec.aggregate_note:
+                    print(f"  ℹ️  {self.spec.aggregate_note}")
+            rec.rows_out = len(df)
+        return df
+
+    # --- 시점별 분할 ---
+    def split_periods(self, df):
+        """
+        시점별 DataFrame (region + 값 컬럼) - 최신 시점만 남기지 않고 모든 시점을 그대로 나눔
+        반환: {시점: DataFrame} (시점 정보가 없는 파일은 None)
+        """
+        spec = self.spec
+        if spec.period_column is None and spec.period_pattern is None:
+            return None
+        df = self.prepare(df)
+        if df is None:
+            return None
+        if spec.period_column is not None:
+            if spec.period_column not in df.columns:
+                return None
+            periods = {}
+            for value, part in df.groupby(spec.period_column, sort=True):
+                periods[format_period(value)] = part.drop(columns=[spec.period_column]).reset_index(drop=True)
+            return periods or None
+
+        # 컬럼명의 시점별로 묶어 "항목" 이름으로 바꿈
+        groups = {}
+        for col in df.columns:
+            match = re.match(spec.period_pattern, str(col))
+            if match:
+                year, month, measure = match.groups()
+                groups.setdefault(f"{year}-{month}", {})[col] = measure
+        periods = {}
+        for period in sorted(groups):
+            part = df[["region"] + list(groups[period])].rename(columns=groups[period])
+            periods[period] = part.reset_index(drop=True)
+        return periods or None
+
+    # --- 시군구 ---
+    def sigungu_codes(self, df):
+        """행별 시군구 코드 (시군구 정보가 없는 파일은 None)"""
+        if self.spec.sigungu_columns and all(c in df.columns for c in self.spec.sigungu_columns):
+            sido_col, sigungu_col = self.spec.sigungu_columns
+            return resolve_sigungu_codes(df[sido_col], df[sigungu_col])
+        if self.spec.admin_code_column and self.spec.admin_code_column in df.columns:
+            admin_codes = df[self.spec.admin_code_column].map(parse_admin_code)
+            return admin_codes.map(lambda c: admin_code_to_sigungu(c) if pd.notna(c) else None)
+        return None
+
+    def transform_sigungu(self, df):
+        """
+        시군구 단위 전처리
+        반환: sigungu_code + 값 컬럼 DataFrame (시군구 정보가 없는 파일은 None)
+        시도 / 시군구 컬럼으로 판별하는 파일에서 시군구는 없지만 시도는 확정되는 행(예: "이동형 교육")은
+        sido_only_code 행으로 남김 - 시군구 마스터에서는 빠지고 시도 집계에만 포함
+        """
+        codes = self.sigungu_codes(df)
+        if codes is None:
+            return None
+        with stage("normalize") as rec:
+            rec.rows_in = len(df)
+            drop = [c for c in self.spec.drop_columns if c in df.columns]
+            df = self._convert(df.drop(columns=drop))
+            df = df.assign(sigungu_code=codes)
+
+            missing = df["sigungu_code"].isna()
+            if missing.any() and self.spec.sigungu_columns:
+                sido_col, sigungu_col = self.spec.sigungu_columns
+                sido_codes = resolve_sido_codes(df[sido_col])
+                sido_only = missing & sido_codes.notna()
+                if sido_only.any():
+                    labels = df.loc[sido_only, sigungu_col].astype(str).unique().tolist()
+                    df.loc[sido_only, "sigungu_code"] = sido_only_code(sido_codes[sido_only])
+                    print(f"  ℹ️  시군구 없는 시도 직할 행 {int(sido_only.sum())}개 → 시도 집계에만 포함: {labels[:5]}")
+                missing = df["sigungu_code"].isna()
+            if missing.any() and self.spec.sigungu_columns:
+                skipped = df.loc[missing, self.spec.sigungu_columns[1]].astype(str).unique().tolist()
+                print(f"  ℹ️  시군구 코드 없는 행 제외: {skipped[:5]}")
+            df = df[~missing.to_numpy()]
+            rec.rows_out = len(df)
+        if len(df) == 0:
+            return None
+
+        agg_cols = [c for c in self.aggregate_columns(df) if c != "sigungu_code"]
+        if agg_cols:
+            with stage("aggregate") as rec:
+                rec.rows_in = len(df)
+                df = df.groupby("sigungu_code", as_index=False)[agg_cols].agg(self.spec.aggregate)
+                rec.rows_out = len(df)
+
+        df["sigungu_code"] = df["sigungu_code"].astype("int32")
+        return df[["sigungu_code"] + [c for c in df.columns if c != "sigungu_code"]]
+
+
+def format_period(value):
+    """시점 값 → 문자열 ("2023", 2023.0 → "2023" / "2025년07월", "202507" → "2025-07")"""
+    if isinstance(value, (int, np.integer)) or (isinstance(value, (float, np.floating)) and float(value).is_integer()):
+        return str(int(value))
+    text = str(value).strip()
+    match = re.fullmatch(r"(\d{4})\D*?(\d{1,2})?\D*", text)
+    if match is None:
+        return text
+    year, month = match.groups()
+    return f"{year}-{int(month):02d}" if month else year
+
+
+@lru_cache(maxsize=None)
+def compile_spec(spec):
+    """명세 → SourcePlan (명세별로 한 번만 만듦)"""
+    return SourcePlan(spec)
+
+
+def plan_for(filename, specs=None):
+    """파일명 → SourcePlan"""
+    spec = find_spec(filename, specs)
+    return compile_spec(spec) if spec is not None else None
@@ -0,0 +1,158 @@
+# ==============================
+# 공간 인덱스: spatial_index.py
+# ==============================
+# 위도경도.csv(시/군/구 좌표)와 이후 시설 좌표 파일 위에 haversine BallTree를 만들고
+# 최근접 k개 / 반경 내 / 지역별 최근접 시설 질의를 배치로 처리합니다.
+# 질의는 모두 좌표 배열 단위로 한 번에 수행하며 (행별 Python 반복 없음)
+# 결과는 (query, rank, 대상, 거리 km) 형태의 long DataFrame으로 반환합니다.
+# scikit-learn이 없으면 인덱스를 만들 때 ImportError를 냅니다.
+
+import numpy as np
+import pandas as pd
+
+try:
+    from sklearn.neighbors import BallTree
+except ImportError:  # scikit-learn은 선택 의존성
+    BallTree = None
+
+from encoding_detect import read_csv_detected
+from gazetteer import resolve_sido_codes, resolve_sigungu_codes
+
+EARTH_RADIUS_KM = 6371.0088
+LEAF_SIZE = 40
+
+
+def sklearn_available():
+    return BallTree is not None
+
+
+def _to_radians(lat, lon):
+    """위도/경도(도) 배열 → BallTree haversine 입력 [[lat, lon], ...] (라디안)"""
+    lat = np.asarray(lat, dtype=np.float64).reshape(-1)
+    lon = np.asarray(lon, dtype=np.float64).reshape(-1)
+    if lat.shape != lon.shape:
+        raise ValueError(f"위도/경도 길이가 다릅니다: {lat.shape} vs {lon.shape}")
+    return np.radians(np.column_stack([lat, lon]))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """두 좌표 배열 사이의 대원 거리(km), 원소별 계산"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# ------------------------------
+# 1. 좌표 불러오기
+# ------------------------------
+def load_region_points(filepath):
+    """
+    위도경도.csv → 시/군/구 좌표 DataFrame
+    컬럼: docity, do, city, latitude, longitude, region_code(시도), sigungu_code(시군구)
+    (코드는 gazetteer로 찾은 Int32, 찾지 못하면 <NA>)
+    """
+    df, _ = read_csv_detected(filepath)
+    df = df.dropna(subset=["latitude", "longitude"]).reset_index(drop=True)
+    df["sigungu_code"] = resolve_sigungu_codes(df["do"], df["city"])
+    # do가 권역(경상, 충청 등)인 행은 시군구 코드 앞 2자리로 시도를 정함
+    df["region_code"] = (df["sigungu_code"] // 1000).astype("Int32").fillna(resolve_sido_codes(df["do"]))
+    df = df[[c for c in df.columns if c != "sigungu_code"] + ["sigungu_code"]]
+    return df
+
+
+def load_facility_points(filepath, lat_col="latitude", lon_col="longitude", **read_kwargs):
+    """
+    시설 좌표 파일 → latitude/longitude 컬럼으로 맞춘 DataFrame
+    (좌표가 없는 행은 제외)
+    """
+    df, _ = read_csv_detected(filepath, **read_kwargs)
+    df = df.rename(columns={lat_col: "latitude", lon_col: "longitude"})
+    df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
+    df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
+    return df.dropna(subset=["latitude", "longitude"]).reset_index(drop=True)
+
+
+# ------------------------------
+# 2. 인덱스
+# ------------------------------
+class SpatialIndex:
+    """
+    좌표 DataFrame 위의 haversine BallTree
+    - points: latitude/longitude 컬럼이 있는 DataFrame (결과의 point 번호 = 이 DataFrame의 행 위치)
+    - id_col: 결과에 함께 붙일 식별 컬럼 (예: sigungu_code, 시설명)
+    """
+
+    def __init__(self, points, lat_col="latitude", lon_col="longitude", id_col=None, leaf_size=LEAF_SIZE):
+        if BallTree is None:
+            raise ImportError("scikit-learn이 필요합니다: pip install scikit-learn")
+        self.points = points.reset_index(drop=True)
+        self.id_col = id_col
+        self.tree = BallTree(_to_radians(self.points[lat_col], self.points[lon_col]),
+                             leaf_size=leaf_size, metric="haversine")
+
+    def __len__(self):
+        return len(self.points)
+
+    def _result_frame(self, query_idx, rank, point_idx, dist_rad):
+        result = pd.DataFrame({
+            "query": query_idx,
+            "rank": rank,
+            "point": point_idx,
+            "distance_km": dist_rad * EARTH_RADIUS_KM,
+        })
+        if self.id_col is not None:
+            result.insert(3, self.id_col, self.points[self.id_col].to_numpy()[point_idx])
+        return result
+
+    def nearest(self, lat, lon, k=1):
+        """
+        좌표 배열 각각에 대해 가장 가까운 k개 지점
+        반환: query, rank(0부터), point, [id_col], distance_km (query당 k행, 거리순)
+        """
+        queries = _to_radians(lat, lon)
+        k = min(k, len(self))
+        dist, idx = self.tree.query(queries, k=k, return_distance=True, sort_results=True)
+        n = len(queries)
+        return self._result_frame(np.repeat(np.arange(n), k), np.tile(np.arange(k), n),
+                                  idx.reshape(-1), dist.reshape(-1))
+
+    def within_radius(self, lat, lon, radius_km):
+        """
+        좌표 배열 각각에 대해 반경 radius_km 안의 모든 지점
+        반환: query, rank, point, [id_col], distance_km (query별 거리순)
+        """
+        queries = _to_radians(lat, lon)
+        idx, dist = self.tree.query_radius(queries, r=radius_km / EARTH_RADIUS_KM,
+                                           return_distance=True, sort_results=True)
+        counts = np.fromiter((len(i) for i in idx), dtype=np.int64, count=len(idx))
+        total = int(counts.sum())
+        # query별 가변 길이 결과를 평탄화 (rank = 전체 위치 - query 시작 위치)
+        query_idx = np.repeat(np.arange(len(queries)), counts)
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        rank = np.arange(total) - starts
+        point_idx = np.concatenate(idx).astype(np.int64) if total else np.empty(0, dtype=np.int64)
+        dist_rad = np.concatenate(dist) if total else np.empty(0, dtype=np.float64)
+        return self._result_frame(query_idx, rank, point_idx, dist_rad)
+
+    def count_within_radius(self, lat, lon, radius_km):
+        """좌표 배열 각각의 반경 내 지점 수 (접근성 지표용)"""
+        return self.tree.query_radius(_to_radians(lat, lon), r=radius_km / EARTH_RADIUS_KM,
+                                      count_only=True)
+
+
+# ------------------------------
+# 3. 지역별 최근접 시설
+# ------------------------------
+def nearest_facility_per_region(regions, facilities, k=1, facility_id_col=None,
+                                lat_col="latitude", lon_col="longitude"):
+    """
+    모든 지역 좌표에 대해 가장 가까운 시설 k개를 한 번의 배치 질의로 계산
+    - regions, facilities: latitude/longitude 컬럼이 있는 DataFrame
+    반환: regions의 각 행에 rank, facility 위치, [facility_id_col], distance_km를 붙인 DataFrame
+    """
+    index = SpatialIndex(facilities, lat_col, lon_col, id_col=facility_id_col)
+    regions = regions.reset_index(drop=True)
+    result = index.nearest(regions[lat_col], regions[lon_col], k=k)
+    result = result.rename(columns={"point": "facility"})
+    return pd.concat([regions.iloc[result["query"].to_numpy()].reset_index(drop=True),
+                      result.drop(columns="query")], axis=1)
@@ -0,0 +1,285 @@
+# ==============================
+# 내장 DB 백엔드: sql_backend.py
+# ==============================
+# preprocess4 --backend sqlite / duckdb에서 사용합니다. 서버 없는 로컬 DB 파일 하나에
+# - 원본 CSV를 chunk 단위로 읽어(SourcePlan.read_chunks) 지역명 표준화(prepare)까지 한 뒤 raw_* 테이블에 적재
+#   (region 인덱스, 파일 전체를 메모리에 올리지 않음)
+# - 파일별 중복 제거(최신 연도) / 지역별 집계를 SQL로 실행 → 지역 수만큼의 작은 결과만 pandas로 가져와
+#   clean_data(결측/이상치) 후 clean_* 테이블에 저장
+# - 모든 지역 키의 UNION + LEFT JOIN으로 outer join 한 master 테이블을 만들어 내보냄
+# 한 번 적재한 원본은 (내용 해시, 코드 fingerprint)가 같으면 다시 읽지 않으므로 원본에 대한 임시 질의는
+# 전체 재빌드 없이 할 수 있습니다:
+#   python scripts/sql_backend.py --db data/processed/master.sqlite "SELECT * FROM _sources"
+# duckdb가 설치되어 있으면 --backend duckdb, 없으면 표준 라이브러리 sqlite3를 사용합니다.
+
+import argparse
+import hashlib
+import os
+import sqlite3
+
+import pandas as pd
+
+from encoding_detect import detect_encoding, file_content_hash
+from region_join import _resolve_column_names
+from source_specs import plan_for
+import stage_timer
+from stage_timer import stage
+
+try:
+    import duckdb
+except ImportError:  # duckdb는 선택 의존성 (없으면 sqlite3)
+    duckdb = None
+
+ENGINES = ["sqlite", "duckdb"]
+DB_FILES = {"sqlite": "master.sqlite", "duckdb": "master.duckdb"}
+# 적재 chunk 행 수 (--chunksize가 없을 때)
+INGEST_CHUNKSIZE = 100_000
+REGISTRY_TABLE = "_sources"
+MASTER_TABLE = "master"
+
+
+def quote(name):
+    """SQL 식별자 인용 ("지역별 디지털배움터" 같은 한글/공백 컬럼명)"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def table_suffix(filename):
+    """파일명 → 테이블 이름 접미사 (파일명이 같으면 항상 같은 이름)"""
+    return hashlib.blake2b(filename.encode("utf-8"), digest_size=5).hexdigest()
+
+
+# ------------------------------
+# 1. 연결
+# ------------------------------
+class Database:
+    """sqlite3 / duckdb 연결 (적재, 질의, DataFrame 결과만 공통으로 감쌈)"""
+
+    def __init__(self, path, engine="sqlite"):
+        if engine not in ENGINES:
+            raise ValueError(f"알 수 없는 DB 엔진: {engine} (가능: {ENGINES})")
+        if engine == "duckdb" and duckdb is None:
+            raise ImportError("duckdb가 필요합니다: pip install duckdb (또는 --backend sqlite)")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.engine = engine
+        self.con = duckdb.connect(path) if engine == "duckdb" else sqlite3.connect(path)
+        self.execute(f"CREATE TABLE IF NOT EXISTS {REGISTRY_TABLE} (table_name TEXT PRIMARY KEY, "
+                     f"filename TEXT, spec TEXT, content_hash TEXT, fingerprint TEXT, rows INTEGER)")
+
+    def execute(self, sql, params=()):
+        self.con.execute(sql, params)
+
+    def query(self, sql, params=()):
+        if self.engine == "duckdb":
+            return self.con.execute(sql, params).df()
+        return pd.read_sql_query(sql, self.con, params=params)
+
+    def tables(self):
+        if self.engine == "duckdb":
+            sql = "SELECT table_name AS name FROM information_schema.tables"
+        else:
+            sql = "SELECT name FROM sqlite_master WHERE type = 'table'"
+        return set(self.query(sql)["name"])
+
+    def count_rows(self, table):
+        return int(self.query(f"SELECT COUNT(*) AS n FROM {quote(table)}")["n"].iloc[0])
+
+    def column_types(self, table):
+        """{컬럼: 선언 타입 (대문자)}"""
+        if self.engine == "duckdb":
+            info = self.query("SELECT column_name AS name, data_type AS type FROM information_schema.columns "
+                              "WHERE table_name = ?", (table,))
+        else:
+            info = self.query(f"PRAGMA table_info({quote(table)})")
+        return {name: str(kind).upper() for name, kind in zip(info["name"], info["type"])}
+
+    def append(self, table, df):
+        """DataFrame 행 추가 (테이블이 없으면 DataFrame 컬럼으로 생성)"""
+        if self.engine == "duckdb":
+            self.con.register("_chunk", df)
+            if table in self.tables():
+                self.con.execute(f"INSERT INTO {quote(table)} SELECT * FROM _chunk")
+            else:
+                self.con.execute(f"CREATE TABLE {quote(table)} AS SELECT * FROM _chunk")
+            self.con.unregister("_chunk")
+        else:
+            df.to_sql(table, self.con, if_exists="append", index=False)
+
+    def replace(self, table, df):
+        self.execute(f"DROP TABLE IF EXISTS {quote(table)}")
+        self.append(table, df)
+
+    def index_region(self, table):
+        self.execute(f"CREATE INDEX IF NOT EXISTS {quote('idx_' + table + '_region')} "
+                     f"ON {quote(table)} (region)")
+
+    def commit(self):
+        self.con.commit()
+
+    def close(self):
+        self.con.close()
+
+
+# ------------------------------
+# 2. 원본 적재 (chunk 단위)
+# ------------------------------
+def _registered(db, table):
+    rows = db.query(f"SELECT * FROM {REGISTRY_TABLE} WHERE table_name = ?", (table,))
+    return rows.iloc[0] if len(rows) else None
+
+
+def ingest_file(db, filepath, filename, fingerprint, chunksize=None):
+    """
+    원본 CSV → raw_<접미사> 테이블 (표준화된 region + 값 컬럼, region 인덱스)
+    같은 내용/코드로 이미 적재한 파일은 건너뜀
+    반환: (테이블 이름 또는 None, 행 수, 새로 적재했는지)
+    """
+    plan = plan_for(filename)
+    table = f"raw_{table_suffix(filename)}"
+    content_hash = file_content_hash(filepath)
+    entry = _registered(db, table)
+    if entry is not None and entry["content_hash"] == content_hash and entry["fingerprint"] == fingerprint:
+        return (table if entry["rows"] is not None else None), entry["rows"], False
+
+    db.execute(f"DROP TABLE IF EXISTS {quote(table)}")
+    db.execute(f"DELETE FROM {REGISTRY_TABLE} WHERE table_name = ?", (table,))
+    encoding = detect_encoding(filepath, content_hash=content_hash)
+    rows, numeric_cols, columns = 0, None, None
+    with stage("load") as rec:
+        rec.bytes_read = os.path.getsize(filepath)
+        for chunk in plan.read_chunks(filepath, encoding, chunksize or INGEST_CHUNKSIZE):
+            rec.rows_in = (rec.rows_in or 0) + len(chunk)
+            chunk = plan.prepare(chunk, numeric_cols)
+            if chunk is None:
+                break
+            if columns is None:
+                # 첫 chunk에서 정한 숫자 컬럼 / 컬럼 순서를 이후 chunk에도 그대로 적용
+                columns = list(chunk.columns)
+                numeric_cols = [c for c in chunk.select_dtypes(include="number").columns if c != "region"]
+            chunk = chunk.reindex(columns=columns)
+            db.append(table, chunk)
+            rows += len(chunk)
+        rec.rows_out = rows
+    if columns is None:
+        # region 컬럼을 찾지 못한 파일 (다음 실행에서도 건너뛰도록 rows=NULL로 기록)
+        table_name, rows = None, None
+    else:
+        db.index_region(table)
+        table_name = table
+    db.execute(f"INSERT INTO {REGISTRY_TABLE} VALUES (?, ?, ?, ?, ?, ?)",
+               (table, filename, plan.spec.name, content_hash, fingerprint, rows))
+    db.commit()
+    return table_name, rows, True
+
+
+def ingest_files(db, data_dir, files, fingerprint, chunksize=None):
+    """
+    폴더의 원본을 모두 적재
+    반환: [(파일명, 테이블 이름)] (region 컬럼이 없는 파일 제외)
+    """
+    tables = []
+    for filename in files:
+        print(f"📁 {filename}")
+        with stage_timer.labels(source=filename):
+            table, rows, loaded = ingest_file(db, os.path.join(data_dir, filename), filename, fingerprint, chunksize)
+        if table is None:
+            print(f"  ✗ region 컬럼 없음 - 제외\n")
+            continue
+        print(f"  ✓ {'적재' if loaded else '이미 적재됨'}: {table} ({rows}행)\n")
+        tables.append((filename, table))
+    return tables
+
+
+# ------------------------------
+# 3. SQL 실행 계획 (중복 제거 / 집계 / outer join)
+# ------------------------------
+def source_query(db, filename, table):
+    """
+    파일 하나의 집계 SQL (SourcePlan.transform과 같은 규칙)
+    - dedup_sort: region별 정렬 첫 행 (ROW_NUMBER 윈도 함수)
+    - aggregate: region별 합계 / 평균 (합계는 값이 모두 비어 있으면 0 - pandas sum과 동일)
+    """
+    spec = plan_for(filename).spec
+    info = db.query(f"SELECT * FROM {quote(table)} LIMIT 0")
+    columns = list(info.columns)
+    source = quote(table)
+
+    if spec.dedup_sort and spec.dedup_sort[0] in columns:
+        sort_col, ascending = spec.dedup_sort
+        cols = ", ".join(quote(c) for c in columns)
+        source = (f"(SELECT {cols} FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY region "
+                  f"ORDER BY {quote(sort_col)} {'ASC' if ascending else 'DESC'}) AS _rank "
+                  f"FROM {source}) WHERE _rank = 1)")
+
+    if spec.aggregate is not None:
+        numeric = _numeric_columns(db, table, columns)
+        agg_cols = list(spec.aggregate_columns) if spec.aggregate_columns is not None else numeric
+        if spec.aggregate_columns is None or all(c in columns for c in agg_cols):
+            if spec.aggregate == "sum":
+                exprs = [f"COALESCE(SUM({quote(c)}), 0) AS {quote(c)}" for c in agg_cols]
+            else:
+                exprs = [f"AVG({quote(c)}) AS {quote(c)}" for c in agg_cols]
+            return f"SELECT region, {', '.join(exprs)} FROM {source} GROUP BY region"
+    return f"SELECT * FROM {source}"
+
+
+NUMERIC_TYPES = ("INT", "REAL", "FLOA", "DOUB", "DECIMAL", "NUMERIC", "HUGEINT")
+
+
+def _numeric_columns(db, table, columns):
+    """숫자 타입으로 선언된 컬럼 (region 제외)"""
+    types = db.column_types(table)
+    return [c for c in columns if c != "region" and any(t in types.get(c, "") for t in NUMERIC_TYPES)]
+
+
+def join_query(tables, column_names):
+    """
+    region outer join SQL
+    모든 테이블의 region UNION(키 목록)에 각 테이블을 LEFT JOIN (FULL OUTER JOIN이 없는 엔진에서도 동작)
+    - tables: [(테이블 이름, [컬럼, ...])] / column_names: 테이블별 {원래 컬럼명: 결과 컬럼명}
+    """
+    keys = " UNION ".join(f"SELECT region FROM {quote(t)}" for t, _ in tables)
+    select = ["k.region AS region"]
+    joins = []
+    for i, ((table, columns), mapping) in enumerate(zip(tables, column_names)):
+        alias = f"t{i}"
+        select += [f"{alias}.{quote(c)} AS {quote(mapping[c])}" for c in columns]
+        joins.append(f"LEFT JOIN {quote(table)} {alias} ON {alias}.region = k.region")
+    return f"SELECT {', '.join(select)} FROM ({keys}) k {' '.join(joins)} ORDER BY k.region"
+
+
+def build_master(db, cleaned):
+    """
+    clean_* 테이블들을 outer join한 master 테이블 생성 → DataFrame
+    - cleaned: [(파일명, 테이블 이름, 값 컬럼 목록)] (병합 순서 = 컬럼 순서)
+    """
+    tables = [(table, columns) for _, table, columns in cleaned]
+    mappings = _resolve_column_names([columns for _, columns in tables])
+    sql = join_query(tables, mappings)
+    db.execute(f"DROP TABLE IF EXISTS {MASTER_TABLE}")
+    db.execute(f"CREATE TABLE {MASTER_TABLE} AS {sql}")
+    db.index_region(MASTER_TABLE)
+    db.commit()
+    return db.query(f"SELECT * FROM {MASTER_TABLE} ORDER BY region")
+
+
+# ------------------------------
+# 4. 임시 질의
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="전처리 DB(raw_* / clean_* / master 테이블)에 SQL 질의")
+    parser.add_argument("sql", help='예: "SELECT * FROM _sources"')
+    parser.add_argument("--db", required=True, help="DB 파일 (preprocess4 --backend로 만든 파일)")
+    parser.add_argument("--engine", choices=ENGINES, default=None, help="기본: 확장자(.duckdb)로 판단")
+    args = parser.parse_args(argv)
+
+    engine = args.engine or ("duckdb" if args.db.endswith(".duckdb") else "sqlite")
+    db = Database(args.db, engine)
+    try:
+        print(db.query(args.sql).to_string(index=False))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
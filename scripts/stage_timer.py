@@ -0,0 +1,238 @@
+# ==============================
+# 단계별 계측: stage_timer.py
+# ==============================
+# preprocess4 / preprocess5의 처리 단계(불러오기 → 표준화 → 정리 → 집계 → 병합 → 저장)를
+# `with stage("load") as rec:`처럼 감싸 두고, recording() 안에서 실행될 때만 단계마다
+# 벽시계 시간, CPU 시간, 최대 RSS, 입력/출력 행 수, 읽은 바이트 수를 기록합니다.
+# 기록은 JSON-lines 또는 OpenMetrics 파일로 내보내 스케줄러가 느려지거나 행이 줄어든 실행을
+# 알릴 수 있게 합니다. 기록 중이 아니면 시간도 재지 않으므로 평소 실행에는 영향이 없습니다.
+# (단계당 perf_counter / process_time / getrusage 한 번씩 - 수 μs)
+
+import contextlib
+import json
+import os
+import sys
+import time
+import uuid
+
+try:
+    import resource
+except ImportError:  # Windows에는 resource 모듈이 없음 (최대 RSS를 기록하지 않음)
+    resource = None
+
+try:
+    from prometheus_client import CollectorRegistry, Gauge
+    from prometheus_client.openmetrics.exposition import generate_latest
+except ImportError:  # prometheus_client는 선택 의존성 (OpenMetrics 저장만 건너뜀)
+    CollectorRegistry = None
+
+# 단계 이름 (출력/기록 순서)
+STAGES = ["load", "normalize", "clean", "aggregate", "merge", "write"]
+METRIC_PREFIX = "preprocess"
+
+# 현재 기록 중인 StageTimer (없으면 None) / 이후 stage()에 붙일 라벨 (예: source=파일명)
+_active = None
+_labels = {}
+
+
+def peak_rss_bytes():
+    """프로세스 최대 RSS (바이트, 측정할 수 없으면 None)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# ------------------------------
+# 1. 측정값
+# ------------------------------
+class StageRecord:
+    """단계 한 번의 측정값 (rows_in / rows_out / bytes_read는 감싼 코드에서 채움)"""
+
+    __slots__ = ("stage", "labels", "started_at", "wall_seconds", "cpu_seconds", "peak_rss_bytes",
+                 "rows_in", "rows_out", "bytes_read")
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+        self.started_at = None
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_rss_bytes = None
+        self.rows_in = None
+        self.rows_out = None
+        self.bytes_read = None
+
+    def as_dict(self):
+        record = {"stage": self.stage, **self.labels}
+        record.update({name: getattr(self, name) for name in self.__slots__[2:]})
+        return record
+
+
+class StageTimer:
+    """기록된 StageRecord 목록 + 단계별 누적 시간"""
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self.records = []
+        self.seconds = {}
+        self.calls = {}
+
+    def add(self, record):
+        self.records.append(record)
+        self.seconds[record.stage] = self.seconds.get(record.stage, 0.0) + record.wall_seconds
+        self.calls[record.stage] = self.calls.get(record.stage, 0) + 1
+
+    def as_dict(self):
+        """{단계: 초} (STAGES 순서, 기록되지 않은 단계는 0)"""
+        names = STAGES + [name for name in self.seconds if name not in STAGES]
+        return {name: self.seconds.get(name, 0.0) for name in names}
+
+
+@contextlib.contextmanager
+def stage(name, **labels):
+    """
+    처리 단계 하나를 감싸는 context manager → StageRecord
+    (기록 중이 아니면 시간을 재지 않고 빈 StageRecord만 넘김)
+    """
+    record = StageRecord(name, {**_labels, **labels})
+    timer = _active
+    if timer is None:
+        yield record
+        return
+    record.started_at = time.time()
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        record.wall_seconds = time.perf_counter() - start_wall
+        record.cpu_seconds = time.process_time() - start_cpu
+        record.peak_rss_bytes = peak_rss_bytes()
+        timer.add(record)
+
+
+@contextlib.contextmanager
+def labels(**values):
+    """이 블록 안의 stage()에 라벨 추가 (예: 파일별 단계에 source=파일명)"""
+    global _labels
+    previous, _labels = _labels, {**_labels, **values}
+    try:
+        yield
+    finally:
+        _labels = previous
+
+
+@contextlib.contextmanager
+def recording(timer=None):
+    """이 블록 안에서 실행되는 stage()를 timer에 기록 (같은 프로세스 안에서만)"""
+    global _active
+    timer = timer if timer is not None else StageTimer()
+    previous, _active = _active, timer
+    try:
+        yield timer
+    finally:
+        _active = previous
+
+
+def merge_records(records):
+    """다른 프로세스(병렬 워커)에서 기록한 StageRecord를 현재 기록에 추가"""
+    if _active is not None:
+        for record in records:
+            _active.add(record)
+
+
+# ------------------------------
+# 2. 실행 요약
+# ------------------------------
+def run_summary(timer, status, **info):
+    """실행 전체 요약 (기록 시작 이후 시간, CPU, 최대 RSS, 단계 수, 상태)"""
+    return {
+        "run_id": timer.run_id,
+        "status": status,
+        "started_at": timer.started_at,
+        "wall_seconds": time.perf_counter() - timer._start_wall,
+        "cpu_seconds": time.process_time() - timer._start_cpu,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "stages": len(timer.records),
+        **info,
+    }
+
+
+# ------------------------------
+# 3. 내보내기 (JSON-lines / OpenMetrics)
+# ------------------------------
+def write_jsonl(timer, path, summary):
+    """단계 기록 한 줄씩 + 마지막에 실행 요약 한 줄 (기존 파일에 이어 씀)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for record in timer.records:
+            line = {"event": "stage", "run_id": timer.run_id, **record.as_dict()}
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        f.write(json.dumps({"event": "run", **summary}, ensure_ascii=False) + "\n")
+    return path
+
+
+def _stage_totals(records):
+    """(단계, 대상) 라벨별 합계 (대상: 파일명 / 병합 키 / 출력 이름, RSS는 최대값)"""
+    totals = {}
+    for record in records:
+        target = next((record.labels[k] for k in ("source", "key", "target") if k in record.labels), "")
+        key = (record.stage, str(target))
+        total = totals.setdefault(key, {"calls": 0})
+        total["calls"] += 1
+        for name in ("wall_seconds", "cpu_seconds", "rows_in", "rows_out", "bytes_read"):
+            value = getattr(record, name)
+            if value is not None:
+                total[name] = total.get(name, 0) + value
+        if record.peak_rss_bytes is not None:
+            total["peak_rss_bytes"] = max(total.get("peak_rss_bytes", 0), record.peak_rss_bytes)
+    return totals
+
+
+def write_openmetrics(timer, path, summary):
+    """
+    OpenMetrics 텍스트 파일 (node_exporter textfile collector 등에서 수집)
+    - {prefix}_stage_*{stage, source}: 단계별 시간/행 수/바이트/RSS
+    - {prefix}_run_*: 실행 전체 시간, 최대 RSS, 성공 여부, 마지막 실행 시각
+    반환: 파일 경로 (prometheus_client가 없으면 None)
+    """
+    if CollectorRegistry is None:
+        return None
+    registry = CollectorRegistry()
+    stage_metrics = {
+        "wall_seconds": "단계 벽시계 시간 (초)",
+        "cpu_seconds": "단계 CPU 시간 (초)",
+        "rows_in": "단계 입력 행 수",
+        "rows_out": "단계 출력 행 수",
+        "bytes_read": "단계에서 읽은 바이트 수",
+        "peak_rss_bytes": "단계 종료 시점의 프로세스 최대 RSS (바이트)",
+        "calls": "단계 실행 횟수",
+    }
+    gauges = {name: Gauge(f"{METRIC_PREFIX}_stage_{name}", doc, ["stage", "source"], registry=registry)
+              for name, doc in stage_metrics.items()}
+    for (stage_name, source), total in _stage_totals(timer.records).items():
+        for name, value in total.items():
+            gauges[name].labels(stage=stage_name, source=source).set(value)
+
+    run_metrics = {
+        "wall_seconds": ("실행 전체 벽시계 시간 (초)", summary["wall_seconds"]),
+        "cpu_seconds": ("실행 전체 CPU 시간 (초)", summary["cpu_seconds"]),
+        "peak_rss_bytes": ("실행 중 최대 RSS (바이트)", summary["peak_rss_bytes"]),
+        "rows_out": ("최종 출력 행 수", summary.get("rows_out")),
+        "success": ("성공 여부 (1 / 0)", 1 if summary["status"] == "ok" else 0),
+        "last_run_timestamp_seconds": ("실행 시작 시각 (unix time)", summary["started_at"]),
+    }
+    for name, (doc, value) in run_metrics.items():
+        if value is not None:
+            Gauge(f"{METRIC_PREFIX}_run_{name}", doc, registry=registry).set(value)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(generate_latest(registry))
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,91 @@
+# ==============================
+# 스트리밍 집계: streaming_agg.py
+# ==============================
+# 시설/수강생 단위의 큰 CSV를 chunk 단위로 읽으면서
+# 지역별 부분 집계(sum, count, 좌표 평균용 sum+count)만 유지합니다.
+# 메모리 사용량은 파일 크기가 아니라 그룹(지역) 수에 비례합니다.
+
+import pandas as pd
+
+ROWS_COLUMN = "__rows"
+DEFAULT_CHUNKSIZE = 200_000
+
+
+def _sum_name(col):
+    return f"{col}__sum"
+
+
+def _count_name(col):
+    return f"{col}__count"
+
+
+# ------------------------------
+# 1. chunk 하나의 부분 집계
+# ------------------------------
+def partial_aggregate(chunk, key="region", sum_cols=(), mean_cols=()):
+    """
+    chunk 하나를 key별로 부분 집계
+    - sum_cols: 합계 컬럼 (이름 그대로)
+    - mean_cols: 평균 컬럼 → {col}__sum, {col}__count (NaN 제외)
+    - __rows: 행 수
+    """
+    grouped = chunk.groupby(key, sort=False)
+    parts = []
+    if sum_cols:
+        parts.append(grouped[list(sum_cols)].sum())
+    if mean_cols:
+        mean_cols = list(mean_cols)
+        sums = grouped[mean_cols].sum()
+        sums.columns = [_sum_name(c) for c in mean_cols]
+        counts = grouped[mean_cols].count()
+        counts.columns = [_count_name(c) for c in mean_cols]
+        parts.extend([sums, counts])
+    parts.append(grouped.size().rename(ROWS_COLUMN).to_frame())
+    return pd.concat(parts, axis=1)
+
+
+# ------------------------------
+# 2. 부분 집계 병합
+# ------------------------------
+def merge_partials(acc, part):
+    """누적 부분 집계 + 새 부분 집계 (모든 컬럼이 합산 가능)"""
+    if acc is None:
+        return part
+    return pd.concat([acc, part]).groupby(level=0, sort=False).sum()
+
+
+# ------------------------------
+# 3. 최종 결과
+# ------------------------------
+def finalize_partials(acc, key="region", sum_cols=(), mean_cols=(), with_count=False):
+    """
+    부분 집계 → 최종 DataFrame (key 정렬, groupby(as_index=False)와 같은 형태)
+    - with_count=True면 지역별 행 수(count) 컬럼 포함
+    """
+    columns = [key] + list(sum_cols) + list(mean_cols) + (["count"] if with_count else [])
+    if acc is None:
+        return pd.DataFrame(columns=columns)
+    acc = acc.sort_index()
+    result = pd.DataFrame(index=acc.index)
+    for col in sum_cols:
+        result[col] = acc[col]
+    for col in mean_cols:
+        result[col] = acc[_sum_name(col)] / acc[_count_name(col)]
+    if with_count:
+        result["count"] = acc[ROWS_COLUMN]
+    result.index.name = key
+    return result.reset_index()[columns]
+
+
+def aggregate_chunks(chunks, key="region", sum_cols=(), mean_cols=(), with_count=False):
+    """
+    chunk iterator를 받아 지역별 집계 결과를 반환합니다.
+    chunk마다 partial_aggregate → merge_partials로 누적하므로
+    한 번에 메모리에 있는 것은 chunk 하나와 그룹 수만큼의 부분 집계뿐입니다.
+    """
+    acc = None
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        acc = merge_partials(acc, partial_aggregate(chunk, key, sum_cols, mean_cols))
+    return finalize_partials(acc, key, sum_cols, mean_cols, with_count)
@@ -0,0 +1,324 @@
+# ==============================
+# 스트리밍 통계: streaming_stats.py
+# ==============================
+# clean_data는 평균/표준편차/중앙값을 구하려고 컬럼 전체를 메모리에 올립니다.
+# 여기서는 chunk를 한 번 훑으며 컬럼별 누적기만 유지합니다.
+# - Welford(Chan 병합) 평균/분산, 최소/최대
+# - KLL quantile sketch (중앙값, 사분위) - 메모리는 sketch 크기 k에 비례
+# - 결측 수
+# 두 번째 패스에서 outlier_engine의 판정/대체를 chunk마다 적용하므로
+# RAM보다 큰 파일도 일정한 메모리로 결측치(fillna) + 이상치 처리를 할 수 있습니다.
+# 값이 sketch 크기 이하이면 quantile은 정확하며 결과가 clean_data와 같습니다.
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from encoding_detect import detect_encoding
+from outlier_engine import METHODS, POLICIES, detect_outliers, replace_outliers
+from streaming_agg import DEFAULT_CHUNKSIZE
+
+DEFAULT_SKETCH_SIZE = 200
+
+
+# ------------------------------
+# 1. KLL quantile sketch
+# ------------------------------
+class KLLSketch:
+    """
+    KLL quantile sketch (단일 컬럼)
+    - level h의 원소는 가중치 2**h
+    - level이 가득 차면 정렬 후 하나 걸러 하나를 위 level로 올림
+    """
+
+    def __init__(self, k=DEFAULT_SKETCH_SIZE, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # 홀수 개면 마지막 하나는 현재 level에 남김
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        """값 배열 추가 (NaN 제외)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """다른 sketch를 합침 (chunk/프로세스별 sketch 병합용)"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def is_exact(self):
+        """아직 압축되지 않아 모든 값을 그대로 갖고 있는지"""
+        return all(len(items) == 0 for items in self.levels[1:])
+
+    def quantile(self, q):
+        """
+        q분위수 (q: 스칼라 또는 배열)
+        - 압축 전: numpy와 같은 선형 보간 (정확)
+        - 압축 후: 가중 누적분포로 근사
+        """
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan)
+        if self.is_exact():
+            return np.quantile(self.levels[0], q)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** h, dtype=np.float64)
+                                  for h, items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        position = np.asarray(q, dtype=np.float64) * cumulative[-1]
+        index = np.minimum(np.searchsorted(cumulative, position, side="left"), len(items) - 1)
+        return items[index]
+
+
+# ------------------------------
+# 2. 컬럼별 누적 통계
+# ------------------------------
+class StreamingStats:
+    """
+    여러 숫자 컬럼의 한 번 훑기(one-pass) 통계
+    - fill_value가 있으면 결측을 그 값으로 채운 뒤 통계 계산 (clean_data의 fillna(0)과 동일)
+    - 결측 수는 채우기 전 기준
+    """
+
+    def __init__(self, columns, fill_value=0, sketch_size=DEFAULT_SKETCH_SIZE):
+        self.columns = list(columns)
+        self.fill_value = fill_value
+        m = len(self.columns)
+        self.count = np.zeros(m, dtype=np.int64)
+        self.mean = np.zeros(m)
+        self.m2 = np.zeros(m)
+        self.minimum = np.full(m, np.inf)
+        self.maximum = np.full(m, -np.inf)
+        self.null_count = np.zeros(m, dtype=np.int64)
+        self.rows = 0
+        self.sketches = [KLLSketch(sketch_size, seed=j) for j in range(m)]
+
+    def chunk_matrix(self, chunk):
+        """chunk → (행 × 컬럼) float 행렬 (숫자로 바꿀 수 없는 값은 결측)"""
+        matrix = np.empty((len(chunk), len(self.columns)), dtype=np.float64, order="F")
+        for j, col in enumerate(self.columns):
+            matrix[:, j] = pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        return matrix
+
+    def update(self, chunk):
+        """chunk 하나 반영 (Welford/Chan 병합 + sketch 갱신)"""
+        matrix = self.chunk_matrix(chunk)
+        missing = np.isnan(matrix)
+        self.null_count += missing.sum(axis=0)
+        self.rows += len(matrix)
+        if self.fill_value is not None:
+            matrix[missing] = self.fill_value
+            missing = np.zeros_like(missing)
+
+        n_b = (~missing).sum(axis=0)
+        valid = n_b > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(valid, np.nansum(matrix, axis=0) / n_b, 0.0)
+            m2_b = np.nansum((matrix - mean_b) ** 2, axis=0)
+        n_a = self.count
+        n = n_a + n_b
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = mean_b - self.mean
+            self.mean = np.where(n > 0, self.mean + delta * n_b / n, 0.0)
+            self.m2 = self.m2 + m2_b + np.where(n > 0, delta ** 2 * n_a * n_b / n, 0.0)
+        self.count = n
+        if valid.any():
+            self.minimum = np.fmin(self.minimum, np.nanmin(np.where(missing, np.inf, matrix), axis=0))
+            self.maximum = np.fmax(self.maximum, np.nanmax(np.where(missing, -np.inf, matrix), axis=0))
+
+        for j, sketch in enumerate(self.sketches):
+            sketch.update(matrix[:, j])
+
+    def merge(self, other):
+        """같은 컬럼의 다른 누적 통계와 병합"""
+        n = self.count + other.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = other.mean - self.mean
+            mean = np.where(n > 0, self.mean + delta * other.count / n, 0.0)
+            self.m2 = self.m2 + other.m2 + np.where(n > 0, delta ** 2 * self.count * other.count / n, 0.0)
+        self.mean, self.count = mean, n
+        self.minimum = np.fmin(self.minimum, other.minimum)
+        self.maximum = np.fmax(self.maximum, other.maximum)
+        self.null_count += other.null_count
+        self.rows += other.rows
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+
+    def variance(self, ddof=1):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan)
+
+    def quantiles(self, q):
+        """컬럼별 q분위수 배열"""
+        return np.array([sketch.quantile(q) for sketch in self.sketches], dtype=np.float64)
+
+    def outlier_stats(self, method="zscore"):
+        """outlier_engine 형식의 통계 dict ({이름: (1 × 컬럼 수) 배열})"""
+        stats = {"median": self.quantiles(0.5)[None, :]}
+        if method == "zscore":
+            stats["mean"] = np.where(self.count > 0, self.mean, np.nan)[None, :]
+            stats["std"] = np.sqrt(self.variance(ddof=1))[None, :]
+        elif method == "iqr":
+            q = self.quantiles([0.25, 0.75])
+            stats["q1"], stats["q3"] = q[:, 0][None, :], q[:, 1][None, :]
+        return stats
+
+    def summary(self):
+        """컬럼별 요약 DataFrame"""
+        q = self.quantiles([0.25, 0.5, 0.75])
+        return pd.DataFrame({
+            "count": self.count,
+            "null_count": self.null_count,
+            "mean": np.where(self.count > 0, self.mean, np.nan),
+            "std": np.sqrt(self.variance(ddof=1)),
+            "min": np.where(self.count > 0, self.minimum, np.nan),
+            "q1": q[:, 0],
+            "median": q[:, 1],
+            "q3": q[:, 2],
+            "max": np.where(self.count > 0, self.maximum, np.nan),
+            "exact_quantiles": [s.is_exact() for s in self.sketches],
+        }, index=pd.Index(self.columns, name="column"))
+
+
+# ------------------------------
+# 3. 두 번 훑기 정리 (통계 → 대체)
+# ------------------------------
+def collect_stats(chunks, columns, fill_value=0, sketch_size=DEFAULT_SKETCH_SIZE, method="zscore"):
+    """
+    1패스: chunk iterator에서 컬럼별 통계 수집
+    mad는 중앙값이 정해진 뒤 편차 sketch가 필요하므로 chunks를 다시 만들 수 있는
+    함수(호출 시 새 iterator 반환)로 받아야 합니다.
+    """
+    stats = StreamingStats(columns, fill_value, sketch_size)
+    source = chunks() if callable(chunks) else chunks
+    for chunk in source:
+        stats.update(chunk)
+    result = stats.outlier_stats(method)
+
+    if method == "mad":
+        if not callable(chunks):
+            raise ValueError("mad는 편차 계산을 위해 chunks를 다시 읽을 수 있는 함수로 전달하세요")
+        deviations = [KLLSketch(sketch_size, seed=j) for j in range(len(columns))]
+        for chunk in chunks():
+            matrix = stats.chunk_matrix(chunk)
+            if fill_value is not None:
+                matrix[np.isnan(matrix)] = fill_value
+            matrix = np.abs(matrix - result["median"])
+            for j, sketch in enumerate(deviations):
+                sketch.update(matrix[:, j])
+        result["mad"] = np.array([s.quantile(0.5) for s in deviations], dtype=np.float64)[None, :]
+    return stats, result
+
+
+def clean_chunks(chunks, columns, stats, method="zscore", threshold=None, policy="median", fill_value=0):
+    """
+    2패스: 수집한 통계로 chunk마다 결측 채우기 + 이상치 대체 (chunk iterator 반환)
+    이상치가 있는 컬럼만 float로 바뀝니다.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"알 수 없는 이상치 정책: {policy} (가능: {POLICIES})")
+    columns = list(columns)
+    for chunk in chunks:
+        chunk = chunk.copy()
+        if fill_value is not None:
+            chunk[columns] = chunk[columns].fillna(fill_value)
+        matrix = np.empty((len(chunk), len(columns)), dtype=np.float64, order="F")
+        for j, col in enumerate(columns):
+            matrix[:, j] = pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        codes = np.zeros(len(chunk), dtype=np.intp)
+        mask = detect_outliers(matrix, stats, codes, method, threshold)
+        changed = np.flatnonzero(mask.any(axis=0))
+        if policy != "keep" and len(changed):
+            replaced = replace_outliers(matrix[:, changed], mask[:, changed],
+                                        {k: v[:, changed] for k, v in stats.items()},
+                                        codes, method, threshold, policy)
+            changed_cols = [columns[j] for j in changed]
+            chunk[changed_cols] = pd.DataFrame(replaced, index=chunk.index, columns=changed_cols)
+        yield chunk
+
+
+def clean_csv_streaming(filepath, output_path, columns=None, chunksize=DEFAULT_CHUNKSIZE, method="zscore",
+                        threshold=None, policy="median", fill_value=0, sketch_size=DEFAULT_SKETCH_SIZE,
+                        encoding=None):
+    """
+    CSV 파일을 chunk 단위로 두 번 읽어 결측치/이상치 처리 후 output_path에 저장
+    - columns: 대상 숫자 컬럼 (None이면 첫 chunk에서 숫자형인 컬럼)
+    반환: 컬럼별 통계 요약 DataFrame
+    """
+    if method not in METHODS:
+        raise ValueError(f"알 수 없는 이상치 방법: {method} (가능: {METHODS})")
+    encoding = encoding or detect_encoding(filepath)
+
+    def read_chunks():
+        return pd.read_csv(filepath, encoding=encoding, chunksize=chunksize)
+
+    if columns is None:
+        first = next(iter(read_chunks()))
+        columns = list(first.select_dtypes(include=[np.number]).columns)
+
+    stats, outlier_stats = collect_stats(read_chunks, columns, fill_value, sketch_size, method)
+
+    tmp_path = output_path + ".tmp"
+    for i, chunk in enumerate(clean_chunks(read_chunks(), columns, outlier_stats, method, threshold,
+                                           policy, fill_value)):
+        chunk.to_csv(tmp_path, mode="w" if i == 0 else "a", header=(i == 0), index=False,
+                     encoding="utf-8-sig" if i == 0 else "utf-8")
+    os.replace(tmp_path, output_path)
+    return stats.summary()
+
+
+# ------------------------------
+# 4. 실행
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="큰 CSV의 결측치/이상치를 일정한 메모리로 처리 (두 번 훑기)")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--columns", nargs="*", default=None, help="대상 숫자 컬럼 (기본: 숫자형 전체)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--method", choices=METHODS, default="zscore")
+    parser.add_argument("--policy", choices=POLICIES, default="median")
+    parser.add_argument("--sketch-size", type=int, default=DEFAULT_SKETCH_SIZE,
+                        help="quantile sketch 크기 k (클수록 정확, 메모리 증가)")
+    args = parser.parse_args(argv)
+
+    summary = clean_csv_streaming(args.input, args.output, args.columns, args.chunksize, args.method,
+                                  policy=args.policy, sketch_size=args.sketch_size)
+    print(summary.to_string())
+    print(f"💾 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
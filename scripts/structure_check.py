@@ -0,0 +1,81 @@
+# ==============================
+# 구조 파서 회귀 확인: structure_check.py
+# ==============================
+# structured 명세(예: 평생교육기관)의 원본을 구조 파서(table_structure.py)로 읽었을 때
+# 지정한 구역의 시도 행만 17개 남는지 확인합니다. 합성 평생교육기관 표(synthetic_kosis.py)는
+# 권역 소계 행이 시도 행보다 많아서, 행 수로 구역을 고르면 수도권/비수도권만 남습니다.
+# 벤치마크(benchmark.py)의 시간 측정과는 따로 실행합니다. 실패하면 종료 코드 1.
+#
+# 사용: python scripts/structure_check.py                      (임시 폴더에 합성 데이터 생성 후 확인)
+#       python scripts/structure_check.py --data-dir data/rawdata
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from gazetteer import resolve_sido
+from source_specs import SOURCE_SPECS, find_spec
+from synthetic_kosis import generate_dataset
+from table_structure import print_layout, read_table
+
+DEFAULT_ROWS = 1000
+
+
+def check_structured_sources(data_dir):
+    """
+    폴더의 structured 명세 파일마다 구조 파서 결과 확인
+    반환: [(파일명, 문제 설명), ...] (문제가 없으면 빈 리스트)
+    """
+    problems = []
+    checked = 0
+    for filename in sorted(f for f in os.listdir(data_dir) if f.endswith(".csv")):
+        spec = find_spec(filename)
+        if spec is None or not spec.structured:
+            continue
+        checked += 1
+        print(f"📁 {filename}")
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            df, _, layout = read_table(os.path.join(data_dir, filename), spec.encoding, section=spec.section)
+        print_layout(layout)
+        labels = df[layout.label_columns[-1]] if len(df) else pd.Series(dtype=object)
+        unresolved = labels[labels.map(resolve_sido).isna()].tolist()
+        if spec.section is not None and layout.section != spec.section:
+            problems.append((filename, f"구역 '{layout.section}' (기대: '{spec.section}')"))
+        if len(labels) == 0 or unresolved or labels.duplicated().any():
+            problems.append((filename, f"{len(labels)}행, 시도 아님 {unresolved[:5]}, "
+                                       f"중복 {int(labels.duplicated().sum())}개"))
+    if checked == 0:
+        names = [spec.name for spec in SOURCE_SPECS if spec.structured]
+        problems.append((data_dir, f"structured 명세 파일 없음 ({names})"))
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="구조 파서 회귀 확인 (structured 명세 원본)")
+    parser.add_argument("--data-dir", default=None, help="확인할 원본 폴더 (기본: 임시 폴더에 합성 데이터 생성)")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="합성 데이터 행 수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir
+        if data_dir is None:
+            data_dir = tmp_dir
+            generate_dataset(data_dir, args.rows, args.seed)
+            print(f"ℹ️  합성 데이터: {args.rows:,}행, seed {args.seed}")
+        problems = check_structured_sources(data_dir)
+
+    for filename, problem in problems:
+        print(f"[오류] {filename}: {problem}")
+    if problems:
+        return False
+    print("✓ 구조 파서 확인 (시도 구역)")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
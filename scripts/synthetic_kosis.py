@@ -0,0 +1,247 @@
+# ==============================
+# 합성 KOSIS 데이터 생성기: synthetic_kosis.py
+# ==============================
+# data/rawdata의 다섯 원본(독거노인수, 디지털배움터, 257인구, 평생교육기관, 위도경도)과 파일명·컬럼·인코딩
+# (cp949 / utf-8)·값 형식("51,159,889" 쉼표 숫자, "서울 Seoul", "서울특별시  (1100000000)")이 같은
+# CSV를 원하는 행 수(10³ ~ 10⁷)로 만듭니다. seed가 같으면 같은 파일이 만들어집니다.
+#
+# 병합 키(시도)가 파일마다 중복되지 않도록 각 파일이 전처리에서 줄어드는 축으로 행을 늘립니다.
+# - 독거노인수: 연도 (17개 시도 × 2023년부터 과거로) → 최신 연도만 사용
+# - 디지털배움터 / 위도경도: 시군구 행 반복 → 시도별 합계 / 평균
+# - 257인구: 전국 + 17개 시도 행 뒤에 읍면동 행 (행정기관코드 포함)
+# - 평생교육기관: 합계/권역/시도 표 뒤에 권역 소계 행 (전처리에서 제외되는 행)
+# 메모리를 넘지 않도록 BLOCK_ROWS 행씩 만들어 파일에 이어 씁니다.
+# 생성 조건(GENERATOR_VERSION, 행 수, seed, 원본)은 manifest.json에 남겨 재사용 여부를 판단합니다.
+#
+# 사용: python scripts/synthetic_kosis.py --rows 100000 --output-dir data/benchmark/synthetic/100000
+
+import argparse
+import csv
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from gazetteer import SIDO, SIGUNGU
+
+BLOCK_ROWS = 500_000
+# 만드는 행의 형식 / 값이 바뀌면 올림 (이전 버전으로 만든 폴더는 다시 생성)
+GENERATOR_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+
+# 원본 이름: (파일명, 인코딩, 전부 따옴표로 감싸는지)
+SOURCES = {
+    "독거노인수": ("2023 시도별 독거노인수.csv", "cp949", False),
+    "디지털배움터": ("지역별 디지털배움터.csv", "cp949", False),
+    "인구": ("257인구.csv", "cp949", True),
+    "평생교육기관": ("지역별 평생교육기관.csv", "utf-8", False),
+    "위도경도": ("위도경도.csv", "utf-8", False),
+}
+
+LATEST_YEAR = 2023
+POPULATION_MONTH = "2025년07월"
+# 위도/경도 범위 (남한)
+LATITUDE_RANGE = (33.2, 38.6)
+LONGITUDE_RANGE = (126.0, 129.6)
+
+SIDO_CODES = np.array([code for code, _, _, _, _ in SIDO])
+SIDO_FULL = np.array([name for _, name, _, _, _ in SIDO], dtype=object)
+SIDO_SHORT = np.array([short for _, _, short, _, _ in SIDO], dtype=object)
+SIDO_LABEL = np.array([f"{short} {english}" for _, _, short, english, _ in SIDO], dtype=object)
+_SIDO_INDEX = {code: i for i, code in enumerate(SIDO_CODES)}
+# 시군구 목록: (시도 위치, 시군구 코드, 명칭)
+SIGUNGU_SIDO = np.array([_SIDO_INDEX[sido] for sido, entries in SIGUNGU.items() for _ in entries])
+SIGUNGU_CODES = np.array([sido * 1000 + suffix for sido, entries in SIGUNGU.items() for suffix, _ in entries])
+SIGUNGU_NAMES = np.array([name for entries in SIGUNGU.values() for _, name in entries], dtype=object)
+
+
+def _comma(values):
+    """정수 배열 → "1,234,567" 문자열 배열"""
+    return np.array([f"{v:,}" for v in values.tolist()], dtype=object)
+
+
+def _concat(*parts):
+    """문자열 배열 원소별 이어 붙이기"""
+    result = parts[0].astype(object)
+    for part in parts[1:]:
+        result = result + part
+    return result
+
+
+# ------------------------------
+# 1. 원본별 행 생성 (행 번호 start ~ stop)
+# ------------------------------
+def elderly_rows(rng, start, stop):
+    """독거노인수: 연도, 시도("서울 Seoul"), 연령대별 인원"""
+    i = np.arange(start, stop)
+    sido = i % len(SIDO)
+    df = pd.DataFrame({"연도": LATEST_YEAR - i // len(SIDO), "시도": SIDO_LABEL[sido]})
+    base = rng.integers(3_000, 90_000, len(i))
+    for col, share in [("65-69세", 1.0), ("70-74세", 0.8), ("75-79세", 0.65), ("80-84세", 0.5), ("85세이상", 0.35)]:
+        df[col] = (base * share * rng.uniform(0.9, 1.1, len(i))).astype(np.int64)
+    return df
+
+
+def digital_rows(rng, start, stop):
+    """디지털배움터: 광역지자체(정식 명칭), 기초지자체, 교육인원"""
+    j = np.arange(start, stop) % len(SIGUNGU_NAMES)
+    return pd.DataFrame({
+        "광역지자체": SIDO_FULL[SIGUNGU_SIDO[j]],
+        "기초지자체": SIGUNGU_NAMES[j],
+        "교육인원": rng.integers(0, 20_000, len(j)),
+    })
+
+
+def population_rows(rng, start, stop):
+    """
+    257인구: 행정구역("서울특별시  (1100000000)"), 월별 전체/남자/여자/65세이상 (쉼표 숫자)
+    0번 행은 전국, 1~17번은 시도, 이후는 읍면동 (시군구 코드 + 일련번호)
+    """
+    i = np.arange(start, stop)
+    names = np.empty(len(i), dtype=object)
+    codes = np.empty(len(i), dtype=np.int64)
+    total = rng.integers(2_000, 40_000, len(i))
+
+    nation = i == 0
+    names[nation], codes[nation] = "전국", 10 ** 9
+    sido = (i >= 1) & (i <= len(SIDO))
+    names[sido] = SIDO_FULL[i[sido] - 1]
+    codes[sido] = SIDO_CODES[i[sido] - 1] * 10 ** 8
+    dong = i > len(SIDO)
+    j = i[dong] - len(SIDO) - 1
+    serial = j // len(SIGUNGU_NAMES) + 1
+    sigungu = j % len(SIGUNGU_NAMES)
+    names[dong] = _concat(SIDO_FULL[SIGUNGU_SIDO[sigungu]], " ", SIGUNGU_NAMES[sigungu], " ",
+                          serial.astype(str).astype(object), "동")
+    codes[dong] = SIGUNGU_CODES[sigungu] * 10 ** 5 + serial
+    total[nation | sido] *= 1_000
+
+    male = (total * rng.uniform(0.47, 0.51, len(i))).astype(np.int64)
+    elderly = (total * rng.uniform(0.12, 0.28, len(i))).astype(np.int64)
+    elderly_male = (elderly * rng.uniform(0.40, 0.47, len(i))).astype(np.int64)
+    month = POPULATION_MONTH
+    return pd.DataFrame({
+        "행정구역": _concat(names, "  (", codes.astype(str).astype(object), ")"),
+        f"{month}_전체": _comma(total),
+        f"{month}_남자": _comma(male),
+        f"{month}_여자": _comma(total - male),
+        f"{month}_65세이상전체": _comma(elderly),
+        f"{month}_65세이상남자": _comma(elderly_male),
+        f"{month}_65세이상여자": _comma(elderly - elderly_male),
+    })
+
+
+def education_rows(rng, start, stop):
+    """
+    평생교육기관: 구분, (빈 헤더 = 지역), 기관수 ~ 사무직원수 (쉼표 숫자)
+    0번 합계, 1~2번 권역(수도권/비수도권), 3~19번 시도(약칭), 이후 권역 소계 행
+    """
+    i = np.arange(start, stop)
+    kind = np.full(len(i), "", dtype=object)
+    region = np.empty(len(i), dtype=object)
+    kind[i == 0], region[i == 0] = "합계", ""
+    sido = (i >= 3) & (i < 3 + len(SIDO))
+    region[sido] = SIDO_SHORT[i[sido] - 3]
+    kind[i == 3] = "시도"
+    group = (i >= 1) & ~sido & (i != 0)
+    region[group] = np.where(i[group] % 2 == 1, "수도권", "비수도권")
+    # 구분 열은 병합 셀 - 시도 구역 뒤 첫 소계 행에서 권역 구역이 다시 시작
+    kind[group & ((i % 2 == 1) | (i == 3 + len(SIDO)))] = "권역"
+
+    institutions = rng.integers(20, 2_000, len(i))
+    return pd.DataFrame({
+        "구분": kind,
+        "": region,
+        "기관수": _comma(institutions),
+        "프로그램수": _comma(institutions * rng.integers(40, 80, len(i))),
+        "학습자수": _comma(institutions * rng.integers(1_000, 10_000, len(i))),
+        "교강사수": _comma(institutions * rng.integers(8, 20, len(i))),
+        "사무직원수": _comma(institutions * rng.integers(2, 6, len(i))),
+    })
+
+
+def coordinate_rows(rng, start, stop):
+    """위도경도: docity("강원강릉시"), do(시도 약칭), city, longitude, latitude"""
+    j = np.arange(start, stop) % len(SIGUNGU_NAMES)
+    short = SIDO_SHORT[SIGUNGU_SIDO[j]]
+    return pd.DataFrame({
+        "docity": short + SIGUNGU_NAMES[j],
+        "do": short,
+        "city": SIGUNGU_NAMES[j],
+        "longitude": rng.uniform(*LONGITUDE_RANGE, len(j)),
+        "latitude": rng.uniform(*LATITUDE_RANGE, len(j)),
+    })
+
+
+ROW_GENERATORS = {
+    "독거노인수": elderly_rows,
+    "디지털배움터": digital_rows,
+    "인구": population_rows,
+    "평생교육기관": education_rows,
+    "위도경도": coordinate_rows,
+}
+
+# 원본 표 구조상 최소 행 수 (시도 17개 + 합계/권역 행)
+MIN_ROWS = {"독거노인수": len(SIDO), "인구": len(SIDO) + 1, "평생교육기관": len(SIDO) + 3}
+
+
+# ------------------------------
+# 2. 파일 쓰기
+# ------------------------------
+def write_source(name, output_dir, rows, seed=0, block_rows=BLOCK_ROWS):
+    """원본 하나를 rows행으로 생성해 저장 → 파일 경로"""
+    filename, encoding, quote_all = SOURCES[name]
+    rows = max(rows, MIN_ROWS.get(name, 1))
+    path = os.path.join(output_dir, filename)
+    source_index = list(SOURCES).index(name)
+    quoting = csv.QUOTE_ALL if quote_all else csv.QUOTE_MINIMAL
+    for block, start in enumerate(range(0, rows, block_rows)):
+        rng = np.random.default_rng([seed, source_index, block])
+        df = ROW_GENERATORS[name](rng, start, min(start + block_rows, rows))
+        df.to_csv(path, mode="w" if block == 0 else "a", header=block == 0, index=False,
+                  encoding=encoding, quoting=quoting)
+    return path
+
+
+def dataset_manifest(rows, seed=0, sources=None):
+    """생성 조건 (manifest.json 내용)"""
+    return {"generator_version": GENERATOR_VERSION, "rows": rows, "seed": seed,
+            "sources": list(sources or SOURCES)}
+
+
+def read_manifest(output_dir):
+    """manifest.json (없거나 읽을 수 없으면 None)"""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def generate_dataset(output_dir, rows, seed=0, sources=None):
+    """다섯 원본을 각각 rows행으로 생성 → 파일 경로 목록 (모두 쓴 뒤 manifest.json 저장)"""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = [write_source(name, output_dir, rows, seed) for name in (sources or SOURCES)]
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(dataset_manifest(rows, seed, sources), f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KOSIS 원본과 같은 형식의 합성 CSV 생성")
+    parser.add_argument("--rows", type=int, required=True, help="파일별 행 수")
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sources", nargs="+", choices=list(SOURCES), default=None)
+    args = parser.parse_args(argv)
+
+    for path in generate_dataset(args.output_dir, args.rows, args.seed, args.sources):
+        print(f"💾 저장: {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
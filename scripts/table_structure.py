@@ -0,0 +1,271 @@
+# ==============================
+# 표 구조 파서: table_structure.py
+# ==============================
+# KOSIS / 엑셀에서 내보낸 표(예: 지역별 평생교육기관.csv)를 pandas로 바로 읽으면
+#   - 병합 셀 헤더가 "Unnamed: n"이 되고 실제 지역명이 Unnamed: 1에 들어감
+#   - "구분" 열의 합계 / 권역 / 시도 구역 표시, 합계·소계 행, "(단위: 개)" 행이 데이터 행으로 섞임
+# 그래서 읽은 뒤 제외 목록(exclude_regions)으로 여러 번 걸러야 했습니다.
+# read_table은 csv 모듈로 파일을 한 번 읽으면서 행마다 구조를 판별하고 데이터 행만 남깁니다.
+#   1. 헤더 영역: 숫자 값이 처음 나오는 행 전까지 (제목 / 단위 행은 제외, 위쪽 병합 셀은 왼쪽 값으로 채움)
+#   2. 라벨 열: 첫 데이터 행에서 첫 숫자 앞의 열 (맨 앞 정수 코드 열 포함, 코드 열을 뺀 라벨 열이 2개 이상이면
+#      그 첫 열은 구역 열, 마지막 열이 행 라벨)
+#   3. 요약 행: 행 라벨이 빈 구역 합계 행, SUMMARY_LABELS 행, 남길 구역이 아닌 구역(권역 등)의 행
+#      남길 구역은 section으로 지정 (예: "시도"), 지정하지 않으면 행 라벨이 시도명으로 가장 많이 풀리는 구역
+#   4. 단위 / 중간 헤더 행: 값 열에 숫자가 하나도 없는 행
+# 값 열은 numeric_parse로 한 번에 숫자(float64)로 변환합니다.
+# 이미 read_csv로 읽은 표는 structure_frame으로 같은 판별을 적용합니다.
+
+import csv
+import re
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from encoding_detect import detect_encoding
+from gazetteer import resolve_sido
+from numeric_parse import NA_TOKENS, NUMBER_PATTERN, parse_numeric_columns, print_parse_report
+
+# 행 라벨이 이 값이면 요약 행 (소문자 비교)
+SUMMARY_LABELS = ("합계", "소계", "총계", "계", "전국", "total", "sum")
+UNIT_PATTERN = re.compile(r"단위|unit", re.IGNORECASE)
+# 맨 앞 코드 열 값 (행정코드 / 연도 - 쉼표 / 소수점 없는 정수)
+CODE_PATTERN = re.compile(r"^\d+$")
+
+SKIP_KINDS = {"title": "제목", "unit": "단위", "subheader": "중간 헤더", "summary": "요약"}
+
+
+@dataclass
+class TableLayout:
+    """
+    read_table이 판별한 표 구조
+    - header_rows: 헤더 영역 행 수
+    - label_columns: 결과에 남긴 라벨 열 이름 (마지막이 행 라벨)
+    - section_column / section: 구역 열 이름 / 남긴 구역 (구역 열이 없으면 None)
+    - skipped: {종류: [줄 번호]} - title / unit / subheader / summary
+    """
+    header_rows: int = 0
+    label_columns: list = field(default_factory=list)
+    section_column: str = None
+    section: str = None
+    skipped: dict = field(default_factory=lambda: {kind: [] for kind in SKIP_KINDS})
+
+
+def is_number(cell):
+    """쉼표 숫자 문자열인지 (결측 표기 "-", "X" 등은 숫자 아님)"""
+    return cell not in NA_TOKENS and bool(NUMBER_PATTERN.match(cell)) and any(ch.isdigit() for ch in cell)
+
+
+# ------------------------------
+# 1. 헤더 영역
+# ------------------------------
+def _band_kind(cells):
+    """숫자 없는 위쪽 행 종류: "unit" / "title" / None(헤더 행)"""
+    filled = [c for c in cells if c]
+    if len(filled) <= 2 and UNIT_PATTERN.search(" ".join(filled)):
+        return "unit"
+    if len(filled) == 1 and len(cells) > 2:
+        return "title"
+    return None
+
+
+def _column_names(header, width, n_labels, flatten=True):
+    """
+    헤더 영역 → 열 이름
+    - 마지막 행을 뺀 위쪽 행은 병합 셀이므로 빈 칸을 왼쪽 값으로 채움
+    - flatten이면 "상위_하위" 한 줄, 아니면 MultiIndex용 튜플
+    - 이름이 빈 라벨 열은 왼쪽 라벨 열 이름을 이어받음 (예: "구분" 병합 셀), 빈 값 열은 "Unnamed: n"
+    """
+    rows = [row + [""] * (width - len(row)) for row in header]
+    for row in rows[:-1]:
+        for j in range(1, width):
+            row[j] = row[j] or row[j - 1]
+    parts = [[row[j] for row in rows] for j in range(width)]
+
+    names = []
+    for j, col in enumerate(parts):
+        name = "_".join(dict.fromkeys(p for p in col if p))
+        if not name:
+            name = names[j - 1] if 0 < j < n_labels else f"Unnamed: {j}"
+            col = [name] + [""] * (len(col) - 1)
+        names.append(name if flatten or len(rows) < 2 else tuple(col))
+    return names
+
+
+# ------------------------------
+# 2. 행 구조 판별 (파일 / DataFrame 공통)
+# ------------------------------
+def _label_count(cells):
+    """
+    첫 데이터 행 → (코드 열 수, 라벨 열 수)
+    - 라벨 열: 첫 숫자 값 앞의 열
+    - 맨 앞의 정수 열(코드 / 연도 등)은 값이 아니라 코드 라벨 열 (뒤에 글자 라벨이 오면 그 뒤까지 라벨)
+    - 첫 열이 쉼표 / 소수 숫자라 라벨 열을 찾을 수 없으면 ValueError
+    """
+    first = next(j for j, c in enumerate(cells) if is_number(c))
+    if first > 0:
+        return 0, first
+    if not CODE_PATTERN.match(cells[0]):
+        raise ValueError(f"라벨 열을 찾을 수 없음 (첫 데이터 행이 숫자 값으로 시작: {cells[:3]})")
+    n_codes = 1
+    while n_codes < len(cells) and CODE_PATTERN.match(cells[n_codes]):
+        n_codes += 1
+    if n_codes == len(cells) or is_number(cells[n_codes]) or not cells[n_codes]:
+        # 코드 뒤에 글자 라벨이 없으면 첫 열만 코드, 나머지는 값
+        return 1, 1
+    n_labels = next((j for j in range(n_codes, len(cells)) if is_number(cells[j])), len(cells))
+    return n_codes, n_labels
+
+
+def _pick_section(sections, section, label_index=0):
+    """
+    남길 구역 이름
+    - section을 지정했고 표에 있으면 그 구역
+    - 아니면 행 라벨(label_index 열)이 시도로 풀리는 행이 가장 많은 구역
+      (행 수로 고르지 않음 - 권역 소계 행이 더 많을 수 있음)
+    """
+    if section is not None:
+        if section in sections:
+            return section
+        print(f"  ⚠️  구역 '{section}' 없음 - 시도명 기준으로 구역 선택: {list(sections)}")
+    if not sections:
+        return None
+    return max(sections, key=lambda s: sum(resolve_sido(cells[label_index]) is not None
+                                           for _, cells in sections[s]))
+
+
+def parse_rows(rows, section=None, flatten=True):
+    """
+    행 목록(문자열 cells) → (데이터 행만 남긴 DataFrame, TableLayout)
+    rows: (줄 번호, cells) - 파일이면 csv.reader, DataFrame이면 structure_frame
+    """
+    layout = TableLayout()
+    header = []
+    n_codes = n_labels = None
+    width = 0
+    current = None
+    sections = {}   # 구역 → [(줄 번호, 구역 열을 뺀 cells)]
+
+    for lineno, row in rows:
+        cells = [c.strip().lstrip("\ufeff") for c in row]
+        if not any(cells):
+            continue
+        width = max(width, len(cells))
+        if n_labels is None:
+            if not any(is_number(c) for c in cells):
+                kind = _band_kind(cells)
+                if kind:
+                    layout.skipped[kind].append(lineno)
+                else:
+                    header.append(cells)
+                continue
+            n_codes, n_labels = _label_count(cells)
+
+        labels, values = cells[:n_labels], cells[n_labels:]
+        if not any(is_number(v) for v in values) and UNIT_PATTERN.search(" ".join(cells)):
+            layout.skipped["unit"].append(lineno)
+            continue
+        # 구역 열(코드 열 다음 첫 라벨 열)은 병합 셀이라 구역이 바뀌는 첫 행에만 값이 있음
+        has_section = n_labels - n_codes > 1
+        if has_section and labels[n_codes]:
+            current = labels[n_codes]
+        if not any(is_number(v) for v in values):
+            layout.skipped["subheader"].append(lineno)
+            continue
+        if not labels or not labels[-1] or labels[-1].lower() in SUMMARY_LABELS:
+            layout.skipped["summary"].append(lineno)
+            continue
+        kept_cells = cells[:n_codes] + cells[n_codes + 1:] if has_section else cells
+        sections.setdefault(current, []).append((lineno, kept_cells))
+
+    if n_labels is None:
+        return pd.DataFrame(), layout
+
+    # 3. 남길 구역만 데이터 (나머지 구역은 상위 집계)
+    has_section = n_labels - n_codes > 1
+    kept = _pick_section(sections, section, n_labels - 2) if has_section else None
+    for name, kept_rows in sections.items():
+        if name != kept:
+            layout.skipped["summary"].extend(lineno for lineno, _ in kept_rows)
+    layout.skipped["summary"].sort()
+
+    names = _column_names(header, width, n_labels, flatten)
+    if has_section:
+        section_name = names.pop(n_codes)
+        layout.section_column = section_name if isinstance(section_name, str) else section_name[0]
+        layout.section = kept
+    label_count = n_labels - 1 if has_section else n_labels
+    layout.header_rows = len(header)
+    layout.label_columns = names[:label_count]
+
+    data = [cells + [""] * (len(names) - len(cells)) for _, cells in sections.get(kept, [])]
+    df = pd.DataFrame([row[:len(names)] for row in data], columns=names, dtype=object)
+    if isinstance(names[0], tuple):
+        df.columns = pd.MultiIndex.from_tuples(names)
+    value_columns = list(df.columns[label_count:])
+    for col in df.columns[:label_count]:
+        df[col] = df[col].where(df[col] != "", None)
+
+    # 4. 값 열 숫자 변환 (한 번에)
+    df, report = parse_numeric_columns(df, columns=value_columns)
+    print_parse_report(report)
+    for col in value_columns:
+        df[col] = df[col].astype("float64")
+    return df, layout
+
+
+# ------------------------------
+# 3. 읽기 (한 번에 구조 판별)
+# ------------------------------
+def read_table(filepath, encoding=None, cache_path=None, content_hash=None, flatten=True, section=None):
+    """
+    구조를 판별하면서 데이터 행만 읽기
+    - flatten: 여러 줄 헤더를 "상위_하위" 한 줄로 (False면 MultiIndex 컬럼)
+    - section: 남길 구역 (구역 열의 값, 예: "시도" - None이면 시도명 기준으로 선택)
+    반환: (DataFrame - 라벨 열(문자열) + 값 열(float64), encoding, TableLayout)
+    """
+    encoding = encoding or detect_encoding(filepath, cache_path=cache_path, content_hash=content_hash)
+    with open(filepath, encoding=encoding, newline="") as f:
+        df, layout = parse_rows(enumerate(csv.reader(f), 1), section, flatten)
+    return df, encoding, layout
+
+
+def _cell_text(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def is_raw_frame(df, section=None):
+    """
+    read_csv로 그대로 읽은 표인지 (구분 열에 구역 표시 / 합계 행이 남아 있음)
+    read_table 결과는 요약 행과 구역 열이 빠져 있으므로 해당 없음
+    """
+    if len(df.columns) == 0 or isinstance(df.columns, pd.MultiIndex):
+        return False
+    first = df.iloc[:, 0].map(_cell_text).str.strip()
+    markers = set(SUMMARY_LABELS) | ({section} if section else set())
+    return bool(first.str.lower().isin(markers).any()) or any(
+        str(c).startswith("Unnamed:") for c in df.columns[1:2])
+
+
+def structure_frame(df, section=None, flatten=True):
+    """
+    read_csv로 읽은 표(헤더 1줄) → read_table과 같은 구조 판별 결과 (DataFrame, TableLayout)
+    ("Unnamed: n" 헤더는 빈 칸으로 취급)
+    """
+    header = ["" if str(c).startswith("Unnamed:") else str(c) for c in df.columns]
+    rows = [header] + [[_cell_text(v) for v in row] for row in df.itertuples(index=False)]
+    return parse_rows(enumerate(rows, 1), section, flatten)
+
+
+def print_layout(layout):
+    """판별한 구조 출력"""
+    parts = [f"헤더 {layout.header_rows}행"]
+    if layout.section_column:
+        parts.append(f"구역 열 '{layout.section_column}' 중 '{layout.section}'")
+    skipped = [f"{SKIP_KINDS[kind]} {len(lines)}행" for kind, lines in layout.skipped.items() if lines]
+    if skipped:
+        parts.append("제외: " + ", ".join(skipped))
+    print(f"  ℹ️  표 구조: {' / '.join(parts)}")
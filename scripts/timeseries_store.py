@@ -0,0 +1,324 @@
+# ==============================
+# 시계열 저장소: timeseries_store.py
+# ==============================
+# 독거노인수(연도별)와 257인구(월별 "2025년07월_*" 컬럼)처럼 시점이 있는 원본을
+# 최신 시점만 남기지 않고 (원본, 시점) 파티션으로 나눠 추가만 하는(append-only) 저장소에 쌓습니다.
+#
+#   <store>/<원본>/period=2023/part.parquet     ← 시점 하나 = 파일 하나 (region 순 정렬)
+#   <store>/<원본>/_index.json                  ← 파티션 목록 + (region → 시점 목록) 인덱스
+#
+# - 새 달/새 연도를 추가하면 그 시점의 파티션 하나와 인덱스만 씁니다. 이미 있는 시점은 내용이
+#   같으면 건너뛰고, 다르면 PartitionExistsError (덮어쓰지 않음).
+# - 이미 넣은 원본 파일(내용 해시)은 다시 읽지 않습니다.
+# - read_range: 기간 안의 파티션만 읽음 / read_as_of: 지역별로 기준 시점 이전의 마지막 값
+#   (인덱스로 필요한 파티션을 고른 뒤 그 파일만 읽음)
+# pyarrow가 있으면 Parquet(요청 컬럼/지역만 읽음), 없으면 pickle로 저장합니다.
+#
+# 사용: python scripts/timeseries_store.py ingest --data-dir data/rawdata --store data/timeseries
+#       python scripts/timeseries_store.py query --store data/timeseries --source 독거노인수 --as-of 2022
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import pickle
+
+import pandas as pd
+
+from encoding_detect import file_content_hash
+from raw_catalog import discover_inputs, print_duplicates
+from source_specs import format_period, plan_for
+
+try:
+    import pyarrow.parquet as pq
+    from columnar_io import to_arrow_table
+except ImportError:  # pyarrow는 선택 의존성 (없으면 파티션을 pickle로 저장)
+    pq = None
+
+STORE_VERSION = 1
+INDEX_FILE = "_index.json"
+
+
+class PartitionExistsError(Exception):
+    """이미 있는 시점에 다른 내용을 추가하려 할 때 (append-only)"""
+
+
+# ------------------------------
+# 1. 인덱스
+# ------------------------------
+def _source_dir(store_dir, source):
+    return os.path.join(store_dir, source)
+
+
+def _empty_index(source):
+    # partitions: {시점: {file, rows, columns, hash, origin}} / regions: {region: [시점, ...] (정렬)}
+    # origins: 이미 넣은 원본 파일 내용 해시 → 파일명
+    return {"version": STORE_VERSION, "source": source, "partitions": {}, "regions": {}, "origins": {}}
+
+
+def load_index(store_dir, source):
+    """원본 하나의 인덱스 (저장소에 없으면 빈 인덱스)"""
+    path = os.path.join(_source_dir(store_dir, source), INDEX_FILE)
+    if not os.path.exists(path):
+        return _empty_index(source)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_index(store_dir, source, index):
+    path = os.path.join(_source_dir(store_dir, source), INDEX_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def sources(store_dir):
+    """저장소에 있는 원본 이름 목록"""
+    if not os.path.isdir(store_dir):
+        return []
+    return sorted(name for name in os.listdir(store_dir)
+                  if os.path.exists(os.path.join(store_dir, name, INDEX_FILE)))
+
+
+def _in_range(period, start=None, end=None):
+    """시점이 [start, end] 안인지 ("2023"은 "2023-01" ~ "2023-12"를 모두 포함)"""
+    if start is not None and period[:len(start)] < start:
+        return False
+    return end is None or period[:len(end)] <= end
+
+
+def periods(store_dir, source, start=None, end=None):
+    """저장된 시점 목록 (정렬, start/end로 범위 제한)"""
+    start = format_period(start) if start is not None else None
+    end = format_period(end) if end is not None else None
+    return [p for p in sorted(load_index(store_dir, source)["partitions"]) if _in_range(p, start, end)]
+
+
+# ------------------------------
+# 2. 추가 (append-only)
+# ------------------------------
+def frame_hash(df):
+    """파티션 내용 해시 (컬럼 이름/타입 + 값, 행 순서 포함)"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()], ensure_ascii=False).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _write_partition(path, df):
+    """파티션 파일 쓰기 (임시 파일에 쓴 뒤 교체)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if pq is not None:
+        pq.write_table(to_arrow_table(df), tmp_path)
+    else:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def append_period(store_dir, source, period, df, origin=None, index=None):
+    """
+    시점 하나를 파티션으로 추가
+    - df: region + 값 컬럼 (region 순으로 정렬해 저장)
+    - 같은 시점이 이미 있으면 내용이 같을 때 "unchanged", 다르면 PartitionExistsError
+    - index를 넘기면 인덱스 파일은 쓰지 않음 (append_periods에서 한 번에 저장)
+    반환: "written" / "unchanged"
+    """
+    period = format_period(period)
+    save = index is None
+    index = index if index is not None else load_index(store_dir, source)
+    df = df.sort_values("region", kind="stable").reset_index(drop=True)
+    digest = frame_hash(df)
+
+    existing = index["partitions"].get(period)
+    if existing is not None:
+        if existing["hash"] == digest:
+            return "unchanged"
+        raise PartitionExistsError(f"{source} {period} 파티션이 이미 있고 내용이 다릅니다 "
+                                   f"(기존 {existing['origin']}, 새 {origin})")
+
+    filename = os.path.join(f"period={period}", "part.parquet" if pq is not None else "part.pkl")
+    _write_partition(os.path.join(_source_dir(store_dir, source), filename), df)
+    index["partitions"][period] = {"file": filename, "rows": len(df), "columns": [str(c) for c in df.columns],
+                                   "hash": digest, "origin": origin}
+    for region in df["region"].dropna().unique().tolist():
+        bisect.insort(index["regions"].setdefault(region, []), period)
+    if save:
+        _save_index(store_dir, source, index)
+    return "written"
+
+
+def append_periods(store_dir, source, frames, origin=None, origin_hash=None):
+    """
+    {시점: DataFrame} 추가 (새 시점 파티션만 쓰고 인덱스는 마지막에 한 번 저장)
+    반환: {시점: "written" / "unchanged"}
+    """
+    os.makedirs(_source_dir(store_dir, source), exist_ok=True)
+    index = load_index(store_dir, source)
+    status = {}
+    try:
+        for period, df in frames.items():
+            status[period] = append_period(store_dir, source, period, df, origin, index)
+        if origin_hash is not None:
+            index["origins"][origin_hash] = origin
+    finally:
+        # 중간에 PartitionExistsError가 나도 이미 쓴 파티션은 인덱스에 남김
+        if "written" in status.values() or origin_hash in index["origins"]:
+            _save_index(store_dir, source, index)
+    return status
+
+
+def ingest_file(store_dir, filepath, filename=None, content_hash=None):
+    """
+    원본 파일 하나를 시점별로 나눠 저장소에 추가 (source_specs의 period_column / period_pattern)
+    반환: (원본 이름, {시점: 상태}) - 시점 정보가 없는 파일은 (None, {}),
+          이미 넣은 파일(내용 해시가 같음)은 읽지 않고 (원본 이름, {})
+    """
+    filename = filename or os.path.basename(filepath)
+    plan = plan_for(filename)
+    if plan is None or (plan.spec.period_column is None and plan.spec.period_pattern is None):
+        return None, {}
+    source = plan.spec.name
+    content_hash = content_hash or file_content_hash(filepath)
+    if content_hash in load_index(store_dir, source)["origins"]:
+        return source, {}
+
+    df, _ = plan.read(filepath)
+    frames = plan.split_periods(df) if df is not None else None
+    if not frames:
+        return None, {}
+    return source, append_periods(store_dir, source, frames, filename, content_hash)
+
+
+def ingest_files(store_dir, data_dir, files=None):
+    """
+    폴더의 시점 있는 원본을 모두 추가하고 결과 출력
+    반환: 새로 쓴 파티션 수
+    """
+    if files is None:
+        # 같은 원본이 NFC / NFD 이름으로 두 번 있으면 한 번만 추가 (카탈로그는 저장소 폴더에)
+        files, duplicates, _ = discover_inputs(data_dir, os.path.join(store_dir, "catalog.json"))
+        files = sorted(files)
+        print_duplicates(duplicates)
+    written = 0
+    for filename in files:
+        source, status = ingest_file(store_dir, os.path.join(data_dir, filename), filename)
+        if source is None:
+            continue
+        new = [p for p, s in status.items() if s == "written"]
+        written += len(new)
+        if not status:
+            print(f"  ✓ {filename}: 이미 저장됨 ({source})")
+        elif new:
+            print(f"  💾 {filename} → {source}: 새 시점 {new}")
+        else:
+            print(f"  ✓ {filename}: 변경 없음 ({source}, {len(status)}개 시점)")
+    return written
+
+
+# ------------------------------
+# 3. 조회
+# ------------------------------
+def _read_partition(store_dir, source, entry, regions=None, columns=None):
+    path = os.path.join(_source_dir(store_dir, source), entry["file"])
+    if columns is not None:
+        columns = ["region"] + [c for c in columns if c != "region" and c in entry["columns"]]
+    if path.endswith(".parquet"):
+        filters = [("region", "in", list(regions))] if regions is not None else None
+        df = pq.read_table(path, columns=columns, filters=filters).to_pandas()
+    else:
+        with open(path, "rb") as f:
+            df = pickle.load(f)
+        if regions is not None:
+            df = df[df["region"].isin(list(regions))]
+        if columns is not None:
+            df = df[columns]
+    # Parquet의 dictionary 컬럼(region)은 파티션마다 범주가 달라 object로 맞춤
+    if isinstance(df["region"].dtype, pd.CategoricalDtype):
+        df["region"] = df["region"].astype(object)
+    return df.reset_index(drop=True)
+
+
+def _concat_periods(parts, columns=None):
+    if not parts:
+        return pd.DataFrame(columns=["region", "period"] + list(columns or []))
+    df = pd.concat([part.assign(period=period) for period, part in parts], ignore_index=True)
+    ordered = ["region", "period"] + [c for c in df.columns if c not in ("region", "period")]
+    return df[ordered]
+
+
+def read_range(store_dir, source, start=None, end=None, regions=None, columns=None):
+    """
+    기간 [start, end]의 값 (그 기간 파티션만 읽음)
+    반환: region, period, 값 컬럼 DataFrame (period, region 순)
+    """
+    index = load_index(store_dir, source)
+    parts = [(period, _read_partition(store_dir, source, index["partitions"][period], regions, columns))
+             for period in periods(store_dir, source, start, end)]
+    return _concat_periods(parts, columns)
+
+
+def read_as_of(store_dir, source, as_of, regions=None, columns=None):
+    """
+    지역별로 as_of 시점 이전(포함)의 마지막 값 - (region → 시점) 인덱스로 필요한 파티션만 읽음
+    반환: region, period(실제로 쓴 시점), 값 컬럼 DataFrame (region 순)
+    """
+    as_of = format_period(as_of)
+    index = load_index(store_dir, source)
+    wanted = index["regions"] if regions is None else {r: index["regions"].get(r, []) for r in regions}
+    by_period = {}
+    for region, region_periods in wanted.items():
+        # as_of보다 늦은 첫 시점의 바로 앞 ("2023"은 "2023-12"까지 포함)
+        i = bisect.bisect_right([p[:len(as_of)] for p in region_periods], as_of)
+        if i > 0:
+            by_period.setdefault(region_periods[i - 1], []).append(region)
+    parts = [(period, _read_partition(store_dir, source, index["partitions"][period], names, columns))
+             for period, names in sorted(by_period.items())]
+    df = _concat_periods(parts, columns)
+    return df.sort_values("region", kind="stable").reset_index(drop=True)
+
+
+# ------------------------------
+# 4. 메인 실행
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="시점별 파티션 시계열 저장소 (추가 / 조회)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="원본 폴더의 시점 있는 파일을 저장소에 추가")
+    ingest.add_argument("--data-dir", required=True)
+    ingest.add_argument("--store", required=True)
+    query = sub.add_parser("query", help="기간 / 기준 시점 조회")
+    query.add_argument("--store", required=True)
+    query.add_argument("--source", required=True, help="원본 이름 (예: 독거노인수, 인구)")
+    query.add_argument("--start", default=None)
+    query.add_argument("--end", default=None)
+    query.add_argument("--as-of", default=None, help="지역별 이 시점 이전의 마지막 값")
+    query.add_argument("--regions", nargs="+", default=None)
+    query.add_argument("--columns", nargs="+", default=None)
+    query.add_argument("--output", default=None, help="CSV로 저장 (없으면 출력)")
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        written = ingest_files(args.store, args.data_dir)
+        print(f"💾 새 파티션 {written}개 → {args.store} (원본: {', '.join(sources(args.store))})")
+        return
+
+    if args.source not in sources(args.store):
+        print(f"[오류] 저장소에 없는 원본: {args.source} (가능: {sources(args.store)})")
+        return
+    if args.as_of is not None:
+        df = read_as_of(args.store, args.source, args.as_of, args.regions, args.columns)
+    else:
+        df = read_range(args.store, args.source, args.start, args.end, args.regions, args.columns)
+    if args.output:
+        df.to_csv(args.output, index=False, encoding="utf-8-sig")
+        print(f"💾 저장: {args.output} ({len(df)}행)")
+    else:
+        print(df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()